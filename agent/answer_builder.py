@@ -0,0 +1,152 @@
+from collections import OrderedDict
+from typing import Optional
+
+from pydantic import ValidationError
+
+from agent.config import Answers, Info
+from agent.sql_cache import QueryResult
+
+# 값이 없을 때 표시할 문자열
+MISSING = "정보 없음"
+
+
+def first_index(columns: list, *names: str) -> Optional[int]:
+    """주어진 이름 중 처음으로 일치하는 컬럼의 (첫 번째) 위치를 반환합니다."""
+    for name in names:
+        if name in columns:
+            return columns.index(name)
+    return None
+
+
+def build_infos(result: QueryResult) -> Optional[list[Info]]:
+    """
+    쿼리 결과 행을 식당 단위로 묶어 Info 목록을 만듭니다.
+
+    restaurants와 menus를 JOIN 한 결과는 메뉴 수만큼 같은 식당이 반복되므로
+    식당 id 기준으로 묶고 메뉴와 후기를 이어 붙입니다.
+    restaurant_cards 결과는 메뉴(menus)와 후기(reviews)가 이미 이어 붙어 있으므로 그대로 사용합니다.
+    식당 이름/주소 컬럼이 없는 결과(집계 쿼리 등)는 None을 반환합니다.
+    """
+    columns = [column.lower() for column in result.columns]
+    name_idx = first_index(columns, "name")
+    address_idx = first_index(columns, "address")
+    if name_idx is None or address_idx is None or not result.rows:
+        return None
+
+    # SELECT * 의 경우 restaurants.id가 먼저, menus.id가 나중에 나오므로 첫 번째 id 사용
+    id_idx = first_index(columns, "restaurant_id", "id")
+    station_idx = first_index(columns, "station_name")
+    # 숫자형(REAL) lat/lng 컬럼을 우선 사용하고, 없으면 TEXT 컬럼 사용
+    lat_idx = first_index(columns, "lat", "latitude")
+    lng_idx = first_index(columns, "lng", "longitude")
+    video_idx = first_index(columns, "video_url")
+    menu_idx = first_index(columns, "menu_name")
+    review_idx = first_index(columns, "menu_review")
+    # restaurant_cards의 이어 붙인 메뉴/후기 컬럼
+    card_menus_idx = first_index(columns, "menus")
+    card_reviews_idx = first_index(columns, "reviews")
+
+    def value(row, idx):
+        if idx is None or row[idx] is None or row[idx] == "":
+            return MISSING
+        return str(row[idx])
+
+    restaurants = OrderedDict()
+    for row in result.rows:
+        key = row[id_idx] if id_idx is not None else (row[name_idx], row[address_idx])
+        if key not in restaurants:
+            restaurants[key] = {
+                "info": {
+                    "name": value(row, name_idx),
+                    "address": value(row, address_idx),
+                    "subway": value(row, station_idx),
+                    "lat": row[lat_idx] if lat_idx is not None else None,
+                    "lng": row[lng_idx] if lng_idx is not None else None,
+                    "video_url": value(row, video_idx),
+                },
+                "menus": [],
+                "reviews": [],
+            }
+        entry = restaurants[key]
+        if menu_idx is None and card_menus_idx is not None:
+            menus, reviews = value(row, card_menus_idx), value(row, card_reviews_idx)
+            if menus != MISSING and menus not in entry["menus"]:
+                entry["menus"].append(menus)
+                if reviews != MISSING:
+                    entry["reviews"].append(reviews)
+            continue
+        menu = value(row, menu_idx)
+        if menu != MISSING and menu not in entry["menus"]:
+            entry["menus"].append(menu)
+            review = value(row, review_idx)
+            if review != MISSING:
+                entry["reviews"].append(f"{menu}: {review}")
+
+    return [
+        Info(
+            **entry["info"],
+            menu=", ".join(entry["menus"]) or MISSING,
+            review=" / ".join(entry["reviews"]) or MISSING,
+        )
+        for entry in restaurants.values()
+    ]
+
+
+def describe_infos(infos: list[Info], limit: int = 20) -> str:
+    """요약 답변 생성용으로 식당 목록을 짧은 텍스트로 만듭니다."""
+    lines = [f"- {info.name} ({info.subway}): {info.menu}" for info in infos[:limit]]
+    if len(infos) > limit:
+        lines.append(f"- 외 {len(infos) - limit}곳")
+    return "\n".join(lines)
+
+
+def default_answer(infos: list[Info]) -> str:
+    """요약 답변을 생성하지 못했을 때 사용할 기본 답변을 반환합니다."""
+    return f"{len(infos)}곳의 식당을 찾았어요."
+
+
+def build_answers(answer: str, infos: list[Info]) -> dict:
+    """요약 답변과 식당 목록으로 최종 응답(Answers) 딕셔너리를 만듭니다."""
+    return Answers(answer=answer, infos=infos).model_dump()
+
+
+def normalize_info(info) -> Optional[Info]:
+    """
+    LLM이 생성한 식당 정보 하나를 Info 모델로 검증합니다. (좌표를 float/None으로 변환)
+
+    빠진 텍스트 항목은 MISSING으로 채우고, 식당 이름이 없거나 검증에 실패하면 None을 반환합니다.
+    """
+    if not isinstance(info, dict) or not info.get("name"):
+        return None
+    text_fields = {
+        name: MISSING
+        for name, field in Info.model_fields.items()
+        if field.annotation is str
+    }
+    try:
+        return Info.model_validate(
+            {**text_fields, **{k: v for k, v in info.items() if v is not None}}
+        )
+    except ValidationError:
+        return None
+
+
+def normalize_answers(data: dict) -> dict:
+    """
+    LLM이 생성한 답변 JSON을 Answers 모델 형식으로 정리합니다.
+
+    식당 정보는 하나씩 검증하므로 잘못된 식당 정보만 제외되고
+    나머지 식당의 좌표는 항상 float 또는 None이 됩니다.
+    답변 JSON이 아니면(answer 항목이 없으면) 원본을 그대로 반환합니다.
+    """
+    if not isinstance(data, dict) or "answer" not in data:
+        return data
+    infos = data.get("infos")
+    return build_answers(
+        str(data["answer"]),
+        [
+            info
+            for info in map(normalize_info, infos if isinstance(infos, list) else [])
+            if info is not None
+        ],
+    )
@@ -0,0 +1,162 @@
+"""
+AgentGraph 동시 실행 벤치마크
+
+실제 SQLite DB와 그래프를 사용하고, LLM은 기본적으로 ScriptedChatModel로 대체합니다.
+
+사용 예:
+    python -m agent.benchmark --repeat 20 --concurrency 8 --latency 0.3
+    python -m agent.benchmark --questions questions.txt --checkpointer sqlite
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from typing import Any
+
+from agent.metrics import MetricsRegistry, percentile
+
+# 벤치마크 기본 질문
+DEFAULT_QUESTIONS = [
+    "강남역 맛집 알려줘",
+    "논현역 근처 맛집",
+    "서울 중식 맛집 추천해줘",
+    "을지로 해장국",
+    "부산 밀면 맛집",
+    "강남구 한식",
+    "서울 중구 맛집",
+    "성시경이 추천한 칼국수집",
+]
+
+
+def summarize(values: list[float]) -> dict[str, float]:
+    """값 목록의 합계/평균/p50/p95를 반환합니다."""
+    values = sorted(values)
+    return {
+        "total": sum(values),
+        "mean": sum(values) / len(values) if values else 0.0,
+        "p50": percentile(values, 0.50),
+        "p95": percentile(values, 0.95),
+    }
+
+
+async def run_benchmark(graph, questions: list[str]) -> dict[str, Any]:
+    """
+    질문 목록을 graph.arun_many로 동시에 실행하고 결과를 집계합니다.
+
+    Returns:
+        dict: 처리량, 요청/노드별 지연 시간, 모델/SQL/노드/그래프 오버헤드 시간 분해
+    """
+    started = time.perf_counter()
+    results = await graph.arun_many(questions)
+    elapsed = time.perf_counter() - started
+
+    traces = [
+        trace
+        for trace in graph.metrics.recent_traces(len(questions))
+        if not trace["cached"]
+    ]
+    node_seconds = {}
+    for trace in traces:
+        for node, node_trace in trace["nodes"].items():
+            node_seconds.setdefault(node, []).append(node_trace["seconds"])
+
+    llm = [trace["llm_seconds"] for trace in traces]
+    sql = [trace["sql"]["seconds"] for trace in traces]
+    node_total = [
+        sum(n["seconds"] for n in trace["nodes"].values()) for trace in traces
+    ]
+    return {
+        "questions": len(questions),
+        "concurrency": graph.max_concurrency,
+        "errors": sum(1 for result in results if not result or "error" in result),
+        "elapsed_seconds": elapsed,
+        "throughput_qps": len(questions) / elapsed if elapsed else 0.0,
+        "latency": {
+            "request": summarize([trace["total_seconds"] for trace in traces]),
+            "queue": summarize([trace["queue_seconds"] for trace in traces]),
+            "graph": summarize([trace["graph_seconds"] for trace in traces]),
+        },
+        "nodes": {node: summarize(values) for node, values in node_seconds.items()},
+        # 그래프 실행 시간 = 모델 + SQL + 노드 내부 처리 + 그래프 오버헤드
+        "breakdown": {
+            "llm": summarize(llm),
+            "sql": summarize(sql),
+            "node_other": summarize(
+                [max(0.0, n - l - s) for n, l, s in zip(node_total, llm, sql)]
+            ),
+            "graph_overhead": summarize(
+                [trace["graph_overhead_seconds"] for trace in traces]
+            ),
+        },
+        "loops": summarize([trace["loops"] for trace in traces]),
+        "tokens": {
+            "prompt": sum(trace["tokens"]["prompt"] for trace in traces),
+            "completion": sum(trace["tokens"]["completion"] for trace in traces),
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="AgentGraph 동시 실행 벤치마크")
+    parser.add_argument("--questions", help="질문 파일 (한 줄에 질문 하나)")
+    parser.add_argument("--repeat", type=int, default=1, help="질문 목록 반복 횟수")
+    parser.add_argument("--concurrency", type=int, default=8, help="동시 실행 수")
+    parser.add_argument(
+        "--latency", type=float, default=0.0, help="가짜 LLM 응답 시간(초)"
+    )
+    parser.add_argument("--responses", help="역할별로 기록해 둔 LLM 응답 JSON 파일")
+    parser.add_argument(
+        "--checkpointer", choices=["memory", "sqlite", "none"], default="none"
+    )
+    parser.add_argument(
+        "--real-llm", action="store_true", help="가짜 LLM 대신 OpenAI 모델 사용"
+    )
+    parser.add_argument(
+        "--no-rule-based", action="store_true", help="규칙 기반 쿼리 생성 사용 안 함"
+    )
+    parser.add_argument(
+        "--no-query-cache", action="store_true", help="쿼리 결과 캐시 사용 안 함"
+    )
+    parser.add_argument("--output", help="결과를 저장할 JSON 파일")
+    args = parser.parse_args()
+
+    # 체인은 처음 사용할 때 LLM()으로 만들어지므로 그래프 생성 전에 LLM을 교체
+    if not args.real_llm:
+        from agent.fake_llm import load_responses, use_fake_llm
+
+        use_fake_llm(
+            responses=load_responses(args.responses) if args.responses else None,
+            latency=args.latency,
+        )
+
+    from agent.graph import AgentGraph
+    from agent.tools import get_query_cache
+
+    if args.no_query_cache:
+        get_query_cache().max_entries = 0
+
+    if args.questions:
+        with open(args.questions, "r", encoding="utf-8") as f:
+            questions = [line.strip() for line in f if line.strip()]
+    else:
+        questions = DEFAULT_QUESTIONS
+    questions = questions * args.repeat
+
+    graph = AgentGraph(
+        max_concurrency=args.concurrency,
+        use_rule_based=not args.no_rule_based,
+        checkpointer=None if args.checkpointer == "none" else args.checkpointer,
+        metrics=MetricsRegistry(window=max(1000, len(questions)), trace_path=None),
+    )
+    report = asyncio.run(run_benchmark(graph, questions))
+
+    output = json.dumps(report, ensure_ascii=False, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output)
+
+
+if __name__ == "__main__":
+    main()
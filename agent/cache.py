@@ -0,0 +1,263 @@
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Collection, Optional
+
+from agent.config import get_logger
+from agent.db import DB_PATH, connect_readonly, get_db_version
+
+# 로깅 설정
+logger = get_logger()
+
+# 질문 정규화 시 동일하게 취급할 표현 (토큰 단위로 치환)
+SYNONYMS = {
+    "서울특별시": "서울",
+    "서울시": "서울",
+    "경기도": "경기",
+    "중국집": "중식",
+    "중국음식": "중식",
+    "중화요리": "중식",
+    "중식당": "중식",
+    "일본음식": "일식",
+    "일식집": "일식",
+    "한식집": "한식",
+    "한식당": "한식",
+    "일식당": "일식",
+    "양식집": "양식",
+    "분식집": "분식",
+    "멕시코음식": "멕시칸",
+    "음식점": "맛집",
+    "식당": "맛집",
+    "밥집": "맛집",
+}
+
+# 의미 없이 붙는 표현 (검색 조건에 영향을 주지 않음)
+STOPWORDS = {
+    "추천",
+    "추천해줘",
+    "추천해주세요",
+    "알려줘",
+    "알려주세요",
+    "찾아줘",
+    "어디",
+    "어디야",
+    "있어",
+    "있는",
+    "좀",
+    "근처",
+    "주변",
+    "부근",
+    "성시경",
+    "성시경이",
+    "먹을텐데",
+}
+
+# 토큰 끝에 붙는 조사 (긴 조사부터 검사, '을지로'/'떡볶이'처럼 이름과 겹치는 조사는 제외)
+PARTICLES = ("에서", "으로", "에", "의", "을", "를", "은", "는")
+
+
+def normalize_question(question: str, regions: Collection[str] = ()) -> str:
+    """
+    캐시 키로 사용할 수 있도록 질문을 정규화합니다.
+
+    공백/문장부호, 조사, 동의어, '역'/'동' 접미사 표기를 통일합니다.
+    '강남 말고 논현'과 '논현 말고 강남'은 다른 질문이므로 토큰 순서와 반복은 그대로 둡니다.
+    '논현'(주소)과 '논현역'(지하철역)은 서로 다른 쿼리가 되므로 '역'은 떼지 않고 붙여 씁니다.
+    '동'은 뗀 이름이 regions(지역 별칭)에 있을 때만 뗍니다. ('사케동', '가츠동' 등 메뉴 이름 유지)
+    """
+    text = unicodedata.normalize("NFC", question).lower()
+    text = re.sub(r"[^\w\s]", " ", text)
+    # '강남 역' -> '강남역'
+    text = re.sub(r"(\w)\s+역(?=\s|$)", r"\1역", text)
+
+    tokens = []
+    for token in text.split():
+        for particle in PARTICLES:
+            if token.endswith(particle) and len(token) > len(particle) + 1:
+                token = token[: -len(particle)]
+                break
+        # '논현동' -> '논현' (뗀 이름이 알려진 지역 별칭일 때만)
+        if token.endswith("동") and len(token) >= 3 and token[:-1] in regions:
+            token = token[:-1]
+        token = SYNONYMS.get(token, token)
+        if token and token not in STOPWORDS:
+            tokens.append(token)
+
+    return " ".join(tokens)
+
+
+def load_region_aliases(db_path: str = DB_PATH) -> frozenset[str]:
+    """DB의 region_aliases 테이블에 있는 지역 별칭을 반환합니다. (테이블이나 파일이 없으면 빈 집합)"""
+    try:
+        connection = connect_readonly(db_path)
+    except sqlite3.Error:
+        return frozenset()
+    try:
+        return frozenset(
+            alias for (alias,) in connection.execute("SELECT alias FROM region_aliases")
+        )
+    except sqlite3.Error:
+        return frozenset()
+    finally:
+        connection.close()
+
+
+class AnswerCache:
+    """
+    정규화된 질문 -> run_agent 결과(Answers dict) 캐시
+
+    메모리 LRU + TTL로 관리하며, path를 지정하면 SQLite 파일에도 저장하여
+    Streamlit 재시작 후에도 재사용합니다. DB 파일(meokten.db)이 바뀌면 전체를 무효화합니다.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 512,
+        ttl_seconds: float = 60 * 60 * 6,
+        path: Optional[str] = None,
+        db_path: str = DB_PATH,
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.path = path
+        self.db_path = db_path
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # key -> (created_at, result)
+        self._lock = threading.Lock()
+        self._db_version = get_db_version(db_path)
+        # 질문 정규화 시 '동'을 떼어도 되는 지역 별칭
+        self._regions = load_region_aliases(db_path)
+        self._conn = None
+        if path:
+            self._open_disk_cache(path)
+
+    def _open_disk_cache(self, path: str):
+        """디스크 캐시용 SQLite 파일을 엽니다."""
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS answer_cache (
+                key TEXT PRIMARY KEY,
+                result TEXT NOT NULL,
+                db_version TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            """
+        )
+        # 다른 버전의 DB로 만들어진 결과는 삭제
+        self._conn.execute(
+            "DELETE FROM answer_cache WHERE db_version != ?", (self._db_version,)
+        )
+        self._conn.commit()
+
+    def _check_db_version(self):
+        """DB 파일이 바뀌었으면 캐시 전체를 비웁니다. (lock 안에서 호출)"""
+        version = get_db_version(self.db_path)
+        if version != self._db_version:
+            logger.info("AnswerCache DB 변경 감지, 캐시를 초기화합니다.")
+            self._db_version = version
+            self._regions = load_region_aliases(self.db_path)
+            self._clear_locked()
+
+    def _clear_locked(self):
+        self._entries.clear()
+        if self._conn:
+            self._conn.execute("DELETE FROM answer_cache")
+            self._conn.commit()
+
+    def get(self, question: str) -> Optional[dict]:
+        """캐시된 결과를 반환합니다. 없거나 만료되었으면 None을 반환합니다."""
+        now = time.time()
+        with self._lock:
+            self._check_db_version()
+            key = normalize_question(question, self._regions)
+
+            entry = self._entries.get(key)
+            if entry is None and self._conn:
+                row = self._conn.execute(
+                    "SELECT created_at, result FROM answer_cache WHERE key = ?", (key,)
+                ).fetchone()
+                if row:
+                    entry = (row[0], json.loads(row[1]))
+                    self._entries[key] = entry
+                    self._trim_locked()
+
+            if entry is None or now - entry[0] > self.ttl_seconds:
+                if entry is not None:
+                    self._delete_locked(key)
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            if self._conn:
+                self._conn.execute(
+                    "UPDATE answer_cache SET accessed_at = ? WHERE key = ?", (now, key)
+                )
+                self._conn.commit()
+            self.hits += 1
+            # 호출자가 결과를 수정해도 캐시가 바뀌지 않도록 복사본 반환
+            return json.loads(json.dumps(entry[1]))
+
+    def set(self, question: str, result: dict):
+        """결과를 캐시에 저장합니다."""
+        now = time.time()
+        payload = json.dumps(result, ensure_ascii=False)
+        with self._lock:
+            self._check_db_version()
+            key = normalize_question(question, self._regions)
+            self._entries[key] = (now, json.loads(payload))
+            self._entries.move_to_end(key)
+            self._trim_locked()
+
+            if self._conn:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO answer_cache VALUES (?, ?, ?, ?, ?)",
+                    (key, payload, self._db_version, now, now),
+                )
+                # 오래 사용하지 않은 항목부터 정리
+                self._conn.execute(
+                    """
+                    DELETE FROM answer_cache WHERE key IN (
+                        SELECT key FROM answer_cache ORDER BY accessed_at DESC
+                        LIMIT -1 OFFSET ?
+                    )
+                    """,
+                    (self.max_entries,),
+                )
+                self._conn.execute(
+                    "DELETE FROM answer_cache WHERE created_at < ?",
+                    (now - self.ttl_seconds,),
+                )
+                self._conn.commit()
+
+    def _trim_locked(self):
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _delete_locked(self, key: str):
+        self._entries.pop(key, None)
+        if self._conn:
+            self._conn.execute("DELETE FROM answer_cache WHERE key = ?", (key,))
+            self._conn.commit()
+
+    def clear(self):
+        """캐시를 모두 비웁니다."""
+        with self._lock:
+            self._clear_locked()
+
+    def stats(self) -> dict:
+        """캐시 적중/미스 통계를 반환합니다."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self._entries),
+            }
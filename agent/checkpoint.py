@@ -0,0 +1,254 @@
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional, Union
+
+from langgraph.checkpoint.base import BaseCheckpointSaver
+from langgraph.checkpoint.memory import MemorySaver
+from langgraph.checkpoint.sqlite import SqliteSaver
+
+from agent.config import get_logger
+
+# 로깅 설정
+logger = get_logger()
+
+# SQLite 체크포인터 기본 경로
+CHECKPOINT_DB_PATH = os.getenv("MEOKTEN_CHECKPOINT_PATH", ".cache/checkpoints.db")
+
+
+class BoundedMemorySaver(MemorySaver):
+    """
+    스레드 수와 마지막 사용 시각으로 크기를 제한하는 MemorySaver
+
+    체크포인트가 저장될 때마다 ttl_seconds 동안 사용되지 않은 스레드와
+    max_threads를 넘는 오래된 스레드(LRU)의 체크포인트, 쓰기 기록, 채널 값을 삭제합니다.
+    """
+
+    def __init__(self, max_threads: int = 256, ttl_seconds: float = 30 * 60, **kwargs):
+        super().__init__(**kwargs)
+        self.max_threads = max_threads
+        self.ttl_seconds = ttl_seconds
+        self.evicted = 0
+        self._access = OrderedDict()
+        self._lock = threading.RLock()
+
+    def touch(self, thread_id: str):
+        """스레드의 마지막 사용 시각을 갱신합니다."""
+        self._access[thread_id] = time.monotonic()
+        self._access.move_to_end(thread_id)
+
+    def get_tuple(self, config):
+        with self._lock:
+            thread_id = config["configurable"].get("thread_id")
+            if thread_id in self._access:
+                self.touch(thread_id)
+            return super().get_tuple(config)
+
+    def put(self, config, checkpoint, metadata, new_versions):
+        with self._lock:
+            result = super().put(config, checkpoint, metadata, new_versions)
+            self.touch(config["configurable"]["thread_id"])
+            self.evict()
+            return result
+
+    def put_writes(self, config, writes, task_id, task_path: str = ""):
+        with self._lock:
+            super().put_writes(config, writes, task_id, task_path)
+            self.touch(config["configurable"]["thread_id"])
+
+    def delete_thread(self, thread_id: str):
+        with self._lock:
+            super().delete_thread(thread_id)
+            self._access.pop(thread_id, None)
+
+    def evict(self):
+        """오래되었거나 개수 제한을 넘은 스레드를 삭제합니다."""
+        with self._lock:
+            expired_before = time.monotonic() - self.ttl_seconds
+            expired = [
+                thread_id
+                for thread_id, accessed_at in self._access.items()
+                if accessed_at < expired_before
+            ]
+            # _access는 오래 사용하지 않은 순서이므로 앞에서부터 초과분을 삭제
+            overflow = len(self._access) - len(expired) - self.max_threads
+            if overflow > 0:
+                skip = set(expired)
+                expired += [
+                    thread_id for thread_id in self._access if thread_id not in skip
+                ][:overflow]
+            for thread_id in expired:
+                self.delete_thread(thread_id)
+            self.evicted += len(expired)
+
+    def stats(self) -> dict[str, Any]:
+        """저장된 스레드/체크포인트 수를 반환합니다."""
+        with self._lock:
+            return {
+                "threads": len(self._access),
+                "checkpoints": sum(
+                    len(checkpoints)
+                    for namespaces in self.storage.values()
+                    for checkpoints in namespaces.values()
+                ),
+                "blobs": len(self.blobs),
+                "evicted": self.evicted,
+            }
+
+
+class CompactingSqliteSaver(SqliteSaver):
+    """
+    주기적으로 오래된 체크포인트를 정리하는 SqliteSaver
+
+    compact_every 번 저장할 때마다 ttl_seconds 동안 사용되지 않은 스레드와
+    max_threads를 넘는 오래된 스레드를 삭제하고, 남은 스레드는 최근 keep_last개의
+    체크포인트만 유지합니다. (그래프는 마지막 체크포인트만 사용)
+
+    SqliteSaver는 비동기 메서드를 지원하지 않으므로 동기 메서드를 스레드에서 실행합니다.
+    """
+
+    def __init__(
+        self,
+        path: str = CHECKPOINT_DB_PATH,
+        max_threads: int = 1000,
+        ttl_seconds: float = 24 * 60 * 60,
+        keep_last: int = 1,
+        compact_every: int = 100,
+    ):
+        if path != ":memory:" and os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        super().__init__(sqlite3.connect(path, check_same_thread=False))
+        self.max_threads = max_threads
+        self.ttl_seconds = ttl_seconds
+        self.keep_last = keep_last
+        self.compact_every = compact_every
+        self._puts = 0
+
+    def setup(self):
+        if self.is_setup:
+            return
+        super().setup()
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS thread_access (
+                thread_id TEXT PRIMARY KEY,
+                updated_at REAL NOT NULL
+            )
+            """
+        )
+        self.conn.commit()
+
+    def put(self, config, checkpoint, metadata, new_versions):
+        result = super().put(config, checkpoint, metadata, new_versions)
+        with self.cursor() as cur:
+            cur.execute(
+                "INSERT OR REPLACE INTO thread_access (thread_id, updated_at) VALUES (?, ?)",
+                (config["configurable"]["thread_id"], time.time()),
+            )
+            self._puts += 1
+            should_compact = self._puts % self.compact_every == 0
+        if should_compact:
+            self.compact()
+        return result
+
+    def compact(self, vacuum: bool = False) -> int:
+        """
+        오래된 스레드와 체크포인트를 삭제합니다.
+
+        Args:
+            vacuum (bool): True이면 삭제 후 VACUUM으로 파일 크기를 줄입니다.
+
+        Returns:
+            int: 삭제한 체크포인트 수
+        """
+        with self.cursor() as cur:
+            cur.execute(
+                """
+                SELECT thread_id FROM thread_access
+                WHERE updated_at < ? OR thread_id NOT IN (
+                    SELECT thread_id FROM thread_access
+                    ORDER BY updated_at DESC LIMIT ?
+                )
+                """,
+                (time.time() - self.ttl_seconds, self.max_threads),
+            )
+            expired = cur.fetchall()
+            for table in ("checkpoints", "writes", "thread_access"):
+                cur.executemany(f"DELETE FROM {table} WHERE thread_id = ?", expired)
+
+            # 남은 스레드는 최근 keep_last개의 체크포인트만 유지
+            stale = """
+                SELECT thread_id, checkpoint_ns, checkpoint_id FROM (
+                    SELECT thread_id, checkpoint_ns, checkpoint_id,
+                        ROW_NUMBER() OVER (
+                            PARTITION BY thread_id, checkpoint_ns
+                            ORDER BY checkpoint_id DESC
+                        ) AS rank
+                    FROM checkpoints
+                ) WHERE rank > ?
+            """
+            cur.execute(
+                f"DELETE FROM writes WHERE (thread_id, checkpoint_ns, checkpoint_id) "
+                f"IN ({stale})",
+                (self.keep_last,),
+            )
+            cur.execute(
+                f"DELETE FROM checkpoints WHERE (thread_id, checkpoint_ns, checkpoint_id) "
+                f"IN ({stale})",
+                (self.keep_last,),
+            )
+            removed = cur.rowcount
+        if expired or removed:
+            logger.info(
+                f"CompactingSqliteSaver 정리 완료 (스레드 {len(expired)}개, "
+                f"오래된 체크포인트 {removed}개 삭제)"
+            )
+        if vacuum:
+            with self.lock:
+                self.conn.execute("VACUUM")
+        return removed
+
+    async def aget_tuple(self, config):
+        return await asyncio.to_thread(self.get_tuple, config)
+
+    async def alist(self, config, *, filter=None, before=None, limit=None):
+        items = await asyncio.to_thread(
+            lambda: list(self.list(config, filter=filter, before=before, limit=limit))
+        )
+        for item in items:
+            yield item
+
+    async def aput(self, config, checkpoint, metadata, new_versions):
+        return await asyncio.to_thread(
+            self.put, config, checkpoint, metadata, new_versions
+        )
+
+    async def aput_writes(self, config, writes, task_id, task_path: str = ""):
+        return await asyncio.to_thread(
+            self.put_writes, config, writes, task_id, task_path
+        )
+
+
+def create_checkpointer(
+    checkpointer: Union[str, BaseCheckpointSaver, None] = "memory",
+) -> Optional[BaseCheckpointSaver]:
+    """
+    그래프 컴파일에 사용할 체크포인터를 생성합니다.
+
+    Args:
+        checkpointer: "memory"(크기 제한 메모리), "sqlite"(주기적으로 정리하는 SQLite),
+            None(체크포인터 없이 한 번만 실행하는 질의용) 또는 체크포인터 객체
+
+    Returns:
+        BaseCheckpointSaver: 체크포인터 (stateless인 경우 None)
+    """
+    if checkpointer is None or isinstance(checkpointer, BaseCheckpointSaver):
+        return checkpointer
+    if checkpointer == "memory":
+        return BoundedMemorySaver()
+    if checkpointer == "sqlite":
+        return CompactingSqliteSaver()
+    raise ValueError(f"지원하지 않는 체크포인터입니다: {checkpointer}")
@@ -1,13 +1,14 @@
 import logging
+import math
 import os
 from pathlib import Path
-from typing import Annotated, List
+from typing import Annotated, Callable, List, Optional
 
 from dotenv import load_dotenv
 from langchain_core.messages import AnyMessage
 from langchain_openai import ChatOpenAI
 from langgraph.graph.message import add_messages
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
 from typing_extensions import TypedDict
 
 load_dotenv()
@@ -60,12 +61,22 @@ class Info(BaseModel):
     name: str = Field(..., description="식당 이름")
     address: str = Field(..., description="식당 주소")
     subway: str = Field(..., description="식당 지하철역")
-    lat: str = Field(..., description="식당 위도")
-    lng: str = Field(..., description="식당 경도")
+    lat: Optional[float] = Field(None, description="식당 위도 (없으면 null)")
+    lng: Optional[float] = Field(None, description="식당 경도 (없으면 null)")
     menu: str = Field(..., description="식당 메뉴")
     review: str = Field(..., description="식당 후기")
     video_url: str = Field(..., description="식당 유튜브 영상 링크")
 
+    @field_validator("lat", "lng", mode="before")
+    @classmethod
+    def coerce_coordinate(cls, value):
+        """'정보 없음', 빈 문자열, 0 등 좌표가 아닌 값은 None으로 바꿉니다."""
+        try:
+            value = float(value)
+        except (TypeError, ValueError):
+            return None
+        return value if value and math.isfinite(value) else None
+
 
 # 최종 응답 모델
 class Answers(BaseModel):
@@ -73,6 +84,33 @@ class Answers(BaseModel):
     infos: List[Info] = Field(..., description="식당 정보")
 
 
+# LLM 생성 함수를 교체할 때 사용 (역할 이름 -> 채팅 모델)
+LLM_FACTORY: Optional[Callable] = None
+
+
+def set_llm_factory(factory: Optional[Callable]):
+    """
+    LLM()이 사용할 모델 생성 함수를 지정합니다. (None이면 기본 OpenAI 모델)
+
+    체인은 처음 사용할 때 만들어지므로(agent.registry) AgentGraph를
+    생성하기 전에 호출해야 합니다. 이미 만들어진 체인은 registry.reset()으로 다시 만들 수 있습니다.
+    """
+    global LLM_FACTORY
+    LLM_FACTORY = factory
+
+
 # LLM 설정
-def LLM():
+def LLM(role: str = "default"):
+    """
+    역할(query_gen, query_check, answer_gen, answer_summary, model_get_schema)에
+    사용할 채팅 모델을 반환합니다.
+
+    MEOKTEN_LLM=fake 이면 OpenAI를 호출하지 않는 스크립트 모델을 사용합니다.
+    """
+    if LLM_FACTORY is not None:
+        return LLM_FACTORY(role)
+    if os.getenv("MEOKTEN_LLM") == "fake":
+        from agent.fake_llm import ScriptedChatModel
+
+        return ScriptedChatModel.from_env(role)
     return ChatOpenAI(model="gpt-4o")
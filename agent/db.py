@@ -1,25 +1,294 @@
+import hashlib
+import itertools
 import os
+import sqlite3
+import threading
+import time
+from typing import Optional
 
-import requests
 from agent.config import LLM, get_logger
+from agent.db_download import DB_URL, refresh_db, start_refresh_thread
+from agent.registry import registry
 from langchain_community.agent_toolkits.sql.toolkit import SQLDatabaseToolkit
 from langchain_community.utilities import SQLDatabase
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import QueuePool
 
 # 로깅 설정
 logger = get_logger()
 
+# 데이터베이스 파일 경로 (환경 변수로 변경 가능)
+DB_PATH = os.getenv("MEOKTEN_DB_PATH", "../meokten.db")
 
-def get_db_connection():
-    """데이터베이스 연결을 반환합니다."""
-    # streamlit cloud 환경에서 사용할 목적으로 url 사용
-    # db_url = "https://github.com/jinucho/Meokten/raw/refs/heads/main/meokten.db"
+# 읽기 전용 연결에 적용할 PRAGMA
+# (journal_mode는 쓰기 쪽에서 정하므로 변경하지 않고, WAL DB도 그대로 읽을 수 있음)
+READONLY_PRAGMAS = {
+    "query_only": "ON",
+    "mmap_size": 256 * 1024 * 1024,
+    "cache_size": -64 * 1024,  # 음수는 KiB 단위 (64MB)
+    "temp_store": "MEMORY",
+    "busy_timeout": 5000,
+}
+
+# DB 파일을 메모리로 복사해서 사용 (쿼리가 디스크를 읽지 않음, 0이면 파일을 직접 읽음)
+USE_MEMORY_SNAPSHOT = os.getenv("MEOKTEN_DB_SNAPSHOT", "1") != "0"
+# DB 파일 교체 여부 확인 간격 (초)
+DB_WATCH_INTERVAL = float(os.getenv("MEOKTEN_DB_WATCH_INTERVAL", "2"))
+
+# 인메모리 스냅샷 연결에 적용할 PRAGMA
+SNAPSHOT_PRAGMAS = {
+    "query_only": "ON",
+    "temp_store": "MEMORY",
+}
+
+# 연결 풀 크기
+POOL_SIZE = int(os.getenv("MEOKTEN_DB_POOL_SIZE", "8"))
+POOL_MAX_OVERFLOW = int(os.getenv("MEOKTEN_DB_POOL_MAX_OVERFLOW", "8"))
+
+# 연결 풀 사용 통계
+POOL_COUNTERS = {"connects": 0, "checkouts": 0, "checkins": 0}
+POOL_COUNTERS_LOCK = threading.Lock()
+
+
+def connect_readonly(db_path: str = DB_PATH) -> sqlite3.Connection:
+    """읽기 전용(mode=ro) SQLite 연결을 만들고 PRAGMA를 적용합니다."""
+    uri = f"file:{os.path.abspath(db_path)}?mode=ro"
+    connection = sqlite3.connect(uri, uri=True, check_same_thread=False)
+    for name, value in READONLY_PRAGMAS.items():
+        connection.execute(f"PRAGMA {name} = {value}")
+    return connection
+
+
+def get_db_identity(db_path: str = DB_PATH) -> Optional[tuple]:
+    """DB 파일 교체 여부를 판단하기 위한 (device, inode, mtime, size)를 반환합니다. (파일이 없으면 None)"""
+    try:
+        stat = os.stat(db_path)
+    except OSError:
+        return None
+    return stat.st_dev, stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+
+class MemorySnapshot:
+    """
+    DB 파일을 backup API로 복사한 공유 인메모리 DB
+
+    같은 이름의 memory URI(cache=shared)로 연결하면 모든 연결이 같은 스냅샷을 읽습니다.
+    메모리 DB는 마지막 연결이 닫히면 사라지므로, 스냅샷을 사용하는 동안 연결 하나를 열어둡니다.
+    """
+
+    _counter = itertools.count(1)
+
+    def __init__(self, db_path: str = DB_PATH):
+        self.db_path = db_path
+        # 복사 중에 파일이 교체되면 다음 확인 때 다시 불러오도록 복사 전에 기록
+        self.identity = get_db_identity(db_path)
+        self.uri = (
+            f"file:meokten-snapshot-{os.getpid()}-{next(self._counter)}"
+            "?mode=memory&cache=shared"
+        )
+        started = time.perf_counter()
+        self._keeper = sqlite3.connect(self.uri, uri=True, check_same_thread=False)
+        try:
+            source = connect_readonly(db_path)
+            try:
+                source.backup(self._keeper)
+            finally:
+                source.close()
+        except Exception:
+            self._keeper.close()
+            raise
+        self.load_seconds = time.perf_counter() - started
+        logger.info(f"DB 스냅샷 로드 완료: {db_path} ({self.load_seconds:.3f}초)")
+
+    def connect(self) -> sqlite3.Connection:
+        """스냅샷에 연결하고 PRAGMA를 적용합니다."""
+        connection = sqlite3.connect(self.uri, uri=True, check_same_thread=False)
+        for name, value in SNAPSHOT_PRAGMAS.items():
+            connection.execute(f"PRAGMA {name} = {value}")
+        return connection
+
+    def close(self):
+        """스냅샷을 닫습니다. 아직 열려 있는 연결이 모두 닫히면 메모리가 해제됩니다."""
+        self._keeper.close()
+
+
+def count_pool_event(name: str):
+    with POOL_COUNTERS_LOCK:
+        POOL_COUNTERS[name] += 1
+
+
+def create_readonly_engine(
+    db_path: str = DB_PATH, snapshot: Optional[MemorySnapshot] = None
+) -> Engine:
+    """
+    읽기 전용 연결 풀을 사용하는 SQLAlchemy 엔진을 생성합니다.
+
+    snapshot을 지정하면 인메모리 스냅샷에 연결하고, 아니면 DB 파일을 직접 읽습니다.
+    연결은 풀에서 재사용되므로 요청마다 파일을 다시 열지 않고,
+    mmap/페이지 캐시를 연결 수명 동안 유지합니다.
+    """
+    engine = create_engine(
+        "sqlite://",
+        creator=snapshot.connect if snapshot else lambda: connect_readonly(db_path),
+        poolclass=QueuePool,
+        pool_size=POOL_SIZE,
+        max_overflow=POOL_MAX_OVERFLOW,
+        pool_timeout=30,
+    )
+    event.listen(engine, "connect", lambda *args: count_pool_event("connects"))
+    event.listen(engine, "checkout", lambda *args: count_pool_event("checkouts"))
+    event.listen(engine, "checkin", lambda *args: count_pool_event("checkins"))
+    return engine
+
+
+def get_internal_tables(engine: Engine) -> list[str]:
+    """가상 테이블(FTS5, R*Tree 등)과 그 내부(shadow) 테이블 이름을 반환합니다."""
+    with engine.connect() as connection:
+        rows = connection.exec_driver_sql(
+            "SELECT name, sql FROM sqlite_master WHERE type = 'table'"
+        ).fetchall()
+    virtual = [
+        name
+        for name, sql in rows
+        if (sql or "").upper().startswith("CREATE VIRTUAL TABLE")
+    ]
+    return [
+        name
+        for name, _ in rows
+        if name in virtual or any(name.startswith(f"{v}_") for v in virtual)
+    ]
 
-    # response = requests.get(db_url)
-    # db_path = "meokten.db"
-    # with open(db_path, "wb") as file:
-    #     file.write(response.content)
 
-    llm = LLM()
-    db = SQLDatabase.from_uri(f"sqlite:///../meokten.db")
+def open_db(db_path: str = DB_PATH):
+    """읽기 전용 엔진(인메모리 스냅샷 또는 DB 파일)으로 SQLDatabase와 툴킷을 만듭니다."""
+    snapshot = MemorySnapshot(db_path) if USE_MEMORY_SNAPSHOT else None
+    identity = snapshot.identity if snapshot else get_db_identity(db_path)
+    llm = LLM("sql_toolkit")
+    engine = create_readonly_engine(db_path, snapshot)
+    # 전문 검색 등 가상 테이블과 그 내부 테이블은 LLM에 보여줄 스키마에서 제외
+    db = SQLDatabase(engine, ignore_tables=get_internal_tables(engine))
     toolkit = SQLDatabaseToolkit(db=db, llm=llm)
-    return db, toolkit
+    return (db, toolkit), identity, snapshot
+
+
+# 현재 사용 중인 DB 파일 정보, 스냅샷, 마지막 교체 확인 시각
+_serving = {"identity": None, "snapshot": None, "checked_at": 0.0}
+_serving_lock = threading.Lock()
+
+
+@registry.resource("db_connection")
+def get_db_connection():
+    """
+    데이터베이스 연결을 반환합니다.
+
+    에이전트 도구, 스키마 프롬프트 등 모든 곳에서 같은 읽기 전용 엔진(연결 풀)을 공유하며,
+    처음 호출할 때 한 번만 생성합니다. DB 파일이 교체되면 reload_db_if_changed가 새 연결로 바꿉니다.
+    """
+    # streamlit cloud 등 원격 DB를 사용하는 환경 (변경이 없으면 조건부 요청만 보냄)
+    if DB_URL:
+        refresh_db(DB_URL, DB_PATH)
+        start_refresh_thread(DB_URL, DB_PATH)
+    connection, identity, snapshot = open_db(DB_PATH)
+    _serving.update(identity=identity, snapshot=snapshot, checked_at=time.monotonic())
+    return connection
+
+
+def reload_db_if_changed(force: bool = False) -> bool:
+    """
+    DB 파일이 교체되었으면(inode/mtime/size 변경) 새 스냅샷으로 바꿉니다.
+
+    새 스냅샷과 엔진을 모두 만든 뒤 db_connection을 교체하므로 교체 중에도 이전 DB로 쿼리를
+    처리하며, db_connection으로 만든 리소스(스키마, 쿼리 캐시, 체인 등)는 다음 사용 시 다시 생성됩니다.
+    DB_WATCH_INTERVAL 간격으로만 파일을 확인합니다. (force=True이면 바로 확인)
+
+    Returns:
+        bool: 새 DB로 교체했으면 True
+    """
+    # 아직 연결 전이거나 리소스를 생성하는 중이면 확인하지 않음
+    if not registry.is_built("db_connection") or registry.is_building():
+        return False
+    if not force and time.monotonic() - _serving["checked_at"] < DB_WATCH_INTERVAL:
+        return False
+    with _serving_lock:
+        now = time.monotonic()
+        if not force and now - _serving["checked_at"] < DB_WATCH_INTERVAL:
+            return False
+        _serving["checked_at"] = now
+        identity = get_db_identity(DB_PATH)
+        # 파일이 없으면(교체 중 등) 기존 DB를 계속 사용
+        if identity is None or identity == _serving["identity"]:
+            return False
+
+        logger.info("DB 파일 교체 감지, 새 DB로 교체합니다.")
+        try:
+            connection, identity, snapshot = open_db(DB_PATH)
+        except Exception as e:
+            logger.error(f"새 DB 로드 실패, 기존 DB를 계속 사용합니다: {e}")
+            return False
+        old_db, _ = get_db_connection()
+        old_snapshot = _serving["snapshot"]
+        registry.replace("db_connection", connection)
+        _serving.update(identity=identity, snapshot=snapshot)
+
+    # 쉬고 있는 이전 연결을 닫음 (실행 중인 쿼리의 연결은 반납될 때 정리됨)
+    old_db._engine.dispose()
+    if old_snapshot:
+        old_snapshot.close()
+    return True
+
+
+def get_db() -> SQLDatabase:
+    """공유 SQLDatabase를 반환합니다. (처음 호출할 때 연결 생성, DB 파일이 교체되었으면 새 DB 사용)"""
+    reload_db_if_changed()
+    return get_db_connection()[0]
+
+
+def has_table(db: SQLDatabase, name: str) -> bool:
+    """DB에 해당 이름의 테이블(가상 테이블 포함)이 있는지 확인합니다."""
+    try:
+        rows = db._execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name",
+            fetch="cursor",
+            parameters={"name": name},
+        ).fetchall()
+    except Exception:
+        return False
+    return bool(rows)
+
+
+def get_schema_fingerprint(db: SQLDatabase) -> str:
+    """테이블 스키마(sqlite_master)의 해시값을 반환합니다."""
+    schema = db.run("SELECT type, name, sql FROM sqlite_master ORDER BY type, name")
+    return hashlib.sha256(str(schema).encode("utf-8")).hexdigest()
+
+
+def get_db_version(db_path: str = DB_PATH) -> str:
+    """
+    DB 변경 여부를 판단하기 위한 버전 문자열(inode, mtime, size)을 반환합니다.
+
+    사용 중인 DB가 있으면 파일이 아니라 현재 쿼리에 사용하는 DB의 버전을 반환하므로,
+    캐시는 새 스냅샷으로 교체될 때 함께 초기화됩니다.
+    """
+    identity = _serving["identity"]
+    if db_path != DB_PATH or not registry.is_built("db_connection"):
+        identity = get_db_identity(db_path)
+    if identity is None:
+        return "missing"
+    _, inode, mtime_ns, size = identity
+    return f"{inode}-{mtime_ns}-{size}"
+
+
+def get_pool_stats() -> dict:
+    """공유 연결 풀의 상태(크기, 사용 중인 연결 수 등)와 누적 사용 횟수를 반환합니다."""
+    db, _ = get_db_connection()
+    pool = db._engine.pool
+    with POOL_COUNTERS_LOCK:
+        counters = dict(POOL_COUNTERS)
+    return {
+        "size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        "overflow": pool.overflow(),
+        **counters,
+    }
@@ -0,0 +1,251 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+import requests
+
+from agent.config import get_logger
+
+# 로깅 설정
+logger = get_logger()
+
+# 원격 DB 주소 (지정하면 시작할 때와 주기적으로 내려받음)
+# 예: https://github.com/jinucho/Meokten/raw/refs/heads/main/meokten.db
+DB_URL = os.getenv("MEOKTEN_DB_URL", "")
+# 기대하는 SHA-256 값, 또는 SHA-256 값이 담긴 파일 주소 (둘 다 없으면 크기와 SQLite 무결성만 확인)
+DB_SHA256 = os.getenv("MEOKTEN_DB_SHA256", "")
+DB_SHA256_URL = os.getenv("MEOKTEN_DB_SHA256_URL", "")
+# 백그라운드 갱신 간격 (초, 0이면 사용 안 함)
+DB_REFRESH_INTERVAL = float(os.getenv("MEOKTEN_DB_REFRESH_INTERVAL", "600"))
+
+# 다운로드 단위와 타임아웃
+CHUNK_SIZE = 64 * 1024
+TIMEOUT = (10, 60)  # (연결, 읽기) 초
+
+SQLITE_HEADER = b"SQLite format 3\x00"
+
+# 같은 프로세스에서 동시에 내려받지 않도록 하는 락
+_download_lock = threading.Lock()
+_refresh_thread: Optional[threading.Thread] = None
+
+
+def read_json(path: str) -> dict:
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def write_json(path: str, data: dict):
+    """임시 파일에 쓴 뒤 이름을 바꿔 원자적으로 저장합니다."""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def file_sha256(path: str) -> str:
+    """파일을 나누어 읽으며 SHA-256 값을 계산합니다."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def expected_sha256(session: requests.Session) -> Optional[str]:
+    """설정된 기대 SHA-256 값을 반환합니다. (없으면 None)"""
+    if DB_SHA256:
+        return DB_SHA256.strip().lower()
+    if DB_SHA256_URL:
+        response = session.get(DB_SHA256_URL, timeout=TIMEOUT)
+        response.raise_for_status()
+        # 'sha256sum' 출력 형식('<해시>  meokten.db')도 허용
+        return response.text.split()[0].lower()
+    return None
+
+
+def verify_db_file(path: str, size: Optional[int], sha256: Optional[str]):
+    """내려받은 파일의 크기, 체크섬, SQLite 무결성을 확인합니다. 실패하면 ValueError를 발생시킵니다."""
+    actual_size = os.path.getsize(path)
+    if size is not None and actual_size != size:
+        raise ValueError(f"크기가 다릅니다 (기대 {size}, 실제 {actual_size})")
+    if sha256 is not None and file_sha256(path) != sha256:
+        raise ValueError("SHA-256 체크섬이 다릅니다")
+    with open(path, "rb") as f:
+        if f.read(len(SQLITE_HEADER)) != SQLITE_HEADER:
+            raise ValueError("SQLite 파일이 아닙니다")
+    connection = sqlite3.connect(f"file:{os.path.abspath(path)}?mode=ro", uri=True)
+    try:
+        result = connection.execute("PRAGMA quick_check").fetchone()[0]
+    except sqlite3.DatabaseError as e:
+        result = str(e)
+    finally:
+        connection.close()
+    if result != "ok":
+        raise ValueError(f"SQLite 무결성 검사 실패: {result}")
+
+
+def matches_recorded_sha256(db_path: str, meta: dict) -> bool:
+    """로컬 DB 파일이 내려받을 때 기록한 크기/SHA-256과 같은지 확인합니다. (기록이 없으면 True)"""
+    if not meta.get("sha256"):
+        return True
+    return (
+        os.path.getsize(db_path) == meta.get("size")
+        and file_sha256(db_path) == meta["sha256"]
+    )
+
+
+def download_db(url: str, db_path: str) -> bool:
+    """
+    원격 DB를 내려받아 db_path에 원자적으로 교체합니다.
+
+    - 이전 다운로드의 ETag/Last-Modified로 조건부 요청을 보내 변경이 없으면(304) 바로 끝납니다.
+      로컬 파일이 기록된 SHA-256과 다르면(손상, 수동 변경) 조건 없이 다시 받습니다.
+    - 파일은 메모리에 올리지 않고 '<db_path>.part'에 나누어 저장하며,
+      중단된 다운로드는 Range/If-Range 요청으로 이어받습니다.
+    - 크기와 체크섬, SQLite 무결성을 확인한 뒤 os.replace로 교체하므로
+      DB를 읽는 쪽은 이전 파일이나 완성된 새 파일만 보게 됩니다.
+
+    Returns:
+        bool: 새 파일로 교체했으면 True, 변경이 없으면 False
+    """
+    meta_path = f"{db_path}.meta.json"
+    part_path = f"{db_path}.part"
+    part_meta_path = f"{part_path}.json"
+
+    with _download_lock, requests.Session() as session:
+        meta = read_json(meta_path) if os.path.exists(db_path) else {}
+        if not matches_recorded_sha256(db_path, meta):
+            logger.warning(
+                f"로컬 DB가 기록된 SHA-256과 다릅니다. 다시 내려받습니다: {db_path}"
+            )
+            meta = {}
+        part_meta = read_json(part_meta_path)
+        if part_meta.get("url") != url or not os.path.exists(part_path):
+            part_meta = {}
+        offset = os.path.getsize(part_path) if part_meta else 0
+
+        headers = {}
+        if meta.get("url") == url:
+            if meta.get("etag"):
+                headers["If-None-Match"] = meta["etag"]
+            if meta.get("last_modified"):
+                headers["If-Modified-Since"] = meta["last_modified"]
+        if offset:
+            # 원격 파일이 그대로일 때만 이어받고, 바뀌었으면 서버가 전체(200)를 보냄
+            validator = part_meta.get("etag") or part_meta.get("last_modified")
+            if validator:
+                headers["Range"] = f"bytes={offset}-"
+                headers["If-Range"] = validator
+
+        with session.get(
+            url, headers=headers, stream=True, timeout=TIMEOUT
+        ) as response:
+            if response.status_code == 304:
+                logger.info(f"원격 DB 변경 없음: {url}")
+                return False
+            if response.status_code == 416:
+                # 이어받을 범위가 잘못된 경우 다음 시도에서 처음부터 받음
+                os.remove(part_path)
+                os.remove(part_meta_path)
+                raise ValueError("이어받기 범위 오류, 처음부터 다시 받습니다")
+            response.raise_for_status()
+
+            etag = response.headers.get("ETag")
+            last_modified = response.headers.get("Last-Modified")
+            if response.status_code == 206:
+                # 'bytes 100-199/200' -> 전체 크기 200
+                total = response.headers.get("Content-Range", "").rpartition("/")[2]
+                size = int(total) if total.isdigit() else None
+                mode = "ab"
+                logger.info(f"원격 DB 이어받기: {offset}바이트부터")
+            else:
+                length = response.headers.get("Content-Length")
+                size = int(length) if length and length.isdigit() else None
+                mode = "wb"
+                offset = 0
+            write_json(
+                part_meta_path,
+                {"url": url, "etag": etag, "last_modified": last_modified},
+            )
+
+            with open(part_path, mode) as f:
+                for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                    f.write(chunk)
+                f.flush()
+                os.fsync(f.fileno())
+
+        try:
+            verify_db_file(part_path, size, expected_sha256(session))
+        except ValueError:
+            os.remove(part_path)
+            os.remove(part_meta_path)
+            raise
+
+        os.replace(part_path, db_path)
+        os.remove(part_meta_path)
+        write_json(
+            meta_path,
+            {
+                "url": url,
+                "etag": etag,
+                "last_modified": last_modified,
+                "size": os.path.getsize(db_path),
+                "sha256": file_sha256(db_path),
+            },
+        )
+        logger.info(f"원격 DB 다운로드 완료: {url} -> {db_path}")
+        return True
+
+
+def refresh_db(url: str, db_path: str) -> bool:
+    """
+    원격 DB를 갱신합니다. 실패하면 기존 파일을 그대로 사용하고 False를 반환합니다.
+    (기존 파일이 없거나 기록된 SHA-256과 다르면 예외를 그대로 발생시킴)
+    """
+    try:
+        return download_db(url, db_path)
+    except (requests.RequestException, OSError, ValueError) as e:
+        if not os.path.exists(db_path) or not matches_recorded_sha256(
+            db_path, read_json(f"{db_path}.meta.json")
+        ):
+            raise
+        logger.error(f"원격 DB 갱신 실패, 기존 파일을 사용합니다: {e}")
+        return False
+
+
+def start_refresh_thread(
+    url: str, db_path: str, interval: float = DB_REFRESH_INTERVAL
+) -> Optional[threading.Thread]:
+    """
+    interval초마다 원격 DB를 갱신하는 백그라운드 스레드를 시작합니다. (프로세스당 하나)
+
+    교체된 파일은 agent.db의 DB 파일 감시가 새 스냅샷으로 불러옵니다.
+    """
+    global _refresh_thread
+    if interval <= 0:
+        return None
+    with _download_lock:
+        if _refresh_thread is not None and _refresh_thread.is_alive():
+            return _refresh_thread
+
+        def run():
+            while True:
+                time.sleep(interval)
+                try:
+                    refresh_db(url, db_path)
+                except Exception as e:
+                    logger.error(f"원격 DB 백그라운드 갱신 중 오류: {e}")
+
+        _refresh_thread = threading.Thread(
+            target=run, name="meokten-db-refresh", daemon=True
+        )
+        _refresh_thread.start()
+    logger.info(f"원격 DB 백그라운드 갱신 시작 ({interval:.0f}초 간격)")
+    return _refresh_thread
@@ -0,0 +1,240 @@
+import asyncio
+import json
+import os
+import threading
+import time
+import uuid
+from typing import Any, Optional
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from pydantic import PrivateAttr
+
+from agent.cache import normalize_question
+from agent.config import set_llm_factory
+from agent.intent import BASE_QUERY, FILLER_WORDS
+
+
+def question_of(messages: list[BaseMessage]) -> str:
+    """메시지 목록에서 첫 번째 사용자 질문을 찾습니다."""
+    for message in messages:
+        if message.type == "human":
+            return message.content
+    return ""
+
+
+def strip_query(content: str) -> str:
+    """'Answer: ```sql ... ```' 형식에서 SQL만 추출합니다."""
+    return (
+        content.replace("Answer:", "").replace("```sql", "").replace("```", "").strip()
+    )
+
+
+def script_query_gen(messages: list[BaseMessage]) -> str:
+    """질문의 단어를 주소/역/메뉴 종류/메뉴 이름 LIKE 조건으로 바꾼 SQL을 생성합니다."""
+    # 이전 쿼리가 실패했으면 조건 없이 다시 조회 (같은 쿼리를 반복하지 않도록)
+    if any(
+        isinstance(m.content, str) and m.content.startswith("Error:") for m in messages
+    ):
+        return f"{BASE_QUERY} LIMIT 20"
+
+    conditions = []
+    for token in normalize_question(question_of(messages)).split():
+        if token in FILLER_WORDS:
+            continue
+        token = token.replace("'", "''")
+        conditions.append(
+            f"(restaurants.address LIKE '%{token}%' "
+            f"OR restaurants.station_name LIKE '%{token}%' "
+            f"OR menus.menu_type LIKE '%{token}%' "
+            f"OR menus.menu_name LIKE '%{token}%')"
+        )
+    if not conditions:
+        return f"{BASE_QUERY} LIMIT 20"
+    return f"{BASE_QUERY} WHERE {' AND '.join(conditions)}"
+
+
+def script_query_check(messages: list[BaseMessage]) -> AIMessage:
+    """검증 없이 받은 쿼리 그대로 db_query_tool을 호출합니다."""
+    return AIMessage(
+        content="",
+        tool_calls=[
+            {
+                "name": "db_query_tool",
+                "args": {"query": strip_query(messages[-1].content)},
+                "id": f"fake_{uuid.uuid4()}",
+            }
+        ],
+    )
+
+
+def script_model_get_schema(messages: list[BaseMessage]) -> AIMessage:
+    """restaurants, menus 테이블의 스키마를 요청합니다."""
+    return AIMessage(
+        content="",
+        tool_calls=[
+            {
+                "name": "sql_db_schema",
+                "args": {"table_names": "restaurants, menus"},
+                "id": f"fake_{uuid.uuid4()}",
+            }
+        ],
+    )
+
+
+# 역할별 기본 응답
+DEFAULT_RESPONSES = {
+    "query_gen": script_query_gen,
+    "query_check": script_query_check,
+    "model_get_schema": script_model_get_schema,
+    "answer_gen": json.dumps(
+        {"answer": "검색 결과를 정리했어요.", "infos": []}, ensure_ascii=False
+    ),
+    "answer_summary": "검색한 식당을 정리했어요.",
+}
+
+
+def load_responses(path: str) -> dict[str, list]:
+    """
+    기록해 둔 응답을 불러옵니다.
+
+    파일 형식: {"query_gen": ["SELECT ...", ...], "answer_summary": ["...", ...]}
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+class ScriptedChatModel(BaseChatModel):
+    """
+    OpenAI를 호출하지 않고 역할별로 정해진 응답을 반환하는 채팅 모델
+
+    부하 테스트용으로 latency초 만큼 모델 응답 시간을 흉내 내며,
+    토큰 사용량은 글자 수로 추정하여 usage_metadata에 기록합니다.
+    """
+
+    role: str = "default"
+    # 역할 -> 응답 (문자열, 순서대로 반복할 문자열 목록, 또는 메시지 목록을 받는 함수)
+    responses: dict = {}
+    latency: float = 0.0
+
+    _counters: dict = PrivateAttr(default_factory=dict)
+    _lock: Any = PrivateAttr(default_factory=threading.Lock)
+
+    @classmethod
+    def from_env(cls, role: str) -> "ScriptedChatModel":
+        """MEOKTEN_FAKE_LLM_LATENCY, MEOKTEN_FAKE_LLM_RESPONSES 환경변수로 생성합니다."""
+        path = os.getenv("MEOKTEN_FAKE_LLM_RESPONSES")
+        return cls(
+            role=role,
+            responses=load_responses(path) if path else {},
+            latency=float(os.getenv("MEOKTEN_FAKE_LLM_LATENCY", "0")),
+        )
+
+    @property
+    def _llm_type(self) -> str:
+        return "scripted"
+
+    def bind_tools(self, tools, **kwargs):
+        # 역할별 응답에 도구 호출이 이미 정해져 있으므로 도구 정보는 사용하지 않음
+        return self
+
+    def respond(self, messages: list[BaseMessage]) -> AIMessage:
+        """역할에 맞는 응답 메시지를 만듭니다."""
+        response = self.responses.get(self.role, DEFAULT_RESPONSES.get(self.role, ""))
+        if isinstance(response, list):
+            with self._lock:
+                index = self._counters.get(self.role, 0)
+                self._counters[self.role] = index + 1
+            response = response[index % len(response)] if response else ""
+        if callable(response):
+            response = response(messages)
+        message = response if isinstance(response, AIMessage) else AIMessage(response)
+
+        input_tokens = sum(len(str(m.content)) for m in messages) // 2
+        output_tokens = len(str(message.content)) // 2 + 10 * len(message.tool_calls)
+        message.usage_metadata = {
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "total_tokens": input_tokens + output_tokens,
+        }
+        return message
+
+    def result(self, message: AIMessage) -> ChatResult:
+        return ChatResult(
+            generations=[ChatGeneration(message=message)],
+            llm_output={"model_name": "scripted"},
+        )
+
+    def chunks(self, message: AIMessage) -> list[ChatGenerationChunk]:
+        """스트리밍용으로 응답을 여러 조각으로 나눕니다."""
+        if message.tool_calls:
+            return [
+                ChatGenerationChunk(
+                    message=AIMessageChunk(
+                        content="",
+                        tool_call_chunks=[
+                            {
+                                "name": call["name"],
+                                "args": json.dumps(call["args"], ensure_ascii=False),
+                                "id": call["id"],
+                                "index": index,
+                            }
+                            for index, call in enumerate(message.tool_calls)
+                        ],
+                        usage_metadata=message.usage_metadata,
+                    )
+                )
+            ]
+        content = message.content
+        pieces = [content[i : i + 8] for i in range(0, len(content), 8)] or [""]
+        return [
+            ChatGenerationChunk(
+                message=AIMessageChunk(
+                    content=piece,
+                    usage_metadata=(
+                        message.usage_metadata if i == len(pieces) - 1 else None
+                    ),
+                )
+            )
+            for i, piece in enumerate(pieces)
+        ]
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        if self.latency:
+            time.sleep(self.latency)
+        return self.result(self.respond(messages))
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return self.result(self.respond(messages))
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+        if self.latency:
+            time.sleep(self.latency)
+        for chunk in self.chunks(self.respond(messages)):
+            if run_manager:
+                run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+            yield chunk
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        for chunk in self.chunks(self.respond(messages)):
+            if run_manager:
+                await run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+            yield chunk
+
+
+def use_fake_llm(responses: Optional[dict] = None, latency: float = 0.0):
+    """
+    LLM()이 ScriptedChatModel을 반환하도록 설정합니다.
+
+    체인은 처음 사용할 때 만들어지므로 AgentGraph를 생성하기 전에 호출해야 합니다.
+    """
+    set_llm_factory(
+        lambda role: ScriptedChatModel(
+            role=role, responses=responses or {}, latency=latency
+        )
+    )
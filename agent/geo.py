@@ -0,0 +1,198 @@
+import math
+from typing import Optional
+
+from langchain_community.utilities import SQLDatabase
+
+from agent.config import get_logger
+from agent.db import has_table
+
+# 로깅 설정
+logger = get_logger()
+
+# 식당 좌표 공간 인덱스 (data_collect/save_db.py의 migrate_geo_index)
+GEO_TABLE = "restaurant_geo"
+# 식당-지하철역 연결 테이블 (data_collect/save_db.py의 migrate_stations)
+STATION_LINK_TABLE = "restaurant_stations"
+
+# 지구 반지름 (m)
+EARTH_RADIUS_M = 6_371_000
+# 위도 1도의 거리 (m)
+METERS_PER_DEGREE = math.pi * EARTH_RADIUS_M / 180
+
+# R*Tree는 좌표를 32비트 실수 구간으로 저장하므로 구간의 중앙값을 좌표로 사용
+POINT = (
+    f"({GEO_TABLE}.min_lat + {GEO_TABLE}.max_lat) / 2, "
+    f"({GEO_TABLE}.min_lng + {GEO_TABLE}.max_lng) / 2"
+)
+
+
+def has_geo_index(db: SQLDatabase) -> bool:
+    """DB에 좌표 공간 인덱스가 있는지 확인합니다."""
+    return has_table(db, GEO_TABLE)
+
+
+def haversine_m(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    """두 좌표 사이의 대원 거리(m)를 반환합니다."""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(lng2 - lng1)
+    a = (
+        math.sin(d_phi / 2) ** 2
+        + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_M * math.asin(min(1.0, math.sqrt(a)))
+
+
+def bounding_box(
+    lat: float, lng: float, radius_m: float
+) -> tuple[float, float, float, float]:
+    """반경 radius_m 원을 감싸는 (min_lat, max_lat, min_lng, max_lng)를 반환합니다."""
+    d_lat = radius_m / METERS_PER_DEGREE
+    # 극 근처에서 경도 범위가 무한히 커지지 않도록 cos 값의 하한을 둠
+    d_lng = radius_m / (METERS_PER_DEGREE * max(math.cos(math.radians(lat)), 1e-6))
+    return lat - d_lat, lat + d_lat, lng - d_lng, lng + d_lng
+
+
+def restaurant_location(db: SQLDatabase, name: str) -> Optional[dict]:
+    """식당 이름으로 좌표를 찾습니다. (정확히 일치하는 이름을 우선)"""
+    rows = db._execute(
+        f"SELECT restaurants.id, restaurants.name, {POINT} FROM restaurants "
+        f"JOIN {GEO_TABLE} ON {GEO_TABLE}.id = restaurants.id "
+        "WHERE restaurants.name LIKE :pattern "
+        "ORDER BY restaurants.name = :name DESC, length(restaurants.name) LIMIT 1",
+        fetch="cursor",
+        parameters={"name": name, "pattern": f"%{name}%"},
+    ).fetchall()
+    if not rows:
+        return None
+    restaurant_id, restaurant_name, lat, lng = rows[0]
+    return {
+        "restaurant_id": restaurant_id,
+        "name": restaurant_name,
+        "lat": lat,
+        "lng": lng,
+    }
+
+
+def nearby_restaurants(
+    db: SQLDatabase,
+    lat: float,
+    lng: float,
+    radius_m: float = 1000,
+    k: int = 10,
+    exclude_id: Optional[int] = None,
+) -> list[dict]:
+    """
+    좌표에서 radius_m 안에 있는 식당을 가까운 순으로 최대 k개 반환합니다.
+
+    R*Tree 인덱스로 경계 상자 안의 후보만 읽은 뒤,
+    haversine 거리로 정확히 거르고 정렬합니다.
+
+    Returns:
+        list[dict]: [{"restaurant_id", "name", "station_name", "distance_m"}, ...]
+    """
+    min_lat, max_lat, min_lng, max_lng = bounding_box(lat, lng, radius_m)
+    rows = db._execute(
+        "SELECT restaurants.id, restaurants.name, restaurants.station_name, "
+        f"{POINT} FROM {GEO_TABLE} "
+        f"JOIN restaurants ON restaurants.id = {GEO_TABLE}.id "
+        f"WHERE {GEO_TABLE}.max_lat >= :min_lat AND {GEO_TABLE}.min_lat <= :max_lat "
+        f"AND {GEO_TABLE}.max_lng >= :min_lng AND {GEO_TABLE}.min_lng <= :max_lng",
+        fetch="cursor",
+        parameters={
+            "min_lat": min_lat,
+            "max_lat": max_lat,
+            "min_lng": min_lng,
+            "max_lng": max_lng,
+        },
+    ).fetchall()
+
+    results = []
+    for restaurant_id, name, station_name, row_lat, row_lng in rows:
+        if restaurant_id == exclude_id:
+            continue
+        distance = haversine_m(lat, lng, row_lat, row_lng)
+        if distance <= radius_m:
+            results.append(
+                {
+                    "restaurant_id": restaurant_id,
+                    "name": name,
+                    "station_name": station_name,
+                    "distance_m": round(distance),
+                }
+            )
+    results.sort(key=lambda item: item["distance_m"])
+    return results[:k]
+
+
+def has_station_index(db: SQLDatabase) -> bool:
+    """DB에 지하철역-식당 연결 테이블이 있는지 확인합니다."""
+    return has_table(db, STATION_LINK_TABLE)
+
+
+def station_names(station: str) -> list[str]:
+    """'논현', '논현역', '논현역 7호선' 등을 stations.name 후보로 바꿉니다."""
+    name = station.strip().split()[0] if station.strip() else ""
+    if not name:
+        return []
+    return [name] if name.endswith("역") else [name, f"{name}역"]
+
+
+def restaurants_near_station(
+    db: SQLDatabase, station: str, max_distance_m: int = 500, k: int = 20
+) -> list[dict]:
+    """
+    지하철역에서 max_distance_m 안에 있는 식당을 가까운 순으로 최대 k개 반환합니다.
+
+    restaurant_stations에 저장된 거리(가장 가까운 역 기준)를 인덱스로 조회하고,
+    역 좌표가 있으면 공간 인덱스로 다른 역에 연결된 주변 식당도 함께 찾습니다.
+
+    Returns:
+        list[dict]: [{"restaurant_id", "name", "station", "distance_m"}, ...]
+    """
+    names = station_names(station)
+    if not names:
+        return []
+    placeholders = ", ".join(f":name{i}" for i in range(len(names)))
+    parameters = {f"name{i}": name for i, name in enumerate(names)}
+
+    results = {}
+    for restaurant_id, name, station_name, distance in db._execute(
+        "SELECT restaurants.id, restaurants.name, stations.name, "
+        f"{STATION_LINK_TABLE}.distance_m FROM stations "
+        f"JOIN {STATION_LINK_TABLE} ON {STATION_LINK_TABLE}.station_id = stations.id "
+        f"JOIN restaurants ON restaurants.id = {STATION_LINK_TABLE}.restaurant_id "
+        f"WHERE stations.name IN ({placeholders}) "
+        f"AND {STATION_LINK_TABLE}.distance_m <= :max_distance "
+        f"ORDER BY {STATION_LINK_TABLE}.distance_m",
+        fetch="cursor",
+        parameters={**parameters, "max_distance": max_distance_m},
+    ):
+        results[restaurant_id] = {
+            "restaurant_id": restaurant_id,
+            "name": name,
+            "station": station_name,
+            "distance_m": distance,
+        }
+
+    if has_geo_index(db):
+        origins = db._execute(
+            "SELECT name, lat, lng FROM stations "
+            f"WHERE name IN ({placeholders}) AND lat IS NOT NULL AND lng IS NOT NULL",
+            fetch="cursor",
+            parameters=parameters,
+        ).fetchall()
+        for station_name, lat, lng in origins:
+            for nearby in nearby_restaurants(
+                db, lat, lng, radius_m=max_distance_m, k=k
+            ):
+                known = results.get(nearby["restaurant_id"])
+                if known is None or nearby["distance_m"] < known["distance_m"]:
+                    results[nearby["restaurant_id"]] = {
+                        "restaurant_id": nearby["restaurant_id"],
+                        "name": nearby["name"],
+                        "station": station_name,
+                        "distance_m": nearby["distance_m"],
+                    }
+
+    return sorted(results.values(), key=lambda item: item["distance_m"])[:k]
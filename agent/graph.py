@@ -1,19 +1,48 @@
+import asyncio
 import uuid
-from typing import Literal
-
+import weakref
+from typing import Literal, Optional, Union
+
+from agent.answer_builder import (
+    build_answers,
+    build_infos,
+    default_answer,
+    describe_infos,
+    normalize_answers,
+)
+from agent.cache import AnswerCache
+from agent.checkpoint import create_checkpointer
 from agent.config import LLM, State, get_logger
-from agent.prompt_chains import answer_gen, query_check, query_gen
+from agent.db import reload_db_if_changed
+from agent.intent import get_intent_parser
+from agent.metrics import MetricsRegistry, RequestMetrics
+from agent.result_store import parse_preview
+from agent.sql_validator import validate_query
+from agent.prompt_chains import (
+    get_answer_gen,
+    get_answer_summary,
+    get_query_check,
+    get_query_gen,
+    is_schema_current,
+)
 
 # 내부 모듈 import
+from agent.sql_cache import QueryResult
+from agent.streaming import NODE_LABELS, AnswerStreamParser
 from agent.tools import (
     create_tool_node_with_fallback,
     db_query_tool,
-    get_schema_tool,
+    get_db,
+    get_query_cache,
+    get_search_tool_node,
+    get_search_tools,
     list_tables_tool,
+    result_store,
+    schema_tool,
 )
-from langchain_core.messages import AIMessage, HumanMessage
-from langchain_core.runnables import RunnableConfig
-from langgraph.checkpoint.memory import MemorySaver
+from langchain_core.messages import AIMessage, AIMessageChunk, HumanMessage
+from langchain_core.runnables import RunnableConfig, RunnableLambda
+from langgraph.checkpoint.base import BaseCheckpointSaver
 from langgraph.graph import END, START, StateGraph
 
 # 로깅 설정 - graph.log 파일에 로그를 남김
@@ -22,37 +51,92 @@ logger = get_logger()
 
 # 그래프 생성 함수
 class AgentGraph:
-    def __init__(self):
-        """SQL 에이전트 그래프를 생성합니다."""
+    def __init__(
+        self,
+        use_cached_schema: bool = True,
+        answer_cache: Optional[AnswerCache] = None,
+        max_concurrency: int = 8,
+        use_rule_based: bool = True,
+        use_local_validator: bool = True,
+        checkpointer: Union[str, BaseCheckpointSaver, None] = "memory",
+        metrics: Optional[MetricsRegistry] = None,
+    ):
+        """SQL 에이전트 그래프를 생성합니다.
+
+        Args:
+            use_cached_schema (bool): True이면 미리 로드한 스키마로 query_gen부터 시작하고,
+                스키마가 바뀐 경우에만 테이블 탐색 경로(list_tables -> get_schema)를 사용합니다.
+            answer_cache (AnswerCache): 지정하면 정규화된 질문 단위로 run_agent 결과를 캐시합니다.
+            max_concurrency (int): arun_agent로 동시에 실행할 수 있는 최대 질의 수
+            use_rule_based (bool): True이면 '지역/역 + 음식 종류' 형태의 질문을 규칙 기반으로
+                SQL로 변환하여 query_gen/query_check LLM 호출 없이 바로 실행합니다.
+            use_local_validator (bool): True이면 생성된 쿼리를 로컬에서 먼저 검증하고,
+                검증에 실패한 경우에만 query_check LLM을 호출합니다.
+            checkpointer: "memory"(스레드 수/사용 시각으로 크기를 제한하는 메모리),
+                "sqlite"(주기적으로 정리하는 SQLite 파일), None(체크포인터 없이 실행)
+                또는 체크포인터 객체
+            metrics (MetricsRegistry): 요청별 노드 실행 시간, 토큰 사용량, SQL 실행 시간을
+                기록할 레지스트리 (지정하지 않으면 새로 생성)
+        """
+        self.use_cached_schema = use_cached_schema
+        self.answer_cache = answer_cache
+        self.max_concurrency = max_concurrency
+        # 이벤트 루프별 동시 실행 제한용 세마포어
+        self._semaphores = weakref.WeakKeyDictionary()
+        self.use_rule_based = use_rule_based
+        self.use_local_validator = use_local_validator
+        self.metrics = metrics or MetricsRegistry()
         # 새 그래프 생성
         workflow = StateGraph(State)
         # 노드 추가
+        workflow.add_node("rule_based_query", self.rule_based_query)
         workflow.add_node("first_tool_call", self.first_tool_call)
         workflow.add_node(
-            "list_tables_tool", create_tool_node_with_fallback([list_tables_tool])
+            "list_tables_tool",
+            create_tool_node_with_fallback([list_tables_tool]),
         )
 
         # 관련 테이블 선택을 위한 모델 노드 추가
-        self.model_get_schema = LLM().bind_tools([get_schema_tool])
+        self.model_get_schema = LLM("model_get_schema").bind_tools([schema_tool])
         workflow.add_node(
             "model_get_schema",
-            lambda state: {
-                "messages": [self.model_get_schema.invoke(state["messages"])],
-            },
+            RunnableLambda(
+                lambda state: {
+                    "messages": [self.model_get_schema.invoke(state["messages"])],
+                },
+                afunc=self.amodel_get_schema,
+            ),
         )
 
         workflow.add_node(
-            "get_schema_tool", create_tool_node_with_fallback([get_schema_tool])
+            "get_schema_tool",
+            create_tool_node_with_fallback([schema_tool]),
+        )
+        # invoke/ainvoke 모두 지원하도록 동기/비동기 노드를 함께 등록
+        workflow.add_node(
+            "query_gen", RunnableLambda(self.query_gen_node, afunc=self.aquery_gen_node)
+        )
+        workflow.add_node(
+            "correct_query",
+            RunnableLambda(self.model_check_query, afunc=self.amodel_check_query),
         )
-        workflow.add_node("query_gen", self.query_gen_node)
-        workflow.add_node("correct_query", self.model_check_query)
         workflow.add_node(
             "execute_query", create_tool_node_with_fallback([db_query_tool])
         )
+        # 검색 도구는 DB의 검색 테이블/인덱스에 따라 달라지므로 호출할 때마다 현재 도구 노드를 사용
+        workflow.add_node(
+            "search_tools",
+            RunnableLambda(self.search_tools_node, afunc=self.asearch_tools_node),
+        )
+        workflow.add_edge("search_tools", "query_gen")
         workflow.add_node("process_query_result", self.process_query_result)
-        workflow.add_node("generate_answer", self.generate_answer_node)
+        workflow.add_node(
+            "generate_answer",
+            RunnableLambda(self.generate_answer_node, afunc=self.agenerate_answer_node),
+        )
         # 엣지 연결
-        workflow.add_edge(START, "first_tool_call")
+        workflow.add_edge(START, "rule_based_query")
+        workflow.add_conditional_edges("rule_based_query", self.route_rule_based)
         workflow.add_edge("first_tool_call", "list_tables_tool")
         workflow.add_edge("list_tables_tool", "model_get_schema")
         workflow.add_edge("model_get_schema", "get_schema_tool")
@@ -63,8 +147,65 @@ class AgentGraph:
         workflow.add_edge("process_query_result", "query_gen")
         workflow.add_edge("generate_answer", END)
 
-        # 그래프 컴파일
-        self.app = workflow.compile(checkpointer=MemorySaver())
+        # 그래프 컴파일 (질문마다 새 thread_id를 쓰는 단발성 질의는 None으로 충분)
+        self.checkpointer = create_checkpointer(checkpointer)
+        self.app = workflow.compile(checkpointer=self.checkpointer)
+
+    # 관련 테이블 선택 노드 (비동기)
+    async def amodel_get_schema(self, state: State):
+        return {"messages": [await self.model_get_schema.ainvoke(state["messages"])]}
+
+    # 규칙 기반 쿼리 생성 노드 정의
+    def rule_based_query(self, state: State) -> dict[str, list[AIMessage]]:
+        """질문을 규칙 기반으로 해석할 수 있으면 db_query_tool 호출 메시지를 만듭니다."""
+        # 요청을 시작할 때 DB 파일이 교체되었으면 새 스냅샷으로 교체 (확인 간격 제한)
+        reload_db_if_changed()
+        if not self.use_rule_based:
+            return {"messages": []}
+        try:
+            intent_query = get_intent_parser().build_query(
+                state["messages"][-1].content
+            )
+        except Exception as e:
+            logger.error(f"rule_based_query 질문 해석 중 오류: {str(e)}")
+            return {"messages": []}
+        if intent_query is None:
+            return {"messages": []}
+
+        logger.info(f"rule_based_query 규칙 기반 쿼리 사용: {intent_query.sql}")
+        return {
+            "messages": [
+                AIMessage(
+                    content="",
+                    tool_calls=[
+                        {
+                            "name": "db_query_tool",
+                            "args": {
+                                "query": intent_query.sql,
+                                "params": intent_query.params,
+                            },
+                            "id": f"rule_based_{self.random_uuid()}",
+                        }
+                    ],
+                )
+            ]
+        }
+
+    # 규칙 기반 쿼리 사용 여부에 따른 다음 노드 선택
+    def route_rule_based(
+        self, state: State
+    ) -> Literal["execute_query", "query_gen", "first_tool_call"]:
+        last_message = state["messages"][-1]
+        if isinstance(last_message, AIMessage) and last_message.tool_calls:
+            return "execute_query"
+        return self.route_start(state)
+
+    # 시작 노드 선택 (스키마 캐시 사용 여부)
+    def route_start(self, state: State) -> Literal["query_gen", "first_tool_call"]:
+        if self.use_cached_schema and is_schema_current():
+            return "query_gen"
+        logger.info("route_start 스키마 변경 감지, 테이블 탐색 경로로 이동합니다.")
+        return "first_tool_call"
 
     # 첫 번째 도구 호출을 위한 노드 정의
     def first_tool_call(self, state: State) -> dict[str, list[AIMessage]]:
@@ -83,9 +224,9 @@ class AgentGraph:
             ]
         }
 
-    # 쿼리 정확성 체크 함수
-    def model_check_query(self, state: State) -> dict[str, list[AIMessage]]:
-        """쿼리 정확성을 체크하는 함수"""
+    # 쿼리 정확성 체크 입력 구성 함수
+    def check_query_input(self, state: State) -> dict[str, list[AIMessage]]:
+        """query_check 체인에 넘길 입력을 구성합니다."""
         last_message = state["messages"][-1]
         query_content = last_message.content
 
@@ -106,55 +247,123 @@ class AgentGraph:
 
             # 추출된 쿼리로 AIMessage 생성
             query_message = AIMessage(content=query_content)
-            return {"messages": [query_check.invoke({"messages": [query_message]})]}
+            return {"messages": [query_message]}
 
         # 일반적인 경우
-        return {"messages": [query_check.invoke({"messages": [last_message]})]}
+        return {"messages": [last_message]}
 
-    # 쿼리 생성 노드 정의
-    def query_gen_node(self, state: State):
-        try:
-            # 이전 메시지에 이미 쿼리 결과가 있는지 확인
-            for message in reversed(state["messages"][:-1]):  # 마지막 메시지 제외
-                if (
-                    hasattr(message, "name")
-                    and message.name == "db_query_tool"
-                    and hasattr(message, "content")
-                    and not message.content.startswith("Error:")
-                ):
-                    # 쿼리 결과가 있으면 QUERY_EXECUTED_SUCCESSFULLY 반환
-                    return {
-                        "messages": [AIMessage(content="QUERY_EXECUTED_SUCCESSFULLY")]
-                    }
+    # 로컬 쿼리 검증 함수
+    def local_check_query(self, check_input: dict):
+        """로컬 검증을 통과하면 db_query_tool 호출 메시지를, 아니면 None을 반환합니다."""
+        if not self.use_local_validator:
+            return None
+        query = check_input["messages"][-1].content
+        if not isinstance(query, str):
+            return None
+        query = query.replace("```sql", "").replace("```", "").strip()
+
+        is_valid, reason = validate_query(get_db(), query)
+        if not is_valid:
+            logger.info(
+                f"local_check_query 로컬 검증 실패, LLM으로 검증합니다: {reason}"
+            )
+            return None
+        return {
+            "messages": [
+                AIMessage(
+                    content="",
+                    tool_calls=[
+                        {
+                            "name": "db_query_tool",
+                            "args": {"query": query},
+                            "id": f"local_check_{self.random_uuid()}",
+                        }
+                    ],
+                )
+            ]
+        }
 
-            # 쿼리 생성
-            message = query_gen.invoke(state)
-            # 이미 답변 형식이면 그대로 반환
+    # 쿼리 정확성 체크 함수
+    def model_check_query(self, state: State) -> dict[str, list[AIMessage]]:
+        """쿼리 정확성을 체크하는 함수"""
+        check_input = self.check_query_input(state)
+        return self.local_check_query(check_input) or {
+            "messages": [get_query_check().invoke(check_input)]
+        }
+
+    async def amodel_check_query(self, state: State) -> dict[str, list[AIMessage]]:
+        """쿼리 정확성을 체크하는 함수 (비동기)"""
+        check_input = self.check_query_input(state)
+        return self.local_check_query(check_input) or {
+            "messages": [await get_query_check().ainvoke(check_input)]
+        }
+
+    # 이미 실행된 쿼리 결과가 있는지 확인하는 함수
+    def find_executed_query(self, state: State):
+        # 이전 메시지에 이미 쿼리 결과가 있는지 확인
+        for message in reversed(state["messages"][:-1]):  # 마지막 메시지 제외
             if (
-                hasattr(message, "content")
-                and isinstance(message.content, str)
-                and len(message.content) > 50  # 긴 텍스트는 답변으로 간주
-                and not message.content.startswith("SELECT")
+                hasattr(message, "name")
+                and message.name == "db_query_tool"
+                and hasattr(message, "content")
                 and not message.content.startswith("Error:")
             ):
-                # 답변이 "Answer:"로 시작하지 않으면 추가
-                if not message.content.startswith("Answer:"):
-                    message.content = f"Answer: {message.content}"
-                # logger.info(f"query_gen_node 응답: {message.content}")
-                return {"messages": [message]}
+                # 쿼리 결과가 있으면 QUERY_EXECUTED_SUCCESSFULLY 반환
+                return {"messages": [AIMessage(content="QUERY_EXECUTED_SUCCESSFULLY")]}
+        return None
 
-            # 일반적인 쿼리 또는 오류 메시지
+    # 생성된 쿼리 메시지 후처리 함수
+    def format_query_gen_message(self, message):
+        # 이미 답변 형식이면 그대로 반환
+        if (
+            hasattr(message, "content")
+            and isinstance(message.content, str)
+            and len(message.content) > 50  # 긴 텍스트는 답변으로 간주
+            and not message.content.startswith("SELECT")
+            and not message.content.startswith("Error:")
+        ):
+            # 답변이 "Answer:"로 시작하지 않으면 추가
+            if not message.content.startswith("Answer:"):
+                message.content = f"Answer: {message.content}"
+            # logger.info(f"query_gen_node 응답: {message.content}")
             return {"messages": [message]}
 
+        # 일반적인 쿼리 또는 오류 메시지
+        return {"messages": [message]}
+
+    # 쿼리 생성 오류 메시지
+    def query_gen_error(self, e: Exception):
+        logger.error(f"query_gen_node 쿼리 생성 중 오류: {str(e)}")
+        return {
+            "messages": [
+                AIMessage(content=f"Error: 쿼리 생성 중 오류가 발생했습니다: {str(e)}")
+            ]
+        }
+
+    # 쿼리 생성 노드 정의
+    def query_gen_node(self, state: State):
+        try:
+            executed = self.find_executed_query(state)
+            if executed:
+                return executed
+
+            # 쿼리 생성
+            return self.format_query_gen_message(get_query_gen().invoke(state))
+
         except Exception as e:
-            logger.error(f"query_gen_node 쿼리 생성 중 오류: {str(e)}")
-            return {
-                "messages": [
-                    AIMessage(
-                        content=f"Error: 쿼리 생성 중 오류가 발생했습니다: {str(e)}"
-                    )
-                ]
-            }
+            return self.query_gen_error(e)
+
+    async def aquery_gen_node(self, state: State):
+        try:
+            executed = self.find_executed_query(state)
+            if executed:
+                return executed
+
+            # 쿼리 생성
+            return self.format_query_gen_message(await get_query_gen().ainvoke(state))
+
+        except Exception as e:
+            return self.query_gen_error(e)
 
     # 쿼리 실행 결과를 처리하는 노드
     def process_query_result(self, state: State):
@@ -182,85 +391,227 @@ class AgentGraph:
         )
         return {"messages": [last_message]}
 
-    # 답변 생성 노드 정의
-    def generate_answer_node(self, state: State):
-        try:
-            # 쿼리 결과 찾기
-            query_result = None
-            for message in reversed(state["messages"]):
-                if (
-                    hasattr(message, "name")
-                    and message.name == "db_query_tool"
-                    and hasattr(message, "content")
-                    and not message.content.startswith("Error:")
-                ):
-                    query_result = message.content
+    # 마지막으로 성공한 쿼리 실행 결과 메시지를 찾는 함수
+    def find_query_message(self, state: State):
+        for message in reversed(state["messages"]):
+            if (
+                getattr(message, "name", None) == "db_query_tool"
+                and isinstance(message.content, str)
+                and not message.content.startswith("Error:")
+            ):
+                return message
+        return None
+
+    # 마지막으로 성공한 쿼리의 전체 결과를 찾는 함수
+    def find_query_result(self, state: State) -> Optional[QueryResult]:
+        """
+        db_query_tool 응답의 result_id로 저장소에서 전체 결과를 찾습니다.
+
+        저장소에서 제거된 경우(LRU, 재시작 후 체크포인트 복원 등)에는
+        tool_call_id로 실행된 쿼리를 찾아 다시 조회합니다.
+        """
+        message = self.find_query_message(state)
+        if message is None:
+            return None
+
+        preview = parse_preview(message.content)
+        stored = result_store.get(preview["result_id"]) if preview else None
+        if stored is not None:
+            return stored.result
+
+        tool_call_id = getattr(message, "tool_call_id", None)
+        query, params = None, ()
+        for previous in reversed(state["messages"]):
+            for tool_call in getattr(previous, "tool_calls", None) or []:
+                if tool_call.get("id") == tool_call_id:
+                    query = tool_call["args"].get("query")
+                    params = tool_call["args"].get("params") or ()
                     break
+            if query:
+                break
+        if not query:
+            return None
+        try:
+            query_cache = get_query_cache()
+            return query_cache.get(query, params) or query_cache.run(query, params)
+        except Exception as e:
+            logger.error(f"find_query_result 쿼리 재실행 중 오류: {str(e)}")
+            return None
 
-            if not query_result:
-                return {
-                    "messages": [
-                        AIMessage(
-                            content="Answer: 죄송합니다, 쿼리 결과를 찾을 수 없습니다."
-                        )
-                    ]
+    # 답변 생성 입력 구성 함수
+    def answer_input(self, state: State):
+        """
+        answer_gen 체인에 넘길 입력을 구성합니다.
+
+        Returns:
+            tuple: (answer_gen 입력, None) 또는 쿼리 결과가 없을 때 (None, 노드 반환값)
+        """
+        # 쿼리 결과 찾기 (메시지에는 미리보기만 있으므로 저장소의 전체 결과 사용)
+        query_result = None
+        message = self.find_query_message(state)
+        if message is not None:
+            result = self.find_query_result(state)
+            query_result = result.to_text() if result else message.content
+
+        if not query_result:
+            return None, {
+                "messages": [
+                    AIMessage(
+                        content="Answer: 죄송합니다, 쿼리 결과를 찾을 수 없습니다."
+                    )
+                ]
+            }
+
+        # 사용자 질문 찾기
+        user_question = None
+        for message in state["messages"]:
+            if hasattr(message, "type") and message.type == "human":
+                user_question = message.content
+                break
+
+        # 답변 생성을 위한 컨텍스트 구성
+        answer_context = {
+            "messages": [
+                {
+                    "role": "user",
+                    "content": f"질문: {user_question}\n\n쿼리 결과: {query_result}",
                 }
+            ]
+        }
+        return {"messages": answer_context["messages"]}, None
 
-            # 사용자 질문 찾기
-            user_question = None
-            for message in state["messages"]:
-                if hasattr(message, "type") and message.type == "human":
-                    user_question = message.content
-                    break
+    # 요약 답변 생성 입력 구성 함수
+    def summary_input(self, state: State):
+        """
+        마지막으로 성공한 db_query_tool 호출의 쿼리 결과 행으로 식당 정보를 직접 구성하고,
+        answer_summary 체인에 넘길 입력을 만듭니다.
+
+        Returns:
+            tuple: (answer_summary 입력, Info 목록) 또는 구성할 수 없으면 None
+        """
+        result = self.find_query_result(state)
+        if result is None:
+            return None
+        try:
+            infos = build_infos(result)
+        except Exception as e:
+            logger.error(f"summary_input 쿼리 결과 구성 중 오류: {str(e)}")
+            return None
+        if not infos:
+            return None
+
+        user_question = next(
+            (
+                m.content
+                for m in state["messages"]
+                if getattr(m, "type", None) == "human"
+            ),
+            "",
+        )
+        return {
+            "question": user_question,
+            "count": len(infos),
+            "restaurants": describe_infos(infos),
+        }, infos
+
+    # 답변 생성 결과 후처리 함수
+    def format_answer(self, llm_response):
+        if hasattr(llm_response, "content"):
+            content = llm_response.content
+            if isinstance(content, dict) and "answer" in content:
+                # 답변용 메타데이터를 담은 content를 특별 처리
+                # 이 데이터는 직접 반환하지 않고 AIMessage의 additional_kwargs에 저장
+                answer_msg = AIMessage(content=f"Answer: {content['answer']}")
+                answer_msg.additional_kwargs["result_data"] = normalize_answers(content)
+                return {"messages": [answer_msg]}
+            else:
+                # 일반 텍스트 응답
+                if isinstance(content, str) and not content.startswith("Answer:"):
+                    content = f"Answer: {content}"
+                return {"messages": [AIMessage(content=content)]}
+
+        # JSON 형식의 딕셔너리인 경우 (직접 반환된 경우)
+        elif isinstance(llm_response, dict) and "answer" in llm_response:
+            # 답변용 메타데이터를 담은 딕셔너리
+            answer_msg = AIMessage(content=f"Answer: {llm_response['answer']}")
+            answer_msg.additional_kwargs["result_data"] = normalize_answers(
+                llm_response
+            )
+            return {"messages": [answer_msg]}
+
+        # 기타 타입 (문자열, 리스트 등)
+        else:
+            content = (
+                str(llm_response) if llm_response else "응답을 생성할 수 없습니다."
+            )
+            if not content.startswith("Answer:"):
+                content = f"Answer: {content}"
+            return {"messages": [AIMessage(content=content)]}
+
+    # 답변 생성 노드 정의
+    def generate_answer_node(self, state: State):
+        try:
+            answer_input, early_return = self.answer_input(state)
+            if early_return:
+                return early_return
+
+            # 쿼리 결과로 식당 정보를 직접 구성하고 LLM은 요약 답변만 생성
+            structured = self.summary_input(state)
+            if structured:
+                summary_input, infos = structured
+                try:
+                    answer = get_answer_summary().invoke(summary_input).strip()
+                except Exception as e:
+                    logger.error(
+                        f"generate_answer_node 요약 답변 생성 중 오류: {str(e)}"
+                    )
+                    answer = ""
+                return self.format_answer(
+                    build_answers(answer or default_answer(infos), infos)
+                )
 
-            # 답변 생성을 위한 컨텍스트 구성
             try:
-                # 답변 생성 시도
-                answer_context = {
-                    "messages": [
-                        {
-                            "role": "user",
-                            "content": f"질문: {user_question}\n\n쿼리 결과: {query_result}",
-                        }
-                    ]
-                }
                 # 직접 LLM 호출 후 결과 처리
-                llm_response = answer_gen.invoke(
-                    {"messages": answer_context["messages"]}
-                )
-                if hasattr(llm_response, "content"):
-                    content = llm_response.content
-                    if isinstance(content, dict) and "answer" in content:
-                        # 답변용 메타데이터를 담은 content를 특별 처리
-                        # 이 데이터는 직접 반환하지 않고 AIMessage의 additional_kwargs에 저장
-                        answer_msg = AIMessage(content=f"Answer: {content['answer']}")
-                        answer_msg.additional_kwargs["result_data"] = content
-                        return {"messages": [answer_msg]}
-                    else:
-                        # 일반 텍스트 응답
-                        if isinstance(content, str) and not content.startswith(
-                            "Answer:"
-                        ):
-                            content = f"Answer: {content}"
-                        return {"messages": [AIMessage(content=content)]}
-
-                # JSON 형식의 딕셔너리인 경우 (직접 반환된 경우)
-                elif isinstance(llm_response, dict) and "answer" in llm_response:
-                    # 답변용 메타데이터를 담은 딕셔너리
-                    answer_msg = AIMessage(content=f"Answer: {llm_response['answer']}")
-                    answer_msg.additional_kwargs["result_data"] = llm_response
-                    return {"messages": [answer_msg]}
-
-                # 기타 타입 (문자열, 리스트 등)
-                else:
-                    content = (
-                        str(llm_response)
-                        if llm_response
-                        else "응답을 생성할 수 없습니다."
+                return self.format_answer(get_answer_gen().invoke(answer_input))
+
+            except Exception as e:
+                # LLM 호출 실패 시 기본 응답
+                content = f"Answer: 죄송합니다, 쿼리 결과를 해석하는 중 오류가 발생했습니다: {str(e)}"
+                return {"messages": [AIMessage(content=content)]}
+
+        except Exception as e:
+            return {
+                "messages": [
+                    AIMessage(
+                        content=f"Answer: 죄송합니다, 답변 생성 중 오류가 발생했습니다: {str(e)}"
                     )
-                    if not content.startswith("Answer:"):
-                        content = f"Answer: {content}"
-                    return {"messages": [AIMessage(content=content)]}
+                ]
+            }
+
+    async def agenerate_answer_node(self, state: State):
+        try:
+            answer_input, early_return = self.answer_input(state)
+            if early_return:
+                return early_return
+
+            # 쿼리 결과로 식당 정보를 직접 구성하고 LLM은 요약 답변만 생성
+            structured = self.summary_input(state)
+            if structured:
+                summary_input, infos = structured
+                try:
+                    answer = (await get_answer_summary().ainvoke(summary_input)).strip()
+                except Exception as e:
+                    logger.error(
+                        f"agenerate_answer_node 요약 답변 생성 중 오류: {str(e)}"
+                    )
+                    answer = ""
+                return self.format_answer(
+                    build_answers(answer or default_answer(infos), infos)
+                )
+
+            try:
+                # 직접 LLM 호출 후 결과 처리
+                return self.format_answer(await get_answer_gen().ainvoke(answer_input))
 
             except Exception as e:
                 # LLM 호출 실패 시 기본 응답
@@ -276,13 +627,28 @@ class AgentGraph:
                 ]
             }
 
+    # 검색 도구 실행 노드 (DB가 교체되면 registry가 새 도구 노드를 만듦)
+    def search_tools_node(self, state: State, config: RunnableConfig):
+        return get_search_tool_node().invoke(state, config)
+
+    async def asearch_tools_node(self, state: State, config: RunnableConfig):
+        return await get_search_tool_node().ainvoke(state, config)
+
     # 조건부 엣지 정의
     def should_continue(
         self,
         state: State,
-    ) -> Literal[END, "correct_query", "query_gen", "generate_answer"]:
+    ) -> Literal[END, "correct_query", "query_gen", "generate_answer", "search_tools"]:
         last_message = state["messages"][-1]
 
+        # 0) query_gen이 검색 도구를 호출한 경우 검색 도구 노드로 이동
+        if (
+            isinstance(last_message, AIMessage)
+            and last_message.tool_calls
+            and get_search_tools()
+        ):
+            return "search_tools"
+
         # 메시지 내용이 있는 경우
         if hasattr(last_message, "content") and isinstance(last_message.content, str):
             # 1) SQL 쿼리인 경우 쿼리 검증 노드로 이동
@@ -333,32 +699,216 @@ class AgentGraph:
         Returns:
             dict: 에이전트 실행 결과
         """
+        request = self.metrics.start(query)
+        # 캐시된 결과가 있으면 그래프를 실행하지 않음
+        if self.answer_cache:
+            cached = self.answer_cache.get(query)
+            if cached is not None:
+                logger.info("run_agent 캐시된 결과를 반환합니다.")
+                self.metrics.finish(request, cached=True)
+                return cached
+
         try:
             # app 호출
             result = self.app.invoke(
-                {"messages": [HumanMessage(content=query)]},
-                RunnableConfig(
-                    recursion_limit=30, configurable={"thread_id": self.random_uuid()}
-                ),
+                {"messages": [HumanMessage(content=query)]}, self.run_config(request)
             )
-            # 결과 처리
-            if "messages" in result and result["messages"]:
-                last_message = result["messages"][-1]
-
-                # AIMessage의 additional_kwargs에 result_data가 있는 경우 처리
-                if (
-                    hasattr(last_message, "additional_kwargs")
-                    and "result_data" in last_message.additional_kwargs
-                ):
-                    return last_message.additional_kwargs["result_data"]
-
-            # 적절한 결과가 없는 경우
-            else:
-                return {
-                    "answer": "응답을 처리하는 중 오류가 발생했습니다.",
-                    "infos": [],
-                }
+            return self.finish_request(request, self.finish_result(query, result))
 
         except Exception as e:
             logger.error(f"run_agent 에이전트 실행 중 오류: {str(e)}")
-            return {"error": str(e)}
+            return self.finish_request(request, {"error": str(e)})
+
+    def run_config(self, request: RequestMetrics) -> RunnableConfig:
+        """그래프 실행 설정 (질의마다 새 thread_id, 지표 수집 콜백)을 생성합니다."""
+        return RunnableConfig(
+            recursion_limit=30,
+            configurable={"thread_id": self.random_uuid()},
+            callbacks=[request],
+        )
+
+    def finish_request(self, request: RequestMetrics, result):
+        """요청 지표 기록을 마치고 결과를 그대로 반환합니다."""
+        status = "error" if isinstance(result, dict) and "error" in result else "ok"
+        self.metrics.finish(request, status=status)
+        return result
+
+    def get_semaphore(self) -> asyncio.Semaphore:
+        """현재 이벤트 루프에서 사용할 동시 실행 제한 세마포어를 반환합니다."""
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._semaphores[loop] = semaphore
+        return semaphore
+
+    async def arun_agent(self, query: str):
+        """
+        run_agent의 비동기 버전입니다. 모든 노드를 ainvoke로 실행하며,
+        동시에 실행되는 질의 수는 max_concurrency로 제한됩니다.
+
+        Args:
+            query (str): 사용자 질의
+
+        Returns:
+            dict: 에이전트 실행 결과
+        """
+        request = self.metrics.start(query)
+        # 캐시된 결과가 있으면 그래프를 실행하지 않음
+        if self.answer_cache:
+            cached = self.answer_cache.get(query)
+            if cached is not None:
+                logger.info("arun_agent 캐시된 결과를 반환합니다.")
+                self.metrics.finish(request, cached=True)
+                return cached
+
+        try:
+            async with self.get_semaphore():
+                result = await self.app.ainvoke(
+                    {"messages": [HumanMessage(content=query)]},
+                    self.run_config(request),
+                )
+            return self.finish_request(request, self.finish_result(query, result))
+
+        except Exception as e:
+            logger.error(f"arun_agent 에이전트 실행 중 오류: {str(e)}")
+            return self.finish_request(request, {"error": str(e)})
+
+    async def arun_many(self, queries: list[str]) -> list:
+        """여러 질의를 동시에 실행하고 입력 순서대로 결과를 반환합니다."""
+        return await asyncio.gather(*(self.arun_agent(query) for query in queries))
+
+    def stream_agent(self, query: str):
+        """
+        에이전트를 스트리밍 모드로 실행합니다.
+
+        Yields:
+            dict: 진행 상황 이벤트
+                - {"type": "progress", "node": 노드 이름, "message": 진행 메시지}
+                - {"type": "answer", "text": 지금까지의 답변, "delta": 새로 생성된 부분}
+                - {"type": "info", "index": 순번, "info": 식당 정보}
+                - {"type": "result", "data": run_agent와 같은 최종 결과}
+        """
+        parser = AnswerStreamParser()
+        request = self.metrics.start(query)
+        if self.answer_cache:
+            cached = self.answer_cache.get(query)
+            if cached is not None:
+                logger.info("stream_agent 캐시된 결과를 반환합니다.")
+                self.metrics.finish(request, cached=True)
+                yield from parser.finish(cached)
+                yield {"type": "result", "data": cached}
+                return
+
+        last_message = None
+        try:
+            for mode, payload in self.app.stream(
+                {"messages": [HumanMessage(content=query)]},
+                self.run_config(request),
+                stream_mode=["updates", "messages"],
+            ):
+                events, message = self.stream_events(mode, payload, parser)
+                last_message = message or last_message
+                yield from events
+
+            result = self.finish_result(query, {"messages": [last_message]})
+        except Exception as e:
+            logger.error(f"stream_agent 에이전트 실행 중 오류: {str(e)}")
+            result = {"error": str(e)}
+        self.finish_request(request, result)
+
+        if isinstance(result, dict):
+            yield from parser.finish(result)
+        yield {"type": "result", "data": result}
+
+    async def astream_agent(self, query: str):
+        """stream_agent의 비동기 버전입니다. 이벤트 형식은 stream_agent와 같습니다."""
+        parser = AnswerStreamParser()
+        request = self.metrics.start(query)
+        if self.answer_cache:
+            cached = self.answer_cache.get(query)
+            if cached is not None:
+                logger.info("astream_agent 캐시된 결과를 반환합니다.")
+                self.metrics.finish(request, cached=True)
+                for event in parser.finish(cached):
+                    yield event
+                yield {"type": "result", "data": cached}
+                return
+
+        last_message = None
+        try:
+            async with self.get_semaphore():
+                async for mode, payload in self.app.astream(
+                    {"messages": [HumanMessage(content=query)]},
+                    self.run_config(request),
+                    stream_mode=["updates", "messages"],
+                ):
+                    events, message = self.stream_events(mode, payload, parser)
+                    last_message = message or last_message
+                    for event in events:
+                        yield event
+
+            result = self.finish_result(query, {"messages": [last_message]})
+        except Exception as e:
+            logger.error(f"astream_agent 에이전트 실행 중 오류: {str(e)}")
+            result = {"error": str(e)}
+        self.finish_request(request, result)
+
+        if isinstance(result, dict):
+            for event in parser.finish(result):
+                yield event
+        yield {"type": "result", "data": result}
+
+    def stream_events(self, mode: str, payload, parser: AnswerStreamParser):
+        """
+        그래프 스트림 항목 하나를 이벤트 목록으로 변환합니다.
+
+        Returns:
+            tuple: (이벤트 목록, 노드가 마지막으로 반환한 메시지 또는 None)
+        """
+        events = []
+        last_message = None
+        if mode == "updates":
+            for node, update in payload.items():
+                events.append(
+                    {
+                        "type": "progress",
+                        "node": node,
+                        "message": NODE_LABELS.get(node, node),
+                    }
+                )
+                if update and update.get("messages"):
+                    last_message = update["messages"][-1]
+        elif mode == "messages":
+            # generate_answer 노드의 LLM 토큰만 답변으로 사용
+            chunk, metadata = payload
+            if (
+                metadata.get("langgraph_node") == "generate_answer"
+                and isinstance(chunk, AIMessageChunk)
+                and isinstance(chunk.content, str)
+            ):
+                events.extend(parser.feed(chunk.content))
+        return events, last_message
+
+    def finish_result(self, query: str, result: dict):
+        """그래프 실행 결과에서 최종 응답을 꺼내고, 정상 응답이면 캐시에 저장합니다."""
+        # 결과 처리
+        if "messages" in result and result["messages"]:
+            last_message = result["messages"][-1]
+
+            # AIMessage의 additional_kwargs에 result_data가 있는 경우 처리
+            if (
+                hasattr(last_message, "additional_kwargs")
+                and "result_data" in last_message.additional_kwargs
+            ):
+                result_data = last_message.additional_kwargs["result_data"]
+                if self.answer_cache and result_data.get("infos"):
+                    self.answer_cache.set(query, result_data)
+                return result_data
+
+        # 적절한 결과가 없는 경우
+        else:
+            return {
+                "answer": "응답을 처리하는 중 오류가 발생했습니다.",
+                "infos": [],
+            }
@@ -0,0 +1,135 @@
+"""
+meokten.py 시작 시 import 시간 측정
+
+새 파이썬 프로세스에서 meokten.py가 import 하는 모듈을 불러오며 시간을 재고,
+-X importtime 결과로 오래 걸린 모듈을 보여줍니다.
+DB 경로와 API 키 없이 실행하여 import 시점에 DB 연결이나 LLM 클라이언트 등
+레지스트리 리소스를 만들지 않는지도 함께 확인합니다.
+
+사용 예:
+    python -m agent.import_budget
+    python -m agent.import_budget --budget 3 --top 15 --json
+"""
+
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+
+# meokten.py가 시작할 때 import 하는 모듈
+STARTUP_MODULES = [
+    "streamlit",
+    "dotenv",
+    "streamlit_folium",
+    "agent.cache",
+    "agent.config",
+    "agent.graph",
+    "utils.map_utils",
+]
+
+# import 시간 예산 (초)
+IMPORT_BUDGET_SECONDS = float(os.getenv("MEOKTEN_IMPORT_BUDGET", "3.0"))
+
+# -X importtime 출력 (import time: self [us] | cumulative | imported package)
+IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)")
+
+# 자식 프로세스에서 실행할 코드
+MEASURE_CODE = """
+import importlib, json, sys, time
+missing, seconds = [], {}
+started = time.perf_counter()
+for name in sys.argv[1:]:
+    module_started = time.perf_counter()
+    try:
+        importlib.import_module(name)
+    except ImportError as e:
+        missing.append(f"{name}: {e}")
+    seconds[name] = time.perf_counter() - module_started
+total = time.perf_counter() - started
+from agent.registry import registry
+built = [name for name, stat in registry.stats().items() if stat["built"]]
+print(json.dumps({"total": total, "modules": seconds, "missing": missing, "built": built}))
+"""
+
+
+def measure(modules: list[str] = STARTUP_MODULES) -> dict:
+    """
+    새 프로세스에서 모듈을 import 하며 시간을 측정합니다.
+
+    Returns:
+        dict: total(초), modules(모듈별 초), missing(설치되지 않은 모듈),
+            built(import 중 생성된 레지스트리 리소스), slowest(누적 시간이 긴 모듈 목록)
+    """
+    env = dict(os.environ)
+    # DB와 API 키 없이도 import가 되어야 함
+    env.pop("OPENAI_API_KEY", None)
+    env["MEOKTEN_DB_PATH"] = os.path.join("nonexistent", "meokten.db")
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", MEASURE_CODE, *modules],
+        capture_output=True,
+        text=True,
+        env=env,
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(completed.stderr.strip().splitlines()[-1])
+    report = json.loads(completed.stdout.strip().splitlines()[-1])
+
+    slowest = []
+    for line in completed.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            _, cumulative, indent, name = match.groups()
+            slowest.append(
+                {
+                    "module": name,
+                    "seconds": int(cumulative) / 1_000_000,
+                    "depth": len(indent) // 2,
+                }
+            )
+    report["slowest"] = sorted(slowest, key=lambda m: m["seconds"], reverse=True)
+    return report
+
+
+def print_report(report: dict, budget: float, top: int):
+    status = "OK" if report["total"] <= budget else "OVER BUDGET"
+    print(f"[{status}] import 시간 {report['total']:.2f}초 (예산 {budget:.2f}초)")
+    for name, seconds in report["modules"].items():
+        print(f"    {name:<20} {seconds:.3f}초")
+    if report["missing"]:
+        print("설치되지 않은 모듈:")
+        for missing in report["missing"]:
+            print(f"    {missing}")
+    print(f"누적 import 시간이 긴 모듈 (상위 {top}개):")
+    for module in report["slowest"][:top]:
+        print(
+            f"    {module['seconds']:.3f}초  {'  ' * module['depth']}{module['module']}"
+        )
+    if report["built"]:
+        print(f"import 중 생성된 리소스: {', '.join(report['built'])}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="meokten.py 시작 import 시간 측정")
+    parser.add_argument(
+        "--budget", type=float, default=IMPORT_BUDGET_SECONDS, help="예산(초)"
+    )
+    parser.add_argument("--top", type=int, default=10, help="표시할 느린 모듈 수")
+    parser.add_argument("--json", action="store_true", help="JSON으로 출력")
+    args = parser.parse_args()
+
+    report = measure()
+    if args.json:
+        report["slowest"] = report["slowest"][: args.top]
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+    else:
+        print_report(report, args.budget, args.top)
+    # 예산 초과 또는 import 시점에 리소스를 만든 경우 실패
+    if report["total"] > args.budget or report["built"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,296 @@
+import re
+import threading
+from dataclasses import dataclass, field
+from typing import Optional
+
+from langchain_community.utilities import SQLDatabase
+
+from agent.cache import SYNONYMS, normalize_question
+from agent.config import get_logger
+from agent.db import DB_PATH, get_db, get_db_version
+from agent.registry import registry
+
+# 로깅 설정
+logger = get_logger()
+
+# 시/도 정식 명칭 -> 주소 검색에 사용할 약칭
+SIDO_ALIASES = {
+    "서울특별시": "서울",
+    "부산광역시": "부산",
+    "대구광역시": "대구",
+    "인천광역시": "인천",
+    "광주광역시": "광주",
+    "대전광역시": "대전",
+    "울산광역시": "울산",
+    "세종특별자치시": "세종",
+    "경기도": "경기",
+    "강원도": "강원",
+    "강원특별자치도": "강원",
+    "충청북도": "충북",
+    "충청남도": "충남",
+    "전라북도": "전북",
+    "전북특별자치도": "전북",
+    "전라남도": "전남",
+    "경상북도": "경북",
+    "경상남도": "경남",
+    "제주특별자치도": "제주",
+}
+
+# 사용자 표현 -> menu_type (DB에 있는 값으로 다시 확인)
+MENU_TYPE_ALIASES = {
+    "중국": "중식",
+    "일본": "일식",
+    "일본식": "일식",
+    "멕시코": "멕시칸",
+    "멕시칸음식": "멕시칸",
+    "양식당": "양식",
+    "고기집": "고기",
+    "횟집": "회",
+}
+
+# 검색 조건에 영향을 주지 않는 단어
+FILLER_WORDS = {
+    "맛집",
+    "가게",
+    "집",
+    "곳",
+    "데",
+    "음식",
+    "요리",
+    "메뉴",
+    "맛있는",
+    "유명한",
+    "잘하는",
+    "괜찮은",
+    "먹을만한",
+    "가볼만한",
+    "추천한",
+    "소개한",
+    "나온",
+    "다녀간",
+}
+
+# 주소 토큰 끝의 행정구역 접미사
+REGION_SUFFIX = re.compile(
+    r"(특별자치시|특별자치도|특별시|광역시|시|도|구|군|동|읍|면)$"
+)
+
+# 지역 별칭이 가리킬 수 있는 restaurants 컬럼 (data_collect/save_db.py의 migrate_regions)
+REGION_LEVELS = ("sido", "sigungu", "dong", "road")
+
+# 기본 검색 쿼리 (restaurants와 menus를 JOIN 하여 모든 컬럼 조회)
+BASE_QUERY = (
+    "SELECT * FROM restaurants JOIN menus ON restaurants.id = menus.restaurant_id"
+)
+# 식당 카드 테이블이 있으면 식당당 한 행(메뉴/후기를 이어 붙인 형태)으로 조회
+CARD_QUERY = "SELECT * FROM restaurant_cards"
+
+
+@dataclass
+class Intent:
+    """질문에서 추출한 검색 조건"""
+
+    station: Optional[str] = None
+    regions: list = field(default_factory=list)
+    menu_type: Optional[str] = None
+
+    def is_empty(self) -> bool:
+        return not (self.station or self.regions or self.menu_type)
+
+
+@dataclass
+class IntentQuery:
+    """
+    파라미터 바인딩 형태의 SQL (? 자리표시자 + 파라미터 목록)
+
+    db_query_tool의 params로 넘기면 쿼리 실행 시 그대로 바인딩합니다.
+    """
+
+    sql: str
+    params: list = field(default_factory=list)
+
+
+def station_base_name(station_name: str) -> Optional[str]:
+    """'논현역 7호선(230m)' 형식에서 '논현역'을 추출합니다."""
+    match = re.match(r"\s*([^\s(]+역)", station_name or "")
+    return match.group(1) if match else None
+
+
+class IntentParser:
+    """
+    DB에 있는 주소 토큰, 지하철역 이름, menu_type 값으로 사전을 만들어
+    '지역/역 + 음식 종류' 형태의 질문을 LLM 없이 SQL로 변환합니다.
+
+    사전에 없는 단어가 남으면 확신할 수 없는 질문으로 보고 None을 반환하여
+    LLM 그래프가 처리하도록 합니다.
+    """
+
+    def __init__(self, db: SQLDatabase, db_path: str = DB_PATH):
+        self.db = db
+        self.db_path = db_path
+        self.stations = set()
+        # 주소 토큰 -> 검색할 토큰 (region_aliases가 있으면 별칭 -> [(컬럼, 값), ...])
+        self.regions = {}
+        self.menu_types = set()
+        # 정규화 컬럼(station_key, menu_type_key)이 있으면 인덱스를 타는 = 조건 사용
+        self.use_keys = False
+        # 지역 컬럼(sido, sigungu, dong, road)이 있으면 address LIKE 대신 = 조건 사용
+        self.use_regions = False
+        # 식당 카드 테이블(restaurant_cards)이 있으면 JOIN 대신 카드 테이블 조회
+        self.use_cards = False
+        self._db_version = None
+        self._lock = threading.Lock()
+
+    def load(self):
+        """DB에서 사전을 다시 만듭니다. DB 파일이 바뀌지 않았으면 생략합니다."""
+        version = get_db_version(self.db_path)
+        with self._lock:
+            if version == self._db_version:
+                return
+            stations = set()
+            regions = {}
+            menu_types = set()
+
+            for (station_name,) in self.db._execute(
+                "SELECT DISTINCT station_name FROM restaurants", fetch="cursor"
+            ):
+                name = station_base_name(station_name)
+                if name:
+                    stations.add(name)
+
+            tables = {
+                name
+                for (name,) in self.db._execute(
+                    "SELECT name FROM sqlite_master WHERE type = 'table'",
+                    fetch="cursor",
+                )
+            }
+            use_regions = "region_aliases" in tables
+            if use_regions:
+                for alias, level, value in self.db._execute(
+                    "SELECT alias, level, value FROM region_aliases", fetch="cursor"
+                ):
+                    if level in REGION_LEVELS:
+                        regions.setdefault(alias, []).append((level, value))
+            else:
+                for (address,) in self.db._execute(
+                    "SELECT address FROM restaurants", fetch="cursor"
+                ):
+                    for token in (address or "").split():
+                        token = SIDO_ALIASES.get(token, token)
+                        if not re.search(r"[가-힣]", token) or "(" in token:
+                            continue
+                        regions[token] = token
+                        # '강남구' -> '강남'처럼 접미사를 뗀 형태도 같은 지역으로 취급
+                        stem = REGION_SUFFIX.sub("", token)
+                        if len(stem) >= 2:
+                            regions.setdefault(stem, token)
+
+            for (menu_type,) in self.db._execute(
+                "SELECT DISTINCT menu_type FROM menus", fetch="cursor"
+            ):
+                if menu_type:
+                    menu_types.add(menu_type.strip())
+
+            columns = {
+                table: {
+                    row[1]
+                    for row in self.db._execute(
+                        f"PRAGMA table_info({table})", fetch="cursor"
+                    )
+                }
+                for table in ("restaurants", "menus")
+            }
+
+            self.stations, self.regions, self.menu_types = (
+                stations,
+                regions,
+                menu_types,
+            )
+            self.use_keys = (
+                "station_key" in columns["restaurants"]
+                and "menu_type_key" in columns["menus"]
+            )
+            self.use_regions = use_regions
+            self.use_cards = "restaurant_cards" in tables
+            self._db_version = version
+            logger.info(
+                f"IntentParser 사전 생성 완료 (역 {len(stations)}개, 지역 {len(regions)}개, "
+                f"메뉴 종류 {len(menu_types)}개)"
+            )
+
+    def parse(self, question: str) -> Optional[Intent]:
+        """질문을 검색 조건으로 변환합니다. 확신할 수 없으면 None을 반환합니다."""
+        self.load()
+        intent = Intent()
+        for token in normalize_question(question, self.regions).split():
+            if token in FILLER_WORDS:
+                continue
+            menu_type = MENU_TYPE_ALIASES.get(token, SYNONYMS.get(token, token))
+            if token in self.stations and not intent.station:
+                intent.station = token
+            elif menu_type in self.menu_types and not intent.menu_type:
+                intent.menu_type = menu_type
+            elif token in self.regions:
+                # '강남' -> '강남구'처럼 주소에 실제로 쓰인 형태로 검색
+                intent.regions.append(self.regions[token])
+            else:
+                return None
+
+        if intent.is_empty():
+            return None
+        return intent
+
+    def build_query(self, question: str) -> Optional[IntentQuery]:
+        """질문을 파라미터 바인딩 SQL로 변환합니다. 변환할 수 없으면 None을 반환합니다."""
+        intent = self.parse(question)
+        if intent is None:
+            return None
+
+        table, id_column = (
+            ("restaurant_cards", "restaurant_id")
+            if self.use_cards
+            else ("restaurants", "id")
+        )
+        conditions = []
+        params = []
+        if intent.station and self.use_keys:
+            conditions.append(f"{table}.station_key = ?")
+            params.append(intent.station)
+        elif intent.station:
+            conditions.append(f"{table}.station_name LIKE ?")
+            params.append(f"%{intent.station}%")
+        for region in intent.regions:
+            if self.use_regions:
+                # 별칭이 여러 지역을 가리키면(예: '중구') OR 조건으로 모두 검색
+                conditions.append(
+                    "("
+                    + " OR ".join(f"{table}.{level} = ?" for level, _ in region)
+                    + ")"
+                )
+                params.extend(value for _, value in region)
+            else:
+                conditions.append(f"{table}.address LIKE ?")
+                params.append(f"%{region}%")
+        # 해당 종류의 메뉴가 있는 식당의 모든 메뉴를 조회
+        if intent.menu_type and self.use_keys:
+            conditions.append(
+                f"{table}.{id_column} IN "
+                "(SELECT restaurant_id FROM menus WHERE menu_type_key = ?)"
+            )
+            params.append(intent.menu_type.lower())
+        elif intent.menu_type:
+            conditions.append(
+                f"{table}.{id_column} IN "
+                "(SELECT restaurant_id FROM menus WHERE menu_type LIKE ?)"
+            )
+            params.append(f"%{intent.menu_type}%")
+
+        base_query = CARD_QUERY if self.use_cards else BASE_QUERY
+        return IntentQuery(f"{base_query} WHERE {' AND '.join(conditions)}", params)
+
+
+# 공유 DB로 만든 규칙 기반 질의 해석기 (DB가 교체되면 다시 생성)
+@registry.resource("intent_parser")
+def get_intent_parser() -> IntentParser:
+    return IntentParser(get_db())
@@ -0,0 +1,345 @@
+import json
+import math
+import os
+import threading
+import time
+import uuid
+from collections import Counter, defaultdict, deque
+from typing import Any, Optional
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+from agent.config import get_logger
+
+# 로깅 설정
+logger = get_logger()
+
+# 요청별 trace를 JSON Lines로 남기는 파일 (지정한 경우에만 저장, 예: /var/log/meokten/traces.jsonl)
+TRACE_PATH = os.getenv("MEOKTEN_TRACE_PATH", "")
+# 앱(meokten.py)이 snapshot()을 주기적으로 덮어쓰는 JSON 파일과 저장 간격 (초, 빈 값이면 저장하지 않음)
+METRICS_PATH = os.getenv("MEOKTEN_METRICS_PATH", "logs/metrics.json")
+METRICS_DUMP_INTERVAL = float(os.getenv("MEOKTEN_METRICS_DUMP_INTERVAL", "60"))
+
+# 모델별 1M 토큰당 가격 (USD, 입력/출력)
+TOKEN_PRICES = {
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4o-mini": (0.15, 0.60),
+}
+
+
+def token_cost(model: str, prompt_tokens: int, completion_tokens: int) -> float:
+    """모델 이름과 토큰 수로 비용(USD)을 계산합니다. 가격을 모르는 모델은 0입니다."""
+    for name in sorted(TOKEN_PRICES, key=len, reverse=True):
+        if model and model.startswith(name):
+            prompt_price, completion_price = TOKEN_PRICES[name]
+            return (
+                prompt_tokens * prompt_price + completion_tokens * completion_price
+            ) / 1_000_000
+    return 0.0
+
+
+def percentile(values: list, q: float) -> float:
+    """정렬된 값 목록에서 q(0~1) 분위수를 반환합니다. (최근접 순위 방식)"""
+    if not values:
+        return 0.0
+    return values[max(0, math.ceil(q * len(values)) - 1)]
+
+
+class RequestMetrics(BaseCallbackHandler):
+    """
+    요청 하나의 그래프 실행을 기록하는 콜백 핸들러
+
+    노드별 실행 시간과 횟수, LLM 토큰 사용량과 비용, db_query_tool 실행 시간을 모읍니다.
+    RunnableConfig의 callbacks로 전달하면 하위 실행(노드, 체인, LLM, 도구)에 모두 전파됩니다.
+    """
+
+    def __init__(self, query: str):
+        self.trace_id = str(uuid.uuid4())
+        self.query = query
+        self.started_at = time.time()
+        self.perf_start = time.perf_counter()
+        self.graph_start = None
+        self.graph_seconds = None
+        self._graph_run_id = None
+        self.node_seconds = defaultdict(float)
+        self.node_counts = Counter()
+        self.llm_seconds = defaultdict(float)
+        self.tokens = defaultdict(lambda: {"prompt": 0, "completion": 0})
+        self.cost = 0.0
+        self.sql = []
+        self._runs = {}
+        self._lock = threading.Lock()
+
+    # 그래프 전체 실행 시간과 노드 실행 시간 (노드 자체의 실행만 기록, 하위 체인은 제외)
+    def on_chain_start(
+        self,
+        serialized,
+        inputs,
+        *,
+        run_id,
+        parent_run_id=None,
+        metadata=None,
+        name=None,
+        **kwargs,
+    ):
+        if parent_run_id is None and self._graph_run_id is None:
+            self._graph_run_id = run_id
+            self.graph_start = time.perf_counter()
+            return
+        node = (metadata or {}).get("langgraph_node")
+        if (
+            node
+            and not node.startswith("__")
+            and node == (name or (serialized or {}).get("name"))
+        ):
+            with self._lock:
+                self._runs[run_id] = (node, time.perf_counter())
+
+    def on_chain_end(self, outputs, *, run_id, **kwargs):
+        self.end_node(run_id)
+
+    def on_chain_error(self, error, *, run_id, **kwargs):
+        self.end_node(run_id)
+
+    def end_node(self, run_id):
+        if run_id == self._graph_run_id:
+            self.graph_seconds = time.perf_counter() - self.graph_start
+            return
+        with self._lock:
+            run = self._runs.pop(run_id, None)
+            if run:
+                node, started = run
+                self.node_seconds[node] += time.perf_counter() - started
+                self.node_counts[node] += 1
+
+    # LLM 응답 시간과 토큰 사용량 (노드별)
+    def on_chat_model_start(
+        self, serialized, messages, *, run_id, metadata=None, **kwargs
+    ):
+        with self._lock:
+            self._runs[run_id] = (
+                (metadata or {}).get("langgraph_node") or "unknown",
+                time.perf_counter(),
+            )
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        with self._lock:
+            run = self._runs.pop(run_id, None)
+            if not run:
+                return
+            node, started = run
+            self.llm_seconds[node] += time.perf_counter() - started
+        llm_output = response.llm_output or {}
+        usage = llm_output.get("token_usage") or {}
+        prompt_tokens = usage.get("prompt_tokens", 0)
+        completion_tokens = usage.get("completion_tokens", 0)
+        # 스트리밍 응답은 llm_output에 사용량이 없으므로 메시지의 usage_metadata 사용
+        if not usage:
+            for generations in response.generations:
+                for generation in generations:
+                    metadata = getattr(
+                        getattr(generation, "message", None), "usage_metadata", None
+                    )
+                    if metadata:
+                        prompt_tokens += metadata.get("input_tokens", 0)
+                        completion_tokens += metadata.get("output_tokens", 0)
+        with self._lock:
+            self.tokens[node]["prompt"] += prompt_tokens
+            self.tokens[node]["completion"] += completion_tokens
+            self.cost += token_cost(
+                llm_output.get("model_name", ""), prompt_tokens, completion_tokens
+            )
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        with self._lock:
+            self._runs.pop(run_id, None)
+
+    # SQL 실행 시간
+    def on_tool_start(self, serialized, input_str, *, run_id, name=None, **kwargs):
+        if (name or (serialized or {}).get("name")) == "db_query_tool":
+            with self._lock:
+                self._runs[run_id] = ("db_query_tool", time.perf_counter())
+
+    def on_tool_end(self, output, *, run_id, **kwargs):
+        self.end_tool(run_id, error=False)
+
+    def on_tool_error(self, error, *, run_id, **kwargs):
+        self.end_tool(run_id, error=True)
+
+    def end_tool(self, run_id, error: bool):
+        with self._lock:
+            run = self._runs.pop(run_id, None)
+            if run:
+                self.sql.append(
+                    {"seconds": time.perf_counter() - run[1], "error": error}
+                )
+
+    def to_trace(self, status: str = "ok", cached: bool = False) -> dict[str, Any]:
+        """요청 단위 trace 딕셔너리를 반환합니다."""
+        with self._lock:
+            prompt_tokens = sum(t["prompt"] for t in self.tokens.values())
+            completion_tokens = sum(t["completion"] for t in self.tokens.values())
+            total_seconds = time.perf_counter() - self.perf_start
+            graph_seconds = (
+                self.graph_seconds
+                if self.graph_seconds is not None
+                else (
+                    time.perf_counter() - self.graph_start if self.graph_start else 0.0
+                )
+            )
+            return {
+                "trace_id": self.trace_id,
+                "query": self.query,
+                "started_at": self.started_at,
+                "status": status,
+                "cached": cached,
+                "total_seconds": total_seconds,
+                # 동시 실행 제한으로 그래프 실행 전 대기한 시간
+                "queue_seconds": (
+                    self.graph_start - self.perf_start if self.graph_start else 0.0
+                ),
+                "graph_seconds": graph_seconds,
+                "nodes": {
+                    node: {
+                        "seconds": self.node_seconds[node],
+                        "llm_seconds": self.llm_seconds.get(node, 0.0),
+                        "count": self.node_counts[node],
+                    }
+                    for node in self.node_counts
+                },
+                "llm_seconds": sum(self.llm_seconds.values()),
+                # 노드 밖에서 쓴 시간 (상태 병합, 메시지 복사, 체크포인터 저장, 스케줄링)
+                "graph_overhead_seconds": max(
+                    0.0, graph_seconds - sum(self.node_seconds.values())
+                ),
+                # query_gen <-> execute_query 반복 횟수
+                "loops": self.node_counts.get("execute_query", 0),
+                "tokens": {
+                    "prompt": prompt_tokens,
+                    "completion": completion_tokens,
+                    "by_node": {node: dict(t) for node, t in self.tokens.items()},
+                },
+                "cost_usd": self.cost,
+                "sql": {
+                    "count": len(self.sql),
+                    "seconds": sum(s["seconds"] for s in self.sql),
+                    "errors": sum(1 for s in self.sql if s["error"]),
+                },
+            }
+
+
+class MetricsRegistry:
+    """
+    요청 trace를 모아 최근 window개 기준의 p50/p95/p99를 계산합니다.
+
+    snapshot()은 지표별 분위수를, recent_traces()는 최근 요청 trace를 반환하며
+    trace_path를 지정하면 요청마다 trace를 JSON Lines로 추가합니다.
+    snapshot_path를 지정하면 요청을 마칠 때 dump_interval초 간격으로 snapshot을 JSON 파일로 덮어씁니다.
+    """
+
+    def __init__(
+        self,
+        window: int = 1000,
+        trace_path: Optional[str] = TRACE_PATH,
+        snapshot_path: Optional[str] = None,
+        dump_interval: float = METRICS_DUMP_INTERVAL,
+    ):
+        self.window = window
+        self.trace_path = trace_path
+        self.snapshot_path = snapshot_path
+        self.dump_interval = dump_interval
+        self.requests = Counter()
+        self._series = defaultdict(lambda: deque(maxlen=window))
+        self._traces = deque(maxlen=window)
+        self._last_dump = 0.0
+        self._lock = threading.Lock()
+
+    def start(self, query: str) -> RequestMetrics:
+        """요청 하나를 기록할 콜백 핸들러를 생성합니다."""
+        return RequestMetrics(query)
+
+    def finish(
+        self, request: RequestMetrics, status: str = "ok", cached: bool = False
+    ) -> dict[str, Any]:
+        """요청 기록을 마치고 trace를 저장합니다."""
+        trace = request.to_trace(status=status, cached=cached)
+        with self._lock:
+            self.requests[status] += 1
+            self._traces.append(trace)
+            self.observe("request_seconds", trace["total_seconds"])
+            if not cached:
+                for node, node_trace in trace["nodes"].items():
+                    self.observe(f"node_seconds.{node}", node_trace["seconds"])
+                for sql in request.sql:
+                    self.observe("sql_seconds", sql["seconds"])
+                self.observe("llm_seconds", trace["llm_seconds"])
+                self.observe("graph_overhead_seconds", trace["graph_overhead_seconds"])
+                self.observe("loops", trace["loops"])
+                self.observe("prompt_tokens", trace["tokens"]["prompt"])
+                self.observe("completion_tokens", trace["tokens"]["completion"])
+                self.observe("cost_usd", trace["cost_usd"])
+
+        if self.trace_path:
+            try:
+                with open(self.trace_path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(trace, ensure_ascii=False) + "\n")
+            except OSError as e:
+                logger.warning(f"MetricsRegistry trace 저장 실패: {str(e)}")
+        if self.snapshot_path:
+            self.dump_if_due()
+        return trace
+
+    def observe(self, name: str, value: float):
+        self._series[name].append(value)
+
+    def snapshot(self) -> dict[str, Any]:
+        """지표별 최근 window개 값의 개수/평균/p50/p95/p99를 반환합니다."""
+        with self._lock:
+            series = {name: sorted(values) for name, values in self._series.items()}
+            requests = dict(self.requests)
+        return {
+            "requests": requests,
+            "metrics": {
+                name: {
+                    "count": len(values),
+                    "mean": sum(values) / len(values) if values else 0.0,
+                    "p50": percentile(values, 0.50),
+                    "p95": percentile(values, 0.95),
+                    "p99": percentile(values, 0.99),
+                }
+                for name, values in series.items()
+            },
+        }
+
+    def recent_traces(self, limit: int = 50) -> list[dict]:
+        """최근 요청 trace를 최신순으로 반환합니다."""
+        with self._lock:
+            return list(self._traces)[-limit:][::-1]
+
+    def dump_if_due(self):
+        """마지막 저장 후 dump_interval초가 지났으면 snapshot을 저장합니다."""
+        now = time.monotonic()
+        with self._lock:
+            if self._last_dump and now - self._last_dump < self.dump_interval:
+                return
+            self._last_dump = now
+        self.dump()
+
+    def dump(self, path: Optional[str] = None):
+        """snapshot을 JSON 파일로 저장합니다. (임시 파일에 쓴 뒤 교체하여 읽는 쪽이 깨진 파일을 보지 않음)"""
+        path = path or self.snapshot_path
+        data = {"updated_at": time.time(), **self.snapshot()}
+        try:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            with open(f"{path}.tmp", "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+            os.replace(f"{path}.tmp", path)
+        except OSError as e:
+            logger.warning(f"MetricsRegistry snapshot 저장 실패: {str(e)}")
+
+    def to_json(self) -> str:
+        """수집용 JSON 문자열 (snapshot + 최근 trace)"""
+        return json.dumps(
+            {"snapshot": self.snapshot(), "traces": self.recent_traces()},
+            ensure_ascii=False,
+        )
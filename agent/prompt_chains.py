@@ -1,11 +1,12 @@
 from operator import itemgetter
 
-from langchain_core.output_parsers import JsonOutputParser
+from langchain_core.output_parsers import JsonOutputParser, StrOutputParser
 from langchain_core.prompts import ChatPromptTemplate
 
 from agent.config import LLM, Answers
-from agent.tools import db_query_tool
-from agent.db import get_db_connection
+from agent.db import get_schema_fingerprint
+from agent.registry import registry
+from agent.tools import db_query_tool, get_db, get_search_tools
 
 # 쿼리 검증을 위한 프롬프트 정의
 QUERY_CHECK_SYSTEM = """You are a SQL expert with a strong attention to detail.
@@ -30,10 +31,14 @@ query_check_prompt = ChatPromptTemplate.from_messages(
     [("system", QUERY_CHECK_SYSTEM), ("placeholder", "{messages}")]
 )
 
+
 # 쿼리 검증 체인 생성
-query_check = query_check_prompt | LLM().bind_tools(
-    [db_query_tool], tool_choice="db_query_tool"
-)
+@registry.resource("query_check")
+def get_query_check():
+    return query_check_prompt | LLM("query_check").bind_tools(
+        [db_query_tool], tool_choice="db_query_tool"
+    )
+
 
 # 쿼리 생성을 위한 프롬프트 정의
 QUERY_GEN_INSTRUCTION = """당신은 세부 사항에 대한 높은 주의력을 가진 SQL 전문가입니다.
@@ -44,14 +49,14 @@ QUERY_GEN_INSTRUCTION = """당신은 세부 사항에 대한 높은 주의력을
 
 사용자 질문에서 지영명은 적절하게 추출해서 사용하세요.(예: 서울시 -> 서울, 경기도 -> 경기)
 
-사용자 질문에서 지역명과 지하철역명을 구분해서 사용하세요.(논현 -> address LIKE '%논현%', 논현역 -> station_name LIKE '%논현역%')
+{region_rule}
 
 menu_type은 결과에 따라 적절하게 변형해서 사용하세요.(예: 멕시코 -> 멕시칸, 중국집 -> 중식, 일본 음식 -> 일식 등...)
-
+{search_hint}
 1. 질문에 대한 적절한 쿼리 결과가 존재하지 않는 경우, 사용자의 질문을 해결할 수 있는 SQL 구문적으로 올바른 SQLite 쿼리를 생성하세요. 단, 데이터베이스에 영향을 주는 DML 문(INSERT, UPDATE, DELETE, DROP 등)은 절대 사용하지 마세요.
 
-2. 새로운 쿼리를 생성할 경우, 오직 쿼리문만 반환해야 하며, 반드시 '=' 대신 LIKE 연산자를 사용해야 합니다. 
-    반드시 restaurants와 menus 테이블을 JOIN 하고 모든 컬럼을 호출해야 합니다.
+2. 새로운 쿼리를 생성할 경우, 오직 쿼리문만 반환해야 하며, {operator_rule}
+    {query_target}
     사용자 질의에 따라 데이터 조회 시 address 또는 station_name을 적절하게 사용해야 합니다.
 
 3. 이미 실행된 쿼리가 오류를 발생시킨 경우, 동일한 오류 메시지를 그대로 반환하세요.
@@ -67,13 +72,133 @@ Here is Table information:
 {table_info}
 """
 
+# 조회 대상 테이블 안내 (식당 카드 테이블이 없는 DB)
+JOIN_QUERY_TARGET = (
+    "반드시 restaurants와 menus 테이블을 JOIN 하고 모든 컬럼을 호출해야 합니다."
+)
+
+# 조회 대상 테이블 안내 (식당 카드 테이블이 있는 DB, 식당 1곳당 1행)
+CARD_QUERY_TARGET = "반드시 restaurant_cards 테이블에서 모든 컬럼을 호출하고, menus 테이블과 JOIN 하지 마세요. restaurant_cards는 식당 1곳당 1행이며 메뉴 이름(menus), 메뉴 종류(menu_types), 후기(reviews)가 이어 붙어 있습니다.(예: restaurant_cards.menu_types LIKE '%중식%', restaurant_cards.reviews LIKE '%바삭%')"
+
+# 인덱스가 있는 정규화 컬럼 사용 안내 (마이그레이션된 DB에서만 추가)
+KEY_COLUMN_HINT = """
+지하철역은 역 이름만 담긴 station_key 컬럼을, 메뉴 종류는 menu_type_key 컬럼을 우선 사용하세요. 두 컬럼은 인덱스가 있으므로 앞부분이 일치하는 조건으로 검색하세요.(예: restaurants.station_key LIKE '논현역%', menus.menu_type_key LIKE '중식%')
+"""
+
+# 인덱스가 있는 역 이름 컬럼 사용 안내 (식당 카드 테이블이 있는 DB)
+CARD_KEY_COLUMN_HINT = """
+지하철역은 역 이름만 담긴 station_key 컬럼을 우선 사용하세요. 인덱스가 있으므로 앞부분이 일치하는 조건으로 검색하세요.(예: restaurant_cards.station_key LIKE '논현역%')
+"""
+
+# 지역명/역명 구분과 비교 연산자 안내 (지역 컬럼이 없는 DB)
+LIKE_REGION_RULE = "사용자 질문에서 지역명과 지하철역명을 구분해서 사용하세요.(논현 -> address LIKE '%논현%', 논현역 -> station_name LIKE '%논현역%')"
+LIKE_OPERATOR_RULE = "반드시 '=' 대신 LIKE 연산자를 사용해야 합니다."
+
+# 지역명/역명 구분과 비교 연산자 안내 (주소를 파싱한 DB, 지역 컬럼은 = 조건으로 인덱스 사용)
+COLUMN_REGION_RULE = "사용자 질문에서 지역명과 지하철역명을 구분해서 사용하세요.(논현 -> {table}.dong = '논현동', 논현역 -> station_name LIKE '%논현역%')"
+COLUMN_OPERATOR_RULE = "지역 컬럼(sido, sigungu, dong, road)은 = 연산자를, 그 밖의 문자열 컬럼은 LIKE 연산자를 사용해야 합니다."
+
+# 지역 컬럼 사용 안내 (주소를 파싱한 DB에서만 추가)
+REGION_HINT = """
+지역명은 address LIKE 대신 인덱스가 있는 {table}.sido(시/도 약칭: 서울, 부산, 경기 등), sigungu(강남구, 성남시 분당구 등), dong(논현동 등), road(학동로 등) 컬럼의 = 조건으로 검색하세요. '서울특별시', '강남', '논현'처럼 표기가 다르면 region_aliases 테이블(alias -> level, value)에서 실제 값을 찾으세요.(예: 서울 중구 -> {table}.sido = '서울' AND {table}.sigungu = '중구')
+"""
+
+# 사용 가능한 검색 도구별 안내 (검색 테이블, 벡터/공간 인덱스가 있는 DB에서만 추가)
+SEARCH_TOOL_HINTS = {
+    "menu_search_tool": """
+맛, 식감, 후기 표현으로 찾는 질문(예: 국물이 진한 곳, 바삭한 튀김)은 menu_search_tool로 관련도 순 식당 id를 먼저 찾은 뒤, {id_column} IN (...) 조건으로 쿼리를 생성하세요.
+""",
+    "vector_search_tool": """
+메뉴 종류나 정확한 단어가 아닌 상황, 분위기로 찾는 질문(예: 비 오는 날 먹기 좋은, 해장하기 좋은)은 vector_search_tool로 유사도 순 식당 id를 먼저 찾은 뒤, {id_column} IN (...) 조건으로 쿼리를 생성하세요.
+""",
+    "nearby_restaurants_tool": """
+좌표 근처(예: 37.51,127.02 근처)나 특정 식당 근처를 찾는 질문은 위도/경도 문자열을 비교하지 말고 nearby_restaurants_tool로 가까운 순 식당 id를 먼저 찾은 뒤, {id_column} IN (...) 조건으로 쿼리를 생성하세요.
+""",
+    "station_restaurants_tool": """
+지하철역에서의 거리 조건이나 가까운 순 정렬이 필요한 질문(예: 논현역 300m 이내)은 station_restaurants_tool로 거리순 식당 id를 먼저 찾은 뒤, {id_column} IN (...) 조건으로 쿼리를 생성하세요.
+""",
+}
+
+
+# 프롬프트에 미리 넣어둘 스키마 정보와 해당 스키마의 해시값
+@registry.resource("schema")
+def get_schema() -> tuple[str, str]:
+    db = get_db()
+    return db.get_table_info(), get_schema_fingerprint(db)
+
+
+def uses_restaurant_cards(table_info: str) -> bool:
+    """식당 카드 테이블(restaurant_cards)을 기본 조회 대상으로 사용하는지 확인합니다."""
+    return "CREATE TABLE restaurant_cards" in table_info
+
+
+def uses_region_columns(table_info: str) -> bool:
+    """주소를 파싱한 지역 컬럼(sido, sigungu, dong, road)과 region_aliases가 있는지 확인합니다."""
+    return "region_aliases" in table_info
+
+
+def build_region_rules(table_info: str) -> dict[str, str]:
+    """지역 컬럼 유무에 맞는 지역명 안내(region_rule)와 비교 연산자 안내(operator_rule)를 만듭니다."""
+    if not uses_region_columns(table_info):
+        return {"region_rule": LIKE_REGION_RULE, "operator_rule": LIKE_OPERATOR_RULE}
+    table = "restaurant_cards" if uses_restaurant_cards(table_info) else "restaurants"
+    return {
+        "region_rule": COLUMN_REGION_RULE.format(table=table),
+        "operator_rule": COLUMN_OPERATOR_RULE,
+    }
+
+
+def build_search_hint(table_info: str, search_tools: list) -> str:
+    """DB에 있는 컬럼/테이블과 사용 가능한 검색 도구에 맞는 쿼리 작성 안내를 만듭니다."""
+    if uses_restaurant_cards(table_info):
+        table, id_column = "restaurant_cards", "restaurant_cards.restaurant_id"
+        hint = CARD_KEY_COLUMN_HINT
+    else:
+        table, id_column = "restaurants", "restaurants.id"
+        hint = ""
+        if "station_key" in table_info and "menu_type_key" in table_info:
+            hint += KEY_COLUMN_HINT
+    if uses_region_columns(table_info):
+        hint += REGION_HINT.format(table=table)
+    for search_tool in search_tools:
+        hint += SEARCH_TOOL_HINTS.get(search_tool.name, "").format(id_column=id_column)
+    return hint
+
+
+def is_schema_current() -> bool:
+    """미리 로드한 스키마가 현재 DB 스키마와 같은지 확인합니다."""
+    try:
+        _, fingerprint = get_schema()
+        return get_schema_fingerprint(get_db()) == fingerprint
+    except Exception:
+        return False
+
+
 # 쿼리 생성 프롬프트 생성
 query_gen_prompt = ChatPromptTemplate.from_messages(
     [("system", QUERY_GEN_INSTRUCTION), ("placeholder", "{messages}")]
-).partial(table_info=get_db_connection()[0].get_table_info())
+)
+
+
+# 쿼리 생성 체인 생성 (스키마 정보와 검색 안내를 미리 채워 둠)
+@registry.resource("query_gen")
+def get_query_gen():
+    table_info, _ = get_schema()
+    search_tools = get_search_tools()
+    prompt = query_gen_prompt.partial(
+        table_info=table_info,
+        search_hint=build_search_hint(table_info, search_tools),
+        query_target=(
+            CARD_QUERY_TARGET
+            if uses_restaurant_cards(table_info)
+            else JOIN_QUERY_TARGET
+        ),
+        **build_region_rules(table_info),
+    )
+    return prompt | (
+        LLM("query_gen").bind_tools(search_tools) if search_tools else LLM("query_gen")
+    )
 
-# 쿼리 생성 체인 생성
-query_gen = query_gen_prompt | LLM()
 
 # 답변 생성을 위한 프롬프트 정의
 ANSWER_GEN_INSTRUCTION = """당신은 SQL 쿼리 결과를 해석하여 사용자에게 친절하고 명확한 답변을 제공하는 전문가입니다.
@@ -102,8 +227,8 @@ ANSWER_GEN_INSTRUCTION = """당신은 SQL 쿼리 결과를 해석하여 사용
             "name": "식당 이름",
             "address": "식당 주소",
             "subway": "식당 지하철역",
-            "lat": "식당 위도",
-            "lng": "식당 경도",
+            "lat": 식당 위도(숫자, 없으면 null),
+            "lng": 식당 경도(숫자, 없으면 null),
             "menu": "메뉴1, 메뉴2, ...",
             "review": "식당 후기",
             "video_url": "유튜브 영상 링크"
@@ -115,10 +240,35 @@ ANSWER_GEN_INSTRUCTION = """당신은 SQL 쿼리 결과를 해석하여 사용
 # 답변 생성 프롬프트 생성
 answer_gen_prompt = ChatPromptTemplate.from_template(ANSWER_GEN_INSTRUCTION)
 
+
 # 답변 생성 체인 생성
-answer_gen = (
-    {"input": itemgetter("messages")}
-    | answer_gen_prompt
-    | LLM()
-    | JsonOutputParser(pydantic_object=Answers)
-)
+@registry.resource("answer_gen")
+def get_answer_gen():
+    return (
+        {"input": itemgetter("messages")}
+        | answer_gen_prompt
+        | LLM("answer_gen")
+        | JsonOutputParser(pydantic_object=Answers)
+    )
+
+
+# 요약 답변 생성을 위한 프롬프트 정의 (식당 정보는 쿼리 결과로 직접 구성)
+ANSWER_SUMMARY_INSTRUCTION = """당신은 성시경의 유튜브 영상 중 "먹을텐데"에 나온 식당을 소개하는 전문가입니다.
+
+사용자의 질문과 검색된 식당 목록을 보고, 질문에 대한 아주 간단한 답변을 1~2문장의 자연스러운 한국어로 작성하세요.
+식당별 주소, 메뉴, 후기는 따로 보여주므로 답변에 나열하지 마세요. JSON이나 마크다운 없이 답변 문장만 반환하세요.
+
+질문: {question}
+
+검색된 식당 ({count}곳):
+{restaurants}
+"""
+
+# 요약 답변 프롬프트 생성
+answer_summary_prompt = ChatPromptTemplate.from_template(ANSWER_SUMMARY_INSTRUCTION)
+
+
+# 요약 답변 체인 생성
+@registry.resource("answer_summary")
+def get_answer_summary():
+    return answer_summary_prompt | LLM("answer_summary") | StrOutputParser()
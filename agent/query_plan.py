@@ -0,0 +1,154 @@
+"""
+에이전트가 실행한 쿼리의 EXPLAIN QUERY PLAN 리포트
+
+logs/app.log의 '실행할 쿼리:' 로그(또는 --query로 지정한 쿼리)를 모아
+정규화된 쿼리별로 실행 계획을 출력하고, 테이블 전체 스캔이 있는 쿼리를 표시합니다.
+
+사용 예:
+    python -m agent.query_plan
+    python -m agent.query_plan --log logs/app.log --strict
+    python -m agent.query_plan --query "SELECT * FROM restaurants WHERE station_key = '논현역'"
+"""
+
+import argparse
+import json
+import re
+import sqlite3
+import sys
+from collections import Counter
+
+from agent.db import DB_PATH, connect_readonly
+from agent.sql_cache import STRING_LITERAL, canonicalize_sql
+
+# 로그 레코드 시작 (2025-01-01 12:00:00 - INFO - ...)
+LOG_RECORD = re.compile(r"^\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2} - ")
+# 실행한 쿼리 로그 (agent/tools.py의 db_query_tool)
+QUERY_LOG = re.compile(r" - 실행할 쿼리: (.*)$", re.S)
+
+
+def queries_from_log(log_path: str) -> list[str]:
+    """로그 파일에서 실행한 쿼리를 추출합니다. (여러 줄 쿼리 포함)"""
+    records = []
+    with open(log_path, "r", encoding="utf-8", errors="replace") as f:
+        for line in f:
+            if LOG_RECORD.match(line) or not records:
+                records.append(line)
+            else:
+                records[-1] += line
+    queries = []
+    for record in records:
+        match = QUERY_LOG.search(record.rstrip("\n"))
+        if match:
+            queries.append(match.group(1).strip())
+    return queries
+
+
+def explain(connection: sqlite3.Connection, query: str) -> list[str]:
+    """
+    EXPLAIN QUERY PLAN 결과의 detail 목록을 반환합니다.
+
+    규칙 기반 쿼리의 ? 자리표시자는 값 없이 로그에 남으므로 NULL을 바인딩합니다.
+    """
+    params = [None] * STRING_LITERAL.sub("''", query).count("?")
+    return [
+        row[3]
+        for row in connection.execute(f"EXPLAIN QUERY PLAN {query}", params).fetchall()
+    ]
+
+
+# 제약 조건을 사용하는 가상 테이블 검색 (예: 'VIRTUAL TABLE INDEX 2:D1B0D3B2')
+VIRTUAL_INDEX = re.compile(r"VIRTUAL TABLE INDEX \d+:\S+")
+
+
+def full_scans(plan: list[str]) -> list[str]:
+    """인덱스 없이 테이블 전체를 읽는 단계를 반환합니다."""
+    return [
+        detail
+        for detail in plan
+        if detail.startswith("SCAN ")
+        and "USING" not in detail
+        and "CONSTANT ROW" not in detail
+        and not VIRTUAL_INDEX.search(detail)
+    ]
+
+
+def build_report(connection: sqlite3.Connection, queries: list[str]) -> list[dict]:
+    """정규화된 쿼리별 실행 횟수, 실행 계획, 전체 스캔 여부를 반환합니다."""
+    counts = Counter()
+    originals = {}
+    for query in queries:
+        key = canonicalize_sql(query)
+        counts[key] += 1
+        originals.setdefault(key, query)
+
+    report = []
+    for key, count in counts.most_common():
+        query = originals[key]
+        try:
+            plan = explain(connection, query)
+            error = None
+        except sqlite3.Error as e:
+            plan, error = [], str(e)
+        report.append(
+            {
+                "query": query,
+                "count": count,
+                "plan": plan,
+                "full_scans": full_scans(plan),
+                "error": error,
+            }
+        )
+    return report
+
+
+def print_report(report: list[dict]):
+    for index, item in enumerate(report, 1):
+        status = (
+            "ERROR" if item["error"] else "FULL SCAN" if item["full_scans"] else "OK"
+        )
+        print(f"[{index}] {status} (실행 {item['count']}회)")
+        print(f"    {item['query']}")
+        for detail in item["plan"]:
+            print(f"      - {detail}")
+        if item["error"]:
+            print(f"      ! {item['error']}")
+    scans = sum(1 for item in report if item["full_scans"])
+    print(f"\n쿼리 {len(report)}개 중 전체 스캔 {scans}개")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="에이전트 쿼리 실행 계획 리포트")
+    parser.add_argument("--db", default=DB_PATH, help="SQLite DB 경로")
+    parser.add_argument("--log", default="logs/app.log", help="쿼리를 읽을 로그 파일")
+    parser.add_argument(
+        "--query", action="append", default=[], help="추가로 확인할 쿼리"
+    )
+    parser.add_argument("--json", action="store_true", help="JSON으로 출력")
+    parser.add_argument(
+        "--strict", action="store_true", help="전체 스캔이 있으면 종료 코드 1"
+    )
+    args = parser.parse_args()
+
+    queries = list(args.query)
+    if args.log:
+        try:
+            queries += queries_from_log(args.log)
+        except FileNotFoundError:
+            print(f"로그 파일이 없습니다: {args.log}", file=sys.stderr)
+
+    connection = connect_readonly(args.db)
+    try:
+        report = build_report(connection, queries)
+    finally:
+        connection.close()
+
+    if args.json:
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+    else:
+        print_report(report)
+    if args.strict and any(item["full_scans"] for item in report):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+import functools
+import threading
+import time
+from typing import Any, Callable
+
+from agent.config import get_logger
+
+# 로깅 설정
+logger = get_logger()
+
+# 아직 생성하지 않은 리소스 표시
+_MISSING = object()
+
+
+class Registry:
+    """
+    프로세스 전역 리소스(DB 연결, SQL 툴킷, LLM 체인 등)를 처음 사용할 때 한 번만 생성하는 레지스트리
+
+    import 시점에는 아무것도 만들지 않으므로 DB 파일이나 API 키 없이도
+    모듈을 import 할 수 있고, 필요한 리소스만 생성됩니다.
+    """
+
+    def __init__(self):
+        self._factories: dict[str, Callable[[], Any]] = {}
+        self._instances: dict[str, Any] = {}
+        self._build_seconds: dict[str, float] = {}
+        # 리소스 이름 -> 생성 중에 이 리소스를 사용한 리소스 이름 (교체 시 함께 다시 생성)
+        self._dependents: dict[str, set[str]] = {}
+        # 리소스별 무효화 횟수 (생성 중에 교체/초기화된 리소스는 저장하지 않음)
+        self._generations: dict[str, int] = {}
+        # 스레드별로 생성 중인 리소스 이름
+        self._building = threading.local()
+        # 리소스별 생성 락 (원격 DB 다운로드처럼 오래 걸리는 생성이 다른 리소스 조회를 막지 않도록)
+        # 리소스 생성 중 다른 리소스를 사용할 수 있으므로 재진입 가능한 락 사용
+        self._build_locks: dict[str, threading.RLock] = {}
+        # 등록 정보, 생성된 리소스, 의존 관계를 보호하는 락 (생성 함수는 이 락 밖에서 실행)
+        self._lock = threading.RLock()
+
+    def register(self, name: str, factory: Callable[[], Any]):
+        """리소스 생성 함수를 등록합니다. (이미 생성된 리소스는 버림)"""
+        with self._lock:
+            self._factories[name] = factory
+            self._invalidate(name)
+
+    def resource(self, name: str):
+        """
+        함수를 리소스 생성 함수로 등록하고, 생성된 리소스를 반환하는 함수로 바꾸는 데코레이터
+
+        사용 예:
+            @registry.resource("query_cache")
+            def get_query_cache() -> QueryCache:
+                return QueryCache(get_db())
+        """
+
+        def decorator(factory: Callable[[], Any]):
+            self.register(name, factory)
+
+            @functools.wraps(factory)
+            def accessor():
+                return self.get(name)
+
+            return accessor
+
+        return decorator
+
+    def get(self, name: str) -> Any:
+        """리소스를 반환합니다. 처음 호출할 때 생성합니다."""
+        stack = self._building_stack()
+        if stack:
+            # 다른 리소스를 생성하는 중이면 의존 관계로 기록
+            with self._lock:
+                self._dependents.setdefault(name, set()).add(stack[-1])
+        instance = self._instances.get(name, _MISSING)
+        if instance is not _MISSING:
+            return instance
+        with self._lock:
+            build_lock = self._build_locks.setdefault(name, threading.RLock())
+        with build_lock:
+            instance = self._instances.get(name, _MISSING)
+            if instance is not _MISSING:
+                return instance
+            with self._lock:
+                factory = self._factories[name]
+                generation = self._generations.get(name, 0)
+            started = time.perf_counter()
+            stack.append(name)
+            try:
+                instance = factory()
+            finally:
+                stack.pop()
+            seconds = time.perf_counter() - started
+            with self._lock:
+                if self._generations.get(name, 0) != generation:
+                    # 생성하는 동안 사용한 리소스가 교체됨 -> 이번 호출에만 사용하고 다음에 다시 생성
+                    logger.info(f"리소스 생성 중 교체 감지, 저장하지 않음: {name}")
+                    return instance
+                self._build_seconds[name] = seconds
+                self._instances[name] = instance
+            logger.info(f"리소스 생성: {name} ({seconds:.3f}초)")
+            return instance
+
+    def _building_stack(self) -> list[str]:
+        if not hasattr(self._building, "stack"):
+            self._building.stack = []
+        return self._building.stack
+
+    def is_built(self, name: str) -> bool:
+        return name in self._instances
+
+    def is_building(self) -> bool:
+        """현재 스레드에서 리소스를 생성하는 중인지 확인합니다."""
+        return bool(self._building_stack())
+
+    def reset(self, *names: str):
+        """
+        생성된 리소스와 그 리소스로 만든 리소스를 버립니다.
+        다음에 사용할 때 다시 생성됩니다. (이름이 없으면 전체)
+        """
+        with self._lock:
+            for name in names or list(self._factories.keys() | self._instances.keys()):
+                self._invalidate(name)
+                self._reset_dependents(name)
+
+    def replace(self, name: str, instance: Any):
+        """
+        이미 만든 리소스로 교체하고, 이전 리소스로 만든 리소스는 버립니다.
+        교체 전까지 다른 스레드는 이전 리소스를 그대로 사용합니다.
+        """
+        with self._lock:
+            self._invalidate(name)
+            self._reset_dependents(name)
+            self._instances[name] = instance
+        logger.info(f"리소스 교체: {name}")
+
+    def _invalidate(self, name: str):
+        """리소스를 버리고, 생성 중인 리소스는 저장되지 않도록 표시합니다. (lock 안에서 호출)"""
+        self._instances.pop(name, None)
+        self._generations[name] = self._generations.get(name, 0) + 1
+
+    def _reset_dependents(self, name: str):
+        for dependent in self._dependents.pop(name, set()):
+            self._invalidate(dependent)
+            self._reset_dependents(dependent)
+
+    def stats(self) -> dict[str, dict]:
+        """등록된 리소스별 생성 여부와 생성에 걸린 시간을 반환합니다."""
+        with self._lock:
+            return {
+                name: {
+                    "built": name in self._instances,
+                    "seconds": self._build_seconds.get(name),
+                }
+                for name in self._factories
+            }
+
+
+# 프로세스 전역 레지스트리
+registry = Registry()
@@ -0,0 +1,69 @@
+import json
+import threading
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from agent.config import get_logger
+from agent.sql_cache import QueryResult
+
+# 로깅 설정
+logger = get_logger()
+
+
+@dataclass
+class StoredResult:
+    """저장된 쿼리 결과 (실행한 쿼리 + 전체 행)"""
+
+    query: str
+    result: QueryResult
+
+
+def parse_preview(content: Any) -> Optional[dict]:
+    """db_query_tool 응답이 결과 미리보기(JSON)면 딕셔너리로, 아니면 None을 반환합니다."""
+    if not isinstance(content, str) or not content.startswith("{"):
+        return None
+    try:
+        preview = json.loads(content)
+    except ValueError:
+        return None
+    return preview if isinstance(preview, dict) and "result_id" in preview else None
+
+
+class ResultStore:
+    """
+    result_id -> 쿼리 결과 저장소
+
+    전체 행은 메시지 기록(그래프 상태) 밖에 보관하고,
+    메시지에는 result_id와 미리보기만 남깁니다. LRU로 크기를 제한합니다.
+    """
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self.evicted = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def put(self, query: str, result: QueryResult) -> str:
+        """결과를 저장하고 result_id를 반환합니다."""
+        result_id = f"res_{uuid.uuid4().hex[:12]}"
+        with self._lock:
+            self._entries[result_id] = StoredResult(query, result)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evicted += 1
+        return result_id
+
+    def get(self, result_id: str) -> Optional[StoredResult]:
+        """저장된 결과를 반환합니다. 없으면(만료 등) None을 반환합니다."""
+        with self._lock:
+            stored = self._entries.get(result_id)
+            if stored is not None:
+                self._entries.move_to_end(result_id)
+            return stored
+
+    def stats(self) -> dict[str, int]:
+        """저장된 결과 수와 LRU로 제거된 결과 수를 반환합니다."""
+        with self._lock:
+            return {"size": len(self._entries), "evicted": self.evicted}
@@ -0,0 +1,167 @@
+import re
+from collections import defaultdict
+
+from langchain_community.utilities import SQLDatabase
+
+from agent.cache import PARTICLES, STOPWORDS
+from agent.config import get_logger
+from agent.db import has_table
+from agent.intent import FILLER_WORDS
+
+# 로깅 설정
+logger = get_logger()
+
+# 메뉴/후기 전문 검색 테이블 (data_collect/save_db.py의 migrate_search_index)
+SEARCH_TABLE = "menu_search"
+# 3글자 미만 검색어도 MATCH로 찾는 bigram 검색 테이블 (save_db.py의 refresh_search_bigrams)
+BIGRAM_TABLE = "menu_search_bigram"
+
+# trigram 토크나이저가 MATCH로 찾을 수 있는 최소 글자 수
+TRIGRAM_MIN_LENGTH = 3
+
+# 검색용 단어 구분 (밑줄도 구분자로 취급, save_db.py의 SEARCH_WORD와 같은 규칙)
+SEARCH_WORD = re.compile(r"[^\W_]+")
+
+# bigram 테이블이 없을 때 bm25 순위와 LIKE 순위를 합치는 reciprocal rank fusion 상수
+RRF_K = 60
+
+
+def has_search_index(db: SQLDatabase) -> bool:
+    """DB에 전문 검색 테이블이 있는지 확인합니다."""
+    return has_table(db, SEARCH_TABLE)
+
+
+def search_terms(text: str) -> list[str]:
+    """검색어를 단어 목록으로 나눕니다. (조사, 불용어, '곳'/'집' 같은 군더더기 단어 제거)"""
+    terms = []
+    for token in re.sub(r"[^\w\s]", " ", text).split():
+        if token in FILLER_WORDS:
+            continue
+        for particle in PARTICLES:
+            if token.endswith(particle) and len(token) > len(particle) + 1:
+                token = token[: -len(particle)]
+                break
+        if (
+            token
+            and token not in STOPWORDS
+            and token not in FILLER_WORDS
+            and token not in terms
+        ):
+            terms.append(token)
+    return terms
+
+
+def quote(token: str) -> str:
+    """FTS5 문자열로 감쌉니다."""
+    return '"' + token.replace('"', '""') + '"'
+
+
+def bigram_query(terms: list[str]) -> str:
+    """
+    검색어를 menu_search_bigram용 MATCH 식으로 바꿉니다.
+
+    2글자 이상 단어는 bigram을 이어 붙인 구문('된장찌개' -> "된장 장찌 찌개"),
+    한 글자 단어는 접두어 검색('회' -> "회"*)으로 찾습니다.
+    """
+    phrases = []
+    for term in terms:
+        for word in SEARCH_WORD.findall(term):
+            if len(word) == 1:
+                phrases.append(quote(word) + "*")
+            else:
+                phrases.append(
+                    quote(" ".join(word[i : i + 2] for i in range(len(word) - 1)))
+                )
+    return " OR ".join(phrases)
+
+
+def best_bm25(db: SQLDatabase, table: str, match: str) -> dict[int, float]:
+    """MATCH 결과의 식당별 최고 관련도(부호를 바꾼 bm25)를 반환합니다."""
+    # bm25는 값이 작을수록 관련도가 높으므로 부호를 바꿔 식당별 최고 점수 사용
+    # (bm25는 집계 함수 안에서 쓸 수 없으므로 행 단위로 읽어서 계산)
+    best = {}
+    for restaurant_id, score in db._execute(
+        f"SELECT restaurant_id, bm25({table}) FROM {table} WHERE {table} MATCH :match",
+        fetch="cursor",
+        parameters={"match": match},
+    ):
+        best[restaurant_id] = max(best.get(restaurant_id, float("-inf")), -score)
+    return best
+
+
+def fused_scores(db: SQLDatabase, terms: list[str]) -> dict[int, float]:
+    """
+    bigram 테이블이 없는 DB에서 trigram MATCH와 LIKE 결과를 합친 점수를 반환합니다.
+
+    3글자 이상 단어의 bm25 순위와 짧은 단어의 LIKE 일치 수 순위는 점수 단위가 다르므로
+    reciprocal rank fusion(1 / (RRF_K + 순위)의 합)으로 합칩니다.
+    """
+    rankings = []
+    long_terms = [t for t in terms if len(t) >= TRIGRAM_MIN_LENGTH]
+    short_terms = [t for t in terms if len(t) < TRIGRAM_MIN_LENGTH]
+
+    if long_terms:
+        rankings.append(
+            best_bm25(db, SEARCH_TABLE, " OR ".join(quote(t) for t in long_terms))
+        )
+
+    if short_terms:
+        counts = defaultdict(int)
+        for term in short_terms:
+            pattern = "%" + term.replace("%", "").replace("_", "") + "%"
+            for (restaurant_id,) in db._execute(
+                f"SELECT DISTINCT restaurant_id FROM {SEARCH_TABLE} "
+                "WHERE menu_name LIKE :p OR menu_review LIKE :p OR name LIKE :p "
+                "OR address LIKE :p",
+                fetch="cursor",
+                parameters={"p": pattern},
+            ):
+                counts[restaurant_id] += 1
+        rankings.append(counts)
+
+    scores = defaultdict(float)
+    for ranking in rankings:
+        ordered = sorted(ranking.items(), key=lambda item: item[1], reverse=True)
+        for rank, (restaurant_id, _) in enumerate(ordered, start=1):
+            scores[restaurant_id] += 1.0 / (RRF_K + rank)
+    return scores
+
+
+def search_restaurants(db: SQLDatabase, text: str, limit: int = 10) -> list[dict]:
+    """
+    메뉴 이름, 후기, 식당 이름, 주소에서 검색어를 찾아 관련도 순으로 식당을 반환합니다.
+
+    bigram 테이블이 있으면 모든 검색어를 한 번의 MATCH로 찾아 bm25 점수로 정렬하고,
+    없으면(이전 DB) trigram MATCH와 짧은 단어의 LIKE 결과를 순위 기준으로 합칩니다.
+
+    Returns:
+        list[dict]: [{"restaurant_id", "name", "score"}, ...] (점수가 높은 순)
+    """
+    terms = search_terms(text)
+    if not terms:
+        return []
+
+    if has_table(db, BIGRAM_TABLE):
+        scores = best_bm25(db, BIGRAM_TABLE, bigram_query(terms))
+    else:
+        scores = fused_scores(db, terms)
+
+    if not scores:
+        return []
+    ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:limit]
+    ids = [restaurant_id for restaurant_id, _ in ranked]
+    names = dict(
+        db._execute(
+            "SELECT id, name FROM restaurants "
+            f"WHERE id IN ({', '.join(str(int(i)) for i in ids)})",
+            fetch="cursor",
+        ).fetchall()
+    )
+    return [
+        {
+            "restaurant_id": restaurant_id,
+            "name": names.get(restaurant_id),
+            "score": score,
+        }
+        for restaurant_id, score in ranked
+    ]
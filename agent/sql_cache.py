@@ -0,0 +1,190 @@
+import re
+import threading
+from collections import OrderedDict
+from typing import Any, List, Optional, Sequence
+
+from langchain_community.utilities import SQLDatabase
+from langchain_community.utilities.sql_database import truncate_word
+
+from agent.config import get_logger
+from agent.db import DB_PATH, get_db_version
+
+# 로깅 설정
+logger = get_logger()
+
+# LLM에 보여줄 쿼리 결과 미리보기 행 수
+PREVIEW_ROWS = 5
+
+# 문자열 리터럴 ('...', 내부의 '' 이스케이프 포함)
+STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+# 테이블 별칭 선언 (FROM restaurants r / JOIN menus AS m)
+TABLE_ALIAS = re.compile(r"\b(from|join) (\w+)(?= (?:as )?(\w+))")
+# 별칭으로 오인하면 안 되는 키워드 (SQLite 키워드 목록, https://sqlite.org/lang_keywords.html)
+SQL_KEYWORDS = frozenset(
+    """
+    abort action add after all alter always analyze and as asc attach autoincrement
+    before begin between by cascade case cast check collate column commit conflict
+    constraint create cross current current_date current_time current_timestamp
+    database default deferrable deferred delete desc detach distinct do drop each
+    else end escape except exclude exclusive exists explain fail filter first
+    following for foreign from full generated glob group groups having if ignore
+    immediate in index indexed initially inner insert instead intersect into is
+    isnull join key last left like limit match materialized natural no not nothing
+    notnull null nulls of offset on or order others outer over partition plan
+    pragma preceding primary query raise range recursive references regexp reindex
+    release rename replace restrict returning right rollback row rows savepoint
+    select set table temp temporary then ties to transaction trigger unbounded
+    union unique update using vacuum values view virtual when where window with
+    without
+    """.split()
+)
+
+
+def canonicalize_sql(query: str) -> str:
+    """
+    공백, 대소문자, 주석, 끝의 세미콜론, 테이블 별칭 차이를 없앤 SQL 문자열을 반환합니다.
+
+    문자열 리터럴('%논현역%' 등)은 그대로 유지합니다.
+    """
+    literals = []
+
+    def stash(match):
+        literals.append(match.group(0))
+        return f"\x00{len(literals) - 1}\x00"
+
+    text = STRING_LITERAL.sub(stash, query)
+    text = re.sub(r"--[^\n]*", " ", text)
+    text = re.sub(r"/\*.*?\*/", " ", text, flags=re.S)
+    text = text.replace('"', "").replace("`", "").lower()
+    text = re.sub(r"\s*([(),=<>])\s*", r" \1 ", text)
+    text = re.sub(r"\s+", " ", text).strip().rstrip(";").strip()
+
+    # 테이블 별칭을 실제 테이블 이름으로 치환 (같은 테이블이 두 번 쓰인 경우는 제외)
+    aliases = {}
+    for _, table, alias in TABLE_ALIAS.findall(text):
+        if alias not in SQL_KEYWORDS and alias != table:
+            aliases[alias] = table
+    if aliases and len(set(aliases.values())) == len(aliases):
+        for alias, table in aliases.items():
+            text = re.sub(
+                rf"\b(from|join) {table} (?:as )?{alias}\b", rf"\1 {table}", text
+            )
+            text = re.sub(rf"\b{alias}\.", f"{table}.", text)
+
+    text = text.replace("( ", "(").replace(" )", ")").replace(" ,", ",")
+    return re.sub(r"\x00(\d+)\x00", lambda m: literals[int(m.group(1))], text)
+
+
+class QueryResult:
+    """쿼리 실행 결과 (컬럼 이름 + 행 목록, limited: 행 수 제한으로 잘렸는지 여부)"""
+
+    def __init__(self, columns: List[str], rows: List[tuple], limited: bool = False):
+        self.columns = columns
+        self.rows = rows
+        self.limited = limited
+
+    def to_text(self, max_string_length: int = 300) -> str:
+        """SQLDatabase.run과 같은 형식(튜플 리스트 문자열)으로 변환합니다."""
+        if not self.rows:
+            return ""
+        return str(
+            [
+                tuple(truncate_word(value, length=max_string_length) for value in row)
+                for row in self.rows
+            ]
+        )
+
+    def to_preview(
+        self,
+        result_id: str,
+        max_rows: int = PREVIEW_ROWS,
+        max_string_length: int = 100,
+    ) -> dict[str, Any]:
+        """컬럼 이름, 전체 행 수, 앞부분 행, 잘림 여부만 담은 미리보기를 반환합니다."""
+        preview = {
+            "result_id": result_id,
+            "columns": self.columns,
+            "row_count": len(self.rows),
+            "rows": [
+                [truncate_word(value, length=max_string_length) for value in row]
+                for row in self.rows[:max_rows]
+            ],
+            "truncated": len(self.rows) > max_rows,
+        }
+        # 행 수 제한으로 일부 행만 조회된 경우 (row_count는 제한된 행 수)
+        if self.limited:
+            preview["row_limit_reached"] = True
+        return preview
+
+
+class QueryCache:
+    """
+    (정규화된 SQL, 파라미터) -> QueryResult 캐시
+
+    LRU로 크기를 제한하며, DB 파일의 mtime/size가 바뀌면 전체를 무효화합니다.
+    """
+
+    def __init__(self, db: SQLDatabase, max_entries: int = 256, db_path: str = DB_PATH):
+        self.db = db
+        self.max_entries = max_entries
+        self.db_path = db_path
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._db_version = get_db_version(db_path)
+
+    def execute(self, query: str, params: Sequence = ()) -> QueryResult:
+        """캐시를 거치지 않고 쿼리를 실행합니다. (params는 ? 자리표시자에 바인딩)"""
+        with self.db._engine.connect() as connection:
+            cursor = connection.exec_driver_sql(query, tuple(params))
+            if not cursor.returns_rows:
+                return QueryResult([], [])
+            return QueryResult(list(cursor.keys()), [tuple(r) for r in cursor])
+
+    def run(self, query: str, params: Sequence = ()) -> QueryResult:
+        """캐시된 결과가 있으면 반환하고, 없으면 실행 후 저장합니다."""
+        key = (canonicalize_sql(query), tuple(params))
+        with self._lock:
+            version = get_db_version(self.db_path)
+            if version != self._db_version:
+                logger.info("QueryCache DB 변경 감지, 캐시를 초기화합니다.")
+                self._db_version = version
+                self._entries.clear()
+
+            cached = self._entries.get(key)
+            if cached is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return cached
+            self.misses += 1
+
+        result = self.execute(query, params)
+        # 조회 쿼리만 캐시
+        if key[0].startswith(("select", "with")):
+            with self._lock:
+                self._entries[key] = result
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return result
+
+    def get(self, query: str, params: Sequence = ()) -> Optional[QueryResult]:
+        """실행하지 않고 캐시된 결과만 조회합니다."""
+        with self._lock:
+            return self._entries.get((canonicalize_sql(query), tuple(params)))
+
+    def clear(self):
+        """캐시를 모두 비웁니다."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict[str, Any]:
+        """캐시 적중/미스 통계를 반환합니다."""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "size": len(self._entries),
+            }
@@ -0,0 +1,177 @@
+import os
+import re
+import sqlite3
+import time
+from typing import Optional, Sequence
+
+from agent.config import get_logger
+from agent.query_plan import VIRTUAL_INDEX
+from agent.sql_cache import STRING_LITERAL, QueryCache, QueryResult
+
+# 로깅 설정
+logger = get_logger()
+
+# 쿼리 실행 시간 제한 (초)
+QUERY_TIMEOUT_SECONDS = float(os.getenv("MEOKTEN_QUERY_TIMEOUT", "3"))
+# 쿼리 결과 최대 행 수 (LIMIT이 없는 쿼리에는 자동으로 추가)
+MAX_RESULT_ROWS = int(os.getenv("MEOKTEN_QUERY_MAX_ROWS", "300"))
+# 실행 시간을 확인할 간격 (SQLite VM 명령 수)
+PROGRESS_STEPS = 1000
+
+# 쿼리를 문자열 리터럴/식별자, 주석, 그 밖의 토큰으로 나누는 패턴 (리터럴 안의 '--'는 주석이 아님)
+SQL_TOKEN = re.compile(
+    rf"""{STRING_LITERAL.pattern}|"(?:[^"]|"")*"|--[^\n]*|/\*.*?(?:\*/|$)|[^\s;'"/-]+|\S""",
+    re.S,
+)
+# 토큰 안의 괄호와 그 밖의 부분 ('count(*)' -> 'count', '(', '*', ')')
+PAREN_PART = re.compile(r"[()]|[^()]+")
+
+
+class QueryRejected(Exception):
+    """실행 전 검사나 실행 시간 제한으로 거부된 쿼리"""
+
+    def __init__(self, reason: str):
+        super().__init__(reason)
+        self.reason = reason
+
+
+def strip_trailing_sql(query: str) -> str:
+    """쿼리 끝의 공백, 세미콜론, 주석을 제거합니다. ('SELECT ... ; -- 메모' -> 'SELECT ...')"""
+    end = 0
+    for match in SQL_TOKEN.finditer(query):
+        token = match.group()
+        if token != ";" and not token.startswith(("--", "/*")):
+            end = match.end()
+    return query[:end]
+
+
+def has_top_level_limit(query: str) -> bool:
+    """
+    괄호(서브쿼리, 함수 인자) 밖에 LIMIT 절이 있는지 확인합니다.
+
+    'LIMIT 10'뿐 아니라 'LIMIT (5)', 'LIMIT :n' 같은 식도 LIMIT 절로 봅니다.
+    문자열 리터럴, 따옴표 식별자, 주석 안의 'limit'은 무시합니다.
+    """
+    depth = 0
+    for match in SQL_TOKEN.finditer(query):
+        token = match.group()
+        if token.startswith(("'", '"', "--", "/*")):
+            continue
+        for part in PAREN_PART.findall(token):
+            if part == "(":
+                depth += 1
+            elif part == ")":
+                depth -= 1
+            elif depth == 0 and re.search(r"\blimit\b", part, re.I):
+                return True
+    return False
+
+
+def with_row_limit(query: str, max_rows: int = MAX_RESULT_ROWS) -> str:
+    """
+    쿼리 끝의 세미콜론과 주석을 떼고, LIMIT 절이 없으면 'LIMIT max_rows + 1'을 붙입니다.
+    (한 행을 더 읽어 잘림 여부를 판단, LIMIT 절이 있어도 fetchmany로 max_rows + 1행까지만 읽음)
+    """
+    query = strip_trailing_sql(query)
+    if has_top_level_limit(query):
+        return query
+    return f"{query}\nLIMIT {max_rows + 1}"
+
+
+def unbounded_join_scans(plan: list[tuple]) -> list[str]:
+    """
+    EXPLAIN QUERY PLAN 결과에서 중첩 루프로 실행되는 전체 스캔 단계를 반환합니다.
+
+    같은 SELECT 안에서 두 테이블 이상을 인덱스 없이 SCAN 하면(조인 조건 누락, CROSS JOIN 등)
+    행 수의 곱만큼 읽게 됩니다. 상관 서브쿼리는 바깥 행마다 다시 실행되므로 바깥 SELECT와 함께 셉니다.
+    """
+    nodes = {node_id: (parent, detail) for node_id, parent, _, detail in plan}
+
+    def loop_of(node_id):
+        parent = nodes[node_id][0]
+        ancestor = parent
+        while ancestor in nodes:
+            if nodes[ancestor][1].startswith("CORRELATED"):
+                return loop_of(ancestor)
+            ancestor = nodes[ancestor][0]
+        return parent
+
+    loops = {}
+    for node_id, (_, detail) in nodes.items():
+        if (
+            detail.startswith("SCAN ")
+            and "CONSTANT ROW" not in detail
+            and not VIRTUAL_INDEX.search(detail)
+        ):
+            loops.setdefault(loop_of(node_id), []).append(detail)
+    return [detail for scans in loops.values() if len(scans) > 1 for detail in scans]
+
+
+def check_query_cost(
+    connection: sqlite3.Connection, query: str, params: Sequence = ()
+) -> Optional[str]:
+    """실행 계획에 중첩 전체 스캔이 있으면 거부 사유를, 없으면 None을 반환합니다."""
+    plan = connection.execute(f"EXPLAIN QUERY PLAN {query}", params).fetchall()
+    scans = unbounded_join_scans(plan)
+    if scans:
+        return f"조인에서 인덱스 없이 전체 스캔: {', '.join(scans)}"
+    return None
+
+
+def run_guarded_query(
+    connection: sqlite3.Connection,
+    query: str,
+    params: Sequence = (),
+    timeout: float = QUERY_TIMEOUT_SECONDS,
+    max_rows: int = MAX_RESULT_ROWS,
+) -> tuple[list[str], list[tuple], bool]:
+    """
+    실행 계획 검사, LIMIT 추가, 실행 시간 제한을 적용하여 쿼리를 실행합니다.
+    params는 쿼리의 ? 자리표시자에 바인딩합니다.
+
+    Returns:
+        tuple: (컬럼 이름, 행 목록(최대 max_rows개), 행 수 제한으로 잘렸는지 여부)
+
+    Raises:
+        QueryRejected: 중첩 전체 스캔이 있거나 실행 시간이 timeout을 넘은 경우
+    """
+    reason = check_query_cost(connection, query, params)
+    if reason:
+        logger.warning(f"쿼리 거부 ({reason}): {query}")
+        raise QueryRejected(reason)
+
+    deadline = time.monotonic() + timeout
+    # progress handler가 0이 아닌 값을 반환하면 SQLite가 실행을 중단함
+    connection.set_progress_handler(lambda: time.monotonic() > deadline, PROGRESS_STEPS)
+    cursor = connection.cursor()
+    try:
+        cursor.execute(with_row_limit(query, max_rows), params)
+        if cursor.description is None:
+            return [], [], False
+        columns = [column[0] for column in cursor.description]
+        rows = cursor.fetchmany(max_rows + 1)
+    except sqlite3.OperationalError as e:
+        if "interrupted" not in str(e):
+            raise
+        reason = f"실행 시간 초과 ({timeout:g}초)"
+        logger.warning(f"쿼리 거부 ({reason}): {query}")
+        raise QueryRejected(reason) from e
+    finally:
+        cursor.close()
+        connection.set_progress_handler(None, 0)
+
+    limited = len(rows) > max_rows
+    if limited:
+        logger.warning(f"쿼리 결과를 {max_rows}행으로 제한: {query}")
+    return columns, rows[:max_rows], limited
+
+
+class GuardedQueryCache(QueryCache):
+    """실행 계획 검사, 행 수 제한, 실행 시간 제한을 적용하여 쿼리를 실행하는 QueryCache"""
+
+    def execute(self, query: str, params: Sequence = ()) -> QueryResult:
+        with self.db._engine.connect() as connection:
+            columns, rows, limited = run_guarded_query(
+                connection.connection.driver_connection, query, tuple(params)
+            )
+        return QueryResult(columns, [tuple(row) for row in rows], limited=limited)
@@ -0,0 +1,83 @@
+import re
+
+from langchain_community.utilities import SQLDatabase
+
+from agent.config import get_logger
+from agent.sql_cache import STRING_LITERAL, canonicalize_sql
+
+# 로깅 설정
+logger = get_logger()
+
+# 에이전트가 조회할 수 있는 테이블 (restaurant_cards: 식당 1곳당 1행으로 메뉴를 이어 붙인 테이블)
+ALLOWED_TABLES = {"restaurants", "menus", "restaurant_cards"}
+
+# 데이터베이스를 변경하는 구문 ('replace'는 replace() 문자열 함수와 구분하여 REPLACE INTO만)
+FORBIDDEN_KEYWORDS = re.compile(
+    r"\b(insert|update|delete|drop|alter|create|replace(?= into\b)|attach|detach|pragma|vacuum|reindex)\b"
+)
+
+# restaurants와 menus의 올바른 JOIN 조건
+JOIN_CONDITION = re.compile(
+    r"restaurants\.id = menus\.restaurant_id|menus\.restaurant_id = restaurants\.id"
+)
+
+
+# FROM 절의 끝을 나타내는 키워드
+FROM_CLAUSE = re.compile(
+    r"\bfrom (.+?)(?= where | (?:inner |left |cross |natural )?join | group | order "
+    r"| limit | union |\)|$)"
+)
+
+
+def referenced_tables(canonical: str) -> set:
+    """정규화된 SQL에서 FROM/JOIN 절의 테이블 이름을 추출합니다. (콤마 JOIN 포함)"""
+    tables = set(re.findall(r"\bjoin (\w+)", canonical))
+    for clause in FROM_CLAUSE.findall(canonical):
+        for item in clause.split(","):
+            if item.strip():
+                tables.add(item.split()[0])
+    return tables
+
+
+def validate_query(db: SQLDatabase, query: str) -> tuple[bool, str]:
+    """
+    LLM이 생성한 SQL을 로컬에서 검증합니다.
+
+    조회(SELECT) 단일 문장인지, restaurants/menus/restaurant_cards 테이블만 사용하는지,
+    두 테이블을 함께 쓰면 restaurants.id = menus.restaurant_id로 JOIN 하는지 확인하고
+    마지막으로 SQLite의 EXPLAIN으로 실제 컴파일이 되는지 확인합니다.
+
+    Returns:
+        tuple: (통과 여부, 실패 사유)
+    """
+    # 문자열 리터럴 내용은 검사 대상에서 제외
+    canonical = STRING_LITERAL.sub("''", canonicalize_sql(query))
+    if not canonical:
+        return False, "빈 쿼리"
+    if ";" in canonical:
+        return False, "여러 개의 SQL 문장"
+    if not canonical.startswith(("select", "with")):
+        return False, "SELECT 문이 아님"
+    forbidden = FORBIDDEN_KEYWORDS.search(canonical)
+    if forbidden:
+        return False, f"허용되지 않는 구문: {forbidden.group(1)}"
+
+    tables = referenced_tables(canonical)
+    if not tables:
+        return False, "조회 테이블 없음"
+    if not tables <= ALLOWED_TABLES:
+        return (
+            False,
+            f"허용되지 않는 테이블: {', '.join(sorted(tables - ALLOWED_TABLES))}",
+        )
+    if {"restaurants", "menus"} <= tables and not JOIN_CONDITION.search(canonical):
+        return False, "restaurants.id = menus.restaurant_id JOIN 조건 없음"
+
+    # SQLite가 쿼리를 컴파일할 수 있는지 확인 (존재하지 않는 컬럼, 문법 오류 등)
+    try:
+        with db._engine.connect() as connection:
+            connection.exec_driver_sql(f"EXPLAIN {query}").fetchall()
+    except Exception as e:
+        return False, f"EXPLAIN 실패: {str(e).splitlines()[0]}"
+
+    return True, ""
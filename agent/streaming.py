@@ -0,0 +1,87 @@
+from langchain_core.utils.json import parse_json_markdown, parse_partial_json
+
+# 스트리밍 중 화면에 표시할 노드별 진행 상황 메시지 (노드 실행이 끝날 때 전달됨)
+NODE_LABELS = {
+    "rule_based_query": "질문을 분석했어요.",
+    "first_tool_call": "테이블 목록을 확인했어요.",
+    "list_tables_tool": "테이블 목록을 불러왔어요.",
+    "model_get_schema": "필요한 테이블을 골랐어요.",
+    "get_schema_tool": "테이블 구조를 확인했어요.",
+    "query_gen": "검색 쿼리를 만들었어요.",
+    "search_tools": "검색 도구로 식당을 찾았어요.",
+    "correct_query": "검색 쿼리를 검토했어요.",
+    "execute_query": "식당을 검색했어요.",
+    "process_query_result": "검색 결과를 확인했어요.",
+    "generate_answer": "답변을 완성했어요.",
+}
+
+
+class AnswerStreamParser:
+    """
+    answer_gen이 생성하는 JSON 토큰을 누적하면서 부분 파싱합니다.
+    answer_summary처럼 JSON이 아닌 일반 텍스트는 그대로 answer로 사용합니다.
+
+    feed()는 새로 확인된 answer 텍스트와 완성된 infos 원소를 이벤트로 반환합니다.
+    infos의 마지막 원소는 아직 생성 중일 수 있으므로 다음 원소가 시작되거나
+    finish()가 호출될 때 내보냅니다.
+    """
+
+    def __init__(self):
+        self.buffer = ""
+        self.answer = ""
+        self.emitted_infos = 0
+
+    def feed(self, token: str) -> list[dict]:
+        """토큰을 추가하고 새로 생성된 이벤트 목록을 반환합니다."""
+        self.buffer += token
+        text = self.buffer.lstrip()
+        if not text:
+            return []
+        if not text.startswith(("{", "`")):
+            return self.answer_events(text.rstrip())
+
+        try:
+            parsed = parse_json_markdown(self.buffer, parser=parse_partial_json)
+        except Exception:
+            return []
+        if not isinstance(parsed, dict):
+            return []
+
+        events = []
+        answer = parsed.get("answer")
+        if isinstance(answer, str):
+            events.extend(self.answer_events(answer))
+
+        infos = parsed.get("infos")
+        if isinstance(infos, list):
+            events.extend(self.info_events(infos[:-1]))
+        return events
+
+    def answer_events(self, answer: str) -> list[dict]:
+        if len(answer) <= len(self.answer):
+            return []
+        delta = answer[len(self.answer) :]
+        self.answer = answer
+        return [{"type": "answer", "text": answer, "delta": delta}]
+
+    def finish(self, result: dict) -> list[dict]:
+        """최종 결과를 기준으로 아직 내보내지 않은 이벤트를 반환합니다."""
+        events = []
+        answer = result.get("answer")
+        if isinstance(answer, str) and answer != self.answer:
+            delta = (
+                answer[len(self.answer) :] if answer.startswith(self.answer) else answer
+            )
+            events.append({"type": "answer", "text": answer, "delta": delta})
+            self.answer = answer
+        infos = result.get("infos")
+        if isinstance(infos, list):
+            events.extend(self.info_events(infos))
+        return events
+
+    def info_events(self, infos: list) -> list[dict]:
+        events = []
+        for index in range(self.emitted_infos, len(infos)):
+            events.append({"type": "info", "index": index, "info": infos[index]})
+        self.emitted_infos = max(self.emitted_infos, len(infos))
+        return events
@@ -1,53 +1,251 @@
-from typing import Any
+import json
+from typing import Annotated, Any, Optional
 
+from langchain_community.tools.sql_database.tool import (
+    InfoSQLDatabaseTool,
+    ListSQLDatabaseTool,
+)
 from langchain_core.messages import ToolMessage
 from langchain_core.runnables import RunnableLambda, RunnableWithFallbacks
-from langchain_core.tools import tool
+from langchain_core.tools import BaseTool, InjectedToolArg, StructuredTool, tool
 from langgraph.prebuilt import ToolNode
 
-from agent.db import get_db_connection
+from agent.db import DB_PATH, get_db, get_db_connection
 from agent.config import get_logger
+from agent.geo import (
+    has_geo_index,
+    has_station_index,
+    nearby_restaurants,
+    restaurant_location,
+    restaurants_near_station,
+)
+from agent.registry import registry
+from agent.result_store import ResultStore
+from agent.search import has_search_index, search_restaurants
+from agent.sql_guard import GuardedQueryCache, QueryRejected
+from agent.vector_index import VectorIndex, vector_search_restaurants
 
 # 로깅 설정
 logger = get_logger()
 
-# 도구 가져오기
-db, toolkit = get_db_connection()
-tools = toolkit.get_tools()
+# 메시지 기록 밖에 보관하는 쿼리 결과 (메시지에는 result_id와 미리보기만 남김)
+result_store = ResultStore()
 
-# 테이블 목록 도구
-list_tables_tool = next(tool for tool in tools if tool.name == "sql_db_list_tables")
 
-# 스키마 가져오기 도구
-get_schema_tool = next(tool for tool in tools if tool.name == "sql_db_schema")
+@registry.resource("sql_tools")
+def get_sql_tools() -> dict[str, BaseTool]:
+    """SQLDatabaseToolkit 도구를 이름별로 반환합니다. (sql_db_list_tables, sql_db_schema 등)"""
+    _, toolkit = get_db_connection()
+    return {sql_tool.name: sql_tool for sql_tool in toolkit.get_tools()}
+
+
+def get_sql_tool(name: str) -> BaseTool:
+    return get_sql_tools()[name]
+
+
+def sql_tool_proxy(tool_class: type[BaseTool]) -> BaseTool:
+    """
+    호출할 때마다 현재 DB의 툴킷 도구를 실행하는 도구를 만듭니다.
+
+    그래프에 넣어둔 도구도 DB 스냅샷이 교체되면 새 DB를 사용합니다.
+    """
+    fields = tool_class.model_fields
+    name = fields["name"].default
+    return StructuredTool.from_function(
+        func=lambda **kwargs: get_sql_tool(name).invoke(kwargs),
+        name=name,
+        description=fields["description"].default,
+        args_schema=fields["args_schema"].default,
+    )
+
+
+list_tables_tool = sql_tool_proxy(ListSQLDatabaseTool)
+schema_tool = sql_tool_proxy(InfoSQLDatabaseTool)
+
+
+# 정규화된 SQL 기준 쿼리 결과 캐시 (실행 계획 검사, 행 수/실행 시간 제한 적용)
+@registry.resource("query_cache")
+def get_query_cache() -> GuardedQueryCache:
+    return GuardedQueryCache(get_db())
 
 
 # 쿼리 실행 도구
 @tool
-def db_query_tool(query: str) -> str:
+def db_query_tool(
+    query: str, params: Annotated[Optional[list], InjectedToolArg] = None
+) -> str:
     """
     Run SQL queries against a database and return results
     Returns an error message if the query is incorrect
     If an error is returned, rewrite the query, check, and retry
+    Results are returned as JSON: result_id, columns, row_count,
+    the first rows as a preview, and truncated (true if more rows exist)
     """
-    # 쿼리 실행
+    # 쿼리 실행 (params: 규칙 기반 쿼리의 ? 자리표시자 값, LLM에는 노출하지 않음)
     try:
         logger.info(f"실행할 쿼리: {query}")
-        result = db.run_no_throw(query)
+        if params:
+            logger.info(f"쿼리 파라미터: {params}")
+        query_cache = get_query_cache()
+        result = query_cache.run(query, params or ())
 
         # 에러: 결과가 없는 경우
-        if not result:
+        if not result.rows:
             logger.warning("쿼리 실패")
             return "Error: Query failed. Please rewrite your query and try again."
 
-        # 성공: 쿼리 실행 결과 반환
-        logger.info("쿼리 성공")
-        return result
+        # 성공: 전체 결과는 저장소에 두고 미리보기만 반환
+        result_id = result_store.put(query, result)
+        logger.info(
+            f"쿼리 성공 ({result_id}, {len(result.rows)}행, "
+            f"캐시 통계: {query_cache.stats()})"
+        )
+        return json.dumps(result.to_preview(result_id), ensure_ascii=False, default=str)
+    except QueryRejected as e:
+        return (
+            f"Error: Query rejected ({e.reason}). Join tables only on their id "
+            "columns, add a more selective WHERE clause or a LIMIT, and try again."
+        )
     except Exception as e:
         logger.error(f"쿼리 실행 중 오류: {str(e)}")
         return f"Error: {str(e)}"
 
 
+# 메뉴/후기 전문 검색 도구
+@tool
+def menu_search_tool(keywords: str, limit: int = 10) -> str:
+    """
+    Full-text search over menu names, menu reviews, restaurant names and addresses.
+    Use it for taste or review expressions (e.g. "국물이 진한", "바삭한 튀김").
+    Returns restaurant ids ranked by relevance (bm25) as JSON.
+    Then filter the SQL query by restaurant id IN (<ids>).
+    """
+    try:
+        logger.info(f"검색어: {keywords}")
+        results = search_restaurants(get_db(), keywords, limit=limit)
+        if not results:
+            return "Error: No restaurants matched. Try other keywords or write a SQL query."
+        return json.dumps(results, ensure_ascii=False)
+    except Exception as e:
+        logger.error(f"검색 중 오류: {str(e)}")
+        return f"Error: {str(e)}"
+
+
+# DB 파일 옆의 메뉴/후기 벡터 인덱스 (없으면 None, DB 내용이 바뀌었으면 다시 만듦)
+@registry.resource("vector_index")
+def get_vector_index() -> Optional[VectorIndex]:
+    # DB 스냅샷이 교체되면 인덱스도 다시 불러오도록 DB 연결에 의존
+    get_db_connection()
+    return VectorIndex.load(DB_PATH, rebuild_stale=True)
+
+
+# 메뉴/후기 벡터 검색 도구
+@tool
+def vector_search_tool(query: str, k: int = 10) -> str:
+    """
+    Similarity search over menu names, menu reviews and restaurant names.
+    Use it for moods or situations that are not menu types or exact words
+    (e.g. "비 오는 날 먹기 좋은", "해장하기 좋은", "든든한 한 끼").
+    Returns restaurant ids ranked by similarity score as JSON.
+    Then filter the SQL query by restaurant id IN (<ids>).
+    """
+    try:
+        logger.info(f"벡터 검색: {query}")
+        index = get_vector_index()
+        if index is None:
+            return "Error: No vector index. Use menu_search_tool or write a SQL query."
+        results = vector_search_restaurants(get_db(), index, query, limit=k)
+        if not results:
+            return (
+                "Error: No similar restaurants. Try other words or write a SQL query."
+            )
+        return json.dumps(results, ensure_ascii=False)
+    except Exception as e:
+        logger.error(f"벡터 검색 중 오류: {str(e)}")
+        return f"Error: {str(e)}"
+
+
+# 좌표 기반 주변 식당 검색 도구
+@tool
+def nearby_restaurants_tool(
+    lat: Optional[float] = None,
+    lng: Optional[float] = None,
+    radius_m: float = 1000,
+    k: int = 10,
+    restaurant_name: Optional[str] = None,
+) -> str:
+    """
+    Find restaurants within radius_m meters of a point, nearest first.
+    Pass lat/lng (e.g. "37.51,127.02 근처" -> lat=37.51, lng=127.02),
+    or restaurant_name to search around that restaurant (it is excluded from results).
+    Returns restaurant ids with distance_m as JSON.
+    Then filter the SQL query by restaurant id IN (<ids>).
+    """
+    try:
+        exclude_id = None
+        if lat is None or lng is None:
+            if not restaurant_name:
+                return "Error: Provide lat and lng, or restaurant_name."
+            origin = restaurant_location(get_db(), restaurant_name)
+            if not origin:
+                return f"Error: No coordinates for restaurant '{restaurant_name}'."
+            lat, lng, exclude_id = origin["lat"], origin["lng"], origin["restaurant_id"]
+        logger.info(f"주변 검색: ({lat}, {lng}) 반경 {radius_m}m")
+        results = nearby_restaurants(
+            get_db(), lat, lng, radius_m=radius_m, k=k, exclude_id=exclude_id
+        )
+        if not results:
+            return "Error: No restaurants nearby. Try a larger radius_m."
+        return json.dumps(results, ensure_ascii=False)
+    except Exception as e:
+        logger.error(f"주변 검색 중 오류: {str(e)}")
+        return f"Error: {str(e)}"
+
+
+# 지하철역 기준 거리순 식당 검색 도구
+@tool
+def station_restaurants_tool(
+    station: str, max_distance_m: int = 500, k: int = 20
+) -> str:
+    """
+    Find restaurants within max_distance_m meters of a subway station, nearest first.
+    Use it for questions like "논현역에서 300m 이내" or "강남역에서 가까운 순".
+    station is the station name (e.g. "논현역" or "논현").
+    Returns restaurant ids with distance_m as JSON.
+    Then filter the SQL query by restaurant id IN (<ids>).
+    """
+    try:
+        logger.info(f"역 주변 검색: {station} {max_distance_m}m 이내")
+        results = restaurants_near_station(
+            get_db(), station, max_distance_m=max_distance_m, k=k
+        )
+        if not results:
+            return (
+                f"Error: No restaurants within {max_distance_m}m of '{station}'. "
+                "Try a larger max_distance_m or write a SQL query."
+            )
+        return json.dumps(results, ensure_ascii=False)
+    except Exception as e:
+        logger.error(f"역 주변 검색 중 오류: {str(e)}")
+        return f"Error: {str(e)}"
+
+
+# DB에 전문 검색 테이블/공간 인덱스가 있을 때만 query_gen에 제공할 검색 도구
+@registry.resource("search_tools")
+def get_search_tools() -> list[BaseTool]:
+    db = get_db()
+    return [
+        search_tool
+        for search_tool, available in [
+            (menu_search_tool, has_search_index(db)),
+            (vector_search_tool, get_vector_index() is not None),
+            (nearby_restaurants_tool, has_geo_index(db)),
+            (station_restaurants_tool, has_station_index(db)),
+        ]
+        if available
+    ]
+
+
 # 에러 처리 함수
 def handle_tool_error(state) -> dict:
     """도구 에러 처리 함수"""
@@ -76,3 +274,9 @@ def create_tool_node_with_fallback(tools: list) -> RunnableWithFallbacks[Any, di
     return ToolNode(tools).with_fallbacks(
         [RunnableLambda(handle_tool_error)], exception_key="error"
     )
+
+
+# 현재 검색 도구로 만든 도구 노드 (DB가 교체되어 search_tools가 다시 만들어지면 함께 다시 생성)
+@registry.resource("search_tool_node")
+def get_search_tool_node() -> RunnableWithFallbacks[Any, dict]:
+    return create_tool_node_with_fallback(get_search_tools())
@@ -0,0 +1,343 @@
+"""
+메뉴/후기 벡터 검색 인덱스
+
+'메뉴 이름 + 메뉴 후기 + 식당 이름'을 임베딩하여 DB 파일 옆에 float32 행렬(.vectors.npy)로
+저장하고, 검색할 때는 메모리 매핑으로 열어 NumPy 행렬 곱으로 비슷한 식당을 찾습니다.
+기본 임베더는 네트워크 없이 동작하는 문자 n-gram 해싱 TF-IDF이며,
+register_embedder로 다른 임베더를 등록해서 사용할 수 있습니다.
+
+사용 예:
+    python -m agent.vector_index
+    python -m agent.vector_index --dim 4096 --query "비 오는 날 먹기 좋은"
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import time
+import zlib
+from typing import Any, Callable, Optional
+
+import numpy as np
+from langchain_community.utilities import SQLDatabase
+
+from agent.config import get_logger
+from agent.db import DB_PATH, connect_readonly
+from agent.search import search_terms
+
+# 로깅 설정
+logger = get_logger()
+
+# 한 번에 곱할 인덱스 행 수
+BATCH_ROWS = 8192
+# 식당 단위로 묶기 전에 고를 후보 행 수 (k의 배수)
+CANDIDATE_FACTOR = 8
+
+# 인덱스에 넣을 문서 (메뉴가 없는 식당은 식당 이름만 사용)
+DOCUMENT_QUERY = """
+SELECT r.id, r.name, m.menu_name, m.menu_review
+FROM restaurants r LEFT JOIN menus m ON m.restaurant_id = r.id
+ORDER BY r.id, m.id
+"""
+
+
+class HashingEmbedder:
+    """
+    문자 n-gram을 해시 버킷으로 모아 TF-IDF 가중치를 준 벡터를 만드는 임베더
+
+    단어 앞뒤에 공백을 붙여 n-gram을 만들고, crc32로 dim개의 버킷에 나눕니다.
+    '해장국' -> ' 해', '해장', '장국', '국 ', ' 해장', ... 처럼 띄어쓰기나 조사가 달라도
+    겹치는 n-gram이 많으면 비슷한 벡터가 됩니다. 벡터는 L2 정규화하므로 내적이 코사인 유사도입니다.
+    """
+
+    name = "char-ngram-tfidf"
+
+    def __init__(
+        self,
+        dim: int = 2048,
+        ngram_range: tuple[int, int] = (1, 3),
+        idf: Optional[list[float]] = None,
+    ):
+        self.dim = dim
+        self.ngram_range = tuple(ngram_range)
+        self.idf = (
+            np.asarray(idf, dtype=np.float32)
+            if idf is not None
+            else np.ones(dim, dtype=np.float32)
+        )
+
+    def ngrams(self, text: str) -> list[str]:
+        grams = []
+        for word in re.sub(r"[^\w]+", " ", (text or "").lower()).split():
+            padded = f" {word} "
+            for n in range(self.ngram_range[0], self.ngram_range[1] + 1):
+                grams.extend(
+                    gram
+                    for gram in (padded[i : i + n] for i in range(len(padded) - n + 1))
+                    if gram.strip()
+                )
+        return grams
+
+    def counts(self, texts: list[str]) -> np.ndarray:
+        """문서별 n-gram 버킷 등장 횟수 행렬을 반환합니다."""
+        matrix = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            buckets = [
+                zlib.crc32(gram.encode("utf-8")) % self.dim
+                for gram in self.ngrams(text)
+            ]
+            if buckets:
+                matrix[row] = np.bincount(buckets, minlength=self.dim)
+        return matrix
+
+    def fit(self, texts: list[str]):
+        """문서 집합으로 버킷별 IDF를 계산합니다."""
+        document_frequency = (self.counts(texts) > 0).sum(axis=0)
+        self.idf = (np.log((1 + len(texts)) / (1 + document_frequency)) + 1).astype(
+            np.float32
+        )
+
+    def embed(self, texts: list[str]) -> np.ndarray:
+        """L2 정규화한 (문서 수, dim) float32 행렬을 반환합니다."""
+        vectors = np.log1p(self.counts(texts)) * self.idf
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return (vectors / np.maximum(norms, 1e-12)).astype(np.float32)
+
+    def config(self) -> dict:
+        return {
+            "name": self.name,
+            "dim": self.dim,
+            "ngram_range": list(self.ngram_range),
+            "idf": [round(float(value), 6) for value in self.idf],
+        }
+
+    @classmethod
+    def from_config(cls, config: dict) -> "HashingEmbedder":
+        return cls(config["dim"], config["ngram_range"], config["idf"])
+
+
+# 임베더 이름 -> 저장된 설정으로 임베더를 만드는 함수
+# (임베더는 name, fit(texts), embed(texts) -> L2 정규화된 float32 행렬, config()를 제공)
+EMBEDDERS: dict[str, Callable[[dict], Any]] = {
+    HashingEmbedder.name: HashingEmbedder.from_config
+}
+
+
+def register_embedder(name: str, factory: Callable[[dict], Any]):
+    """인덱스를 불러올 때 사용할 임베더를 등록합니다."""
+    EMBEDDERS[name] = factory
+
+
+def index_paths(db_path: str = DB_PATH) -> tuple[str, str]:
+    """DB 파일 옆에 저장하는 (벡터 행렬 .npy, 메타데이터 .json) 경로를 반환합니다."""
+    return f"{db_path}.vectors.npy", f"{db_path}.vectors.json"
+
+
+def load_documents(db_path: str = DB_PATH) -> tuple[list[int], list[str]]:
+    """인덱스에 넣을 (식당 id, '메뉴 이름 메뉴 후기 식당 이름') 목록을 읽습니다."""
+    connection = connect_readonly(db_path)
+    try:
+        rows = connection.execute(DOCUMENT_QUERY).fetchall()
+    finally:
+        connection.close()
+    restaurant_ids = [row[0] for row in rows]
+    texts = [
+        " ".join(part for part in (menu_name, menu_review, name) if part)
+        for _, name, menu_name, menu_review in rows
+    ]
+    return restaurant_ids, texts
+
+
+def documents_sha256(restaurant_ids: list[int], texts: list[str]) -> str:
+    """
+    인덱스 문서 내용의 SHA-256을 반환합니다.
+
+    파일 inode/mtime이 아닌 내용 기준이므로 DB를 복사하거나 다운로드로 교체해도
+    식당 id와 메뉴/후기가 같으면 같은 값이 됩니다.
+    """
+    digest = hashlib.sha256()
+    for restaurant_id, text in zip(restaurant_ids, texts):
+        digest.update(f"{restaurant_id}\t{text}\n".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def build_index(db_path: str = DB_PATH, embedder=None) -> int:
+    """
+    DB의 메뉴/후기로 벡터 인덱스를 만들어 DB 파일 옆에 저장합니다.
+
+    Returns:
+        int: 인덱스 행 수
+    """
+    embedder = embedder or HashingEmbedder()
+    restaurant_ids, texts = load_documents(db_path)
+    embedder.fit(texts)
+    matrix = embedder.embed(texts)
+
+    matrix_path, meta_path = index_paths(db_path)
+    # 검색 중인 프로세스가 반쯤 쓴 파일을 읽지 않도록 임시 파일에 쓴 뒤 교체
+    np.save(f"{matrix_path}.tmp.npy", matrix)
+    with open(f"{meta_path}.tmp", "w", encoding="utf-8") as f:
+        json.dump(
+            {
+                "embedder": embedder.config(),
+                "restaurant_ids": restaurant_ids,
+                "documents_sha256": documents_sha256(restaurant_ids, texts),
+            },
+            f,
+        )
+    os.replace(f"{matrix_path}.tmp.npy", matrix_path)
+    os.replace(f"{meta_path}.tmp", meta_path)
+    logger.info(
+        f"벡터 인덱스 생성 완료: {matrix_path} ({matrix.shape[0]}행, {matrix.shape[1]}차원)"
+    )
+    return matrix.shape[0]
+
+
+class VectorIndex:
+    """메모리 매핑한 벡터 행렬과 행별 식당 id로 비슷한 식당을 찾는 인덱스"""
+
+    def __init__(self, matrix: np.ndarray, restaurant_ids: np.ndarray, embedder):
+        self.matrix = matrix
+        self.restaurant_ids = restaurant_ids
+        self.embedder = embedder
+
+    @classmethod
+    def load(
+        cls, db_path: str = DB_PATH, rebuild_stale: bool = False
+    ) -> Optional["VectorIndex"]:
+        """
+        DB 파일 옆의 인덱스를 불러옵니다.
+
+        인덱스가 없거나, 행렬 행 수와 식당 id 수가 다르면 None을 반환합니다.
+        현재 DB의 메뉴/후기 내용과 다르면(없는 식당 id를 반환할 수 있음)
+        rebuild_stale이면 같은 임베더 설정으로 다시 만들고, 아니면 None을 반환합니다.
+        """
+        matrix_path, meta_path = index_paths(db_path)
+        if not (os.path.exists(matrix_path) and os.path.exists(meta_path)):
+            return None
+        with open(meta_path, encoding="utf-8") as f:
+            meta = json.load(f)
+        config = meta["embedder"]
+        if config["name"] not in EMBEDDERS:
+            logger.warning(
+                f"등록되지 않은 임베더라 벡터 인덱스를 사용하지 않습니다: {config['name']}"
+            )
+            return None
+        try:
+            current_sha256 = documents_sha256(*load_documents(db_path))
+        except sqlite3.Error as e:
+            logger.warning(f"벡터 인덱스 검증용 문서를 읽지 못했습니다: {str(e)}")
+            return None
+        if meta.get("documents_sha256") != current_sha256:
+            if not rebuild_stale:
+                logger.warning(
+                    "벡터 인덱스가 현재 DB 내용과 달라 사용하지 않습니다. "
+                    "python -m agent.vector_index 로 다시 만드세요."
+                )
+                return None
+            logger.info("벡터 인덱스가 현재 DB 내용과 달라 다시 만듭니다.")
+            try:
+                build_index(db_path, EMBEDDERS[config["name"]](config))
+            except OSError as e:
+                logger.warning(f"벡터 인덱스를 다시 만들지 못했습니다: {str(e)}")
+                return None
+            return cls.load(db_path)
+        matrix = np.load(matrix_path, mmap_mode="r")
+        restaurant_ids = np.asarray(meta["restaurant_ids"], dtype=np.int64)
+        if matrix.ndim != 2 or matrix.shape[0] != len(restaurant_ids):
+            logger.warning(
+                f"벡터 인덱스 행 수({matrix.shape[0]})와 식당 id 수({len(restaurant_ids)})가 "
+                "달라 사용하지 않습니다."
+            )
+            return None
+        logger.info(f"벡터 인덱스 로드: {matrix.shape[0]}행, {matrix.shape[1]}차원")
+        return cls(matrix, restaurant_ids, EMBEDDERS[config["name"]](config))
+
+    def scores(self, texts: list[str]) -> np.ndarray:
+        """(질의 수, 인덱스 행 수) 코사인 유사도 행렬을 반환합니다. (BATCH_ROWS 행씩 곱함)"""
+        queries = self.embedder.embed(texts)
+        scores = np.empty((len(texts), self.matrix.shape[0]), dtype=np.float32)
+        for start in range(0, self.matrix.shape[0], BATCH_ROWS):
+            batch = self.matrix[start : start + BATCH_ROWS]
+            scores[:, start : start + len(batch)] = queries @ batch.T
+        return scores
+
+    def search_many(
+        self, texts: list[str], k: int = 10
+    ) -> list[list[tuple[int, float]]]:
+        """질의마다 유사도가 높은 식당 (id, 점수)를 최대 k개씩 반환합니다. (식당별 최고 점수)"""
+        if not len(self.restaurant_ids):
+            return [[] for _ in texts]
+        results = []
+        for row_scores in self.scores(texts):
+            # 전체 정렬 대신 argpartition으로 상위 후보 행만 고른 뒤 정렬
+            candidates = min(len(row_scores), k * CANDIDATE_FACTOR)
+            top = np.argpartition(-row_scores, candidates - 1)[:candidates]
+            top = top[np.argsort(-row_scores[top])]
+            ranked = {}
+            for row in top:
+                score = float(row_scores[row])
+                if score <= 0 or len(ranked) >= k:
+                    break
+                ranked.setdefault(int(self.restaurant_ids[row]), score)
+            results.append(list(ranked.items()))
+        return results
+
+    def search(self, text: str, k: int = 10) -> list[tuple[int, float]]:
+        return self.search_many([text], k)[0]
+
+
+def vector_search_restaurants(
+    db: SQLDatabase, index: VectorIndex, text: str, limit: int = 10
+) -> list[dict]:
+    """
+    질문과 의미가 비슷한 메뉴/후기를 가진 식당을 유사도 순으로 반환합니다.
+
+    Returns:
+        list[dict]: [{"restaurant_id", "name", "score"}, ...] (점수가 높은 순)
+    """
+    # 조사/불용어('추천', '맛집' 등)는 n-gram이 겹쳐 점수를 흐리므로 제거
+    query = " ".join(search_terms(text)) or text
+    ranked = index.search(query, k=limit)
+    if not ranked:
+        return []
+    names = dict(
+        db._execute(
+            "SELECT id, name FROM restaurants "
+            f"WHERE id IN ({', '.join(str(int(i)) for i, _ in ranked)})",
+            fetch="cursor",
+        ).fetchall()
+    )
+    return [
+        {
+            "restaurant_id": restaurant_id,
+            "name": names.get(restaurant_id),
+            "score": round(score, 4),
+        }
+        for restaurant_id, score in ranked
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="메뉴/후기 벡터 검색 인덱스 생성")
+    parser.add_argument("--db", default=DB_PATH, help="DB 파일 경로")
+    parser.add_argument("--dim", type=int, default=2048, help="해시 벡터 차원")
+    parser.add_argument("--query", action="append", help="생성 후 검색해 볼 질문")
+    parser.add_argument("--k", type=int, default=5, help="검색 결과 수")
+    args = parser.parse_args()
+
+    rows = build_index(args.db, HashingEmbedder(dim=args.dim))
+    print(f"{rows}행 인덱스 생성: {index_paths(args.db)[0]}")
+    index = VectorIndex.load(args.db)
+    for query in args.query or []:
+        started = time.perf_counter()
+        ranked = index.search(" ".join(search_terms(query)) or query, k=args.k)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        print(f"{query} ({elapsed_ms:.2f}ms): {ranked}")
+
+
+if __name__ == "__main__":
+    main()
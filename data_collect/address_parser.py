@@ -0,0 +1,144 @@
+import re
+
+# 시/도 표기 -> 약칭 (DB에는 약칭으로 저장)
+SIDO_NAMES = {
+    "서울특별시": "서울",
+    "서울시": "서울",
+    "서울": "서울",
+    "부산광역시": "부산",
+    "부산시": "부산",
+    "부산": "부산",
+    "대구광역시": "대구",
+    "대구시": "대구",
+    "대구": "대구",
+    "인천광역시": "인천",
+    "인천시": "인천",
+    "인천": "인천",
+    "광주광역시": "광주",
+    "광주": "광주",
+    "대전광역시": "대전",
+    "대전시": "대전",
+    "대전": "대전",
+    "울산광역시": "울산",
+    "울산시": "울산",
+    "울산": "울산",
+    "세종특별자치시": "세종",
+    "세종시": "세종",
+    "세종": "세종",
+    "경기도": "경기",
+    "경기": "경기",
+    "강원도": "강원",
+    "강원특별자치도": "강원",
+    "강원": "강원",
+    "충청북도": "충북",
+    "충북": "충북",
+    "충청남도": "충남",
+    "충남": "충남",
+    "전라북도": "전북",
+    "전북특별자치도": "전북",
+    "전북": "전북",
+    "전라남도": "전남",
+    "전남": "전남",
+    "경상북도": "경북",
+    "경북": "경북",
+    "경상남도": "경남",
+    "경남": "경남",
+    "제주특별자치도": "제주",
+    "제주도": "제주",
+    "제주": "제주",
+}
+
+# 시/군/구 (예: 강남구, 성남시, 양평군)
+SIGUNGU = re.compile(r"^[가-힣]+(시|군|구)$")
+# 동/읍/면/가 (예: 논현동, 역삼1동, 을지로3가, 기장읍)
+DONG = re.compile(r"^[가-힣]+\d*(동|읍|면|가)$")
+# 도로명 (예: 학동로, 도산대로12길, 을지로)
+ROAD = re.compile(r"^[가-힣]+\d*(로|길)(\d+(번)?길)?$")
+# 도로명 주소 끝의 참고 항목 (예: '(논현동)', '(논현동, OO빌딩)')
+REFERENCE = re.compile(r"\(([^)]*)\)")
+# 지역 이름 끝의 행정구역 접미사
+REGION_SUFFIX = re.compile(r"(시|군|구|동|읍|면)$")
+
+
+def parse_address(address):
+    """
+    주소를 시/도, 시/군/구, 동(읍/면), 도로명으로 나눕니다.
+
+    '서울특별시 강남구 학동로 123 (논현동)' -> {"sido": "서울", "sigungu": "강남구",
+    "dong": "논현동", "road": "학동로"}
+    '경기 성남시 분당구 정자동 1' -> {"sido": "경기", "sigungu": "성남시 분당구", ...}
+    찾지 못한 항목은 None입니다.
+    """
+    result = {"sido": None, "sigungu": None, "dong": None, "road": None}
+    address = (address or "").strip()
+    if not address:
+        return result
+
+    references = REFERENCE.findall(address)
+    tokens = REFERENCE.sub(" ", address).replace(",", " ").split()
+
+    index = 0
+    if tokens and tokens[0] in SIDO_NAMES:
+        result["sido"] = SIDO_NAMES[tokens[0]]
+        index = 1
+
+    # '성남시 분당구'처럼 시 아래 구가 있는 경우 함께 저장
+    sigungu = []
+    while index < len(tokens) and len(sigungu) < 2 and SIGUNGU.match(tokens[index]):
+        sigungu.append(tokens[index])
+        index += 1
+    if sigungu:
+        result["sigungu"] = " ".join(sigungu)
+
+    for token in tokens[index:]:
+        if result["road"] is None and ROAD.match(token):
+            result["road"] = token
+            break
+        if result["dong"] is None and DONG.match(token):
+            result["dong"] = token
+            break
+
+    # 도로명 주소는 괄호 안의 참고 항목에서 동 이름을 찾음
+    if result["dong"] is None:
+        for reference in references:
+            for token in reference.replace(",", " ").split():
+                if DONG.match(token):
+                    result["dong"] = token
+                    break
+            if result["dong"]:
+                break
+    return result
+
+
+def region_aliases(region):
+    """
+    파싱한 지역 값으로 (alias, level, value) 목록을 만듭니다.
+
+    '강남구' -> ('강남구', 'sigungu', '강남구'), ('강남', 'sigungu', '강남구')
+    '성남시 분당구' -> '성남시 분당구', '분당구', '분당', '성남시', '성남'
+    """
+    aliases = []
+    if region.get("sido"):
+        sido = region["sido"]
+        aliases += [
+            (name, "sido", sido) for name, short in SIDO_NAMES.items() if short == sido
+        ]
+    if region.get("sigungu"):
+        sigungu = region["sigungu"]
+        aliases.append((sigungu, "sigungu", sigungu))
+        for part in sigungu.split():
+            aliases.append((part, "sigungu", sigungu))
+            stem = REGION_SUFFIX.sub("", part)
+            if len(stem) >= 2:
+                aliases.append((stem, "sigungu", sigungu))
+    if region.get("dong"):
+        dong = region["dong"]
+        aliases.append((dong, "dong", dong))
+        # '역삼1동' -> '역삼동', '역삼'
+        stem = REGION_SUFFIX.sub("", re.sub(r"\d+(?=동$)", "", dong))
+        if len(stem) >= 2 and not dong.endswith("가"):
+            aliases.append((stem, "dong", dong))
+            aliases.append((f"{stem}동", "dong", dong))
+    if region.get("road"):
+        aliases.append((region["road"], "road", region["road"]))
+    return list(dict.fromkeys(aliases))
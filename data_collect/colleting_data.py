@@ -732,6 +732,7 @@ for entry in tqdm(playlist_info.get("entries", []), desc="처리 중"):
                     )
                     station_name = "정보 없음"
                     station_distance = "정보 없음"
+                    station_latitude = station_longitude = None
 
                     try:
                         # 지하철역 검색
@@ -751,6 +752,8 @@ for entry in tqdm(playlist_info.get("entries", []), desc="처리 중"):
                             if data["documents"]:
                                 station_name = data["documents"][0]["place_name"]
                                 station_distance = data["documents"][0]["distance"]
+                                station_latitude = data["documents"][0]["y"]
+                                station_longitude = data["documents"][0]["x"]
                     except Exception as e:
                         logger.error(f"지하철역 검색 중 오류 발생: {str(e)}")
 
@@ -761,6 +764,8 @@ for entry in tqdm(playlist_info.get("entries", []), desc="처리 중"):
                         "latitude": latitude,
                         "longitude": longitude,
                         "station_name": f"{station_name}({station_distance}m)",
+                        "station_latitude": station_latitude,
+                        "station_longitude": station_longitude,
                         "video_url": video_url,
                         "menus": restaurant_info["menus"],
                     }
@@ -5,6 +5,8 @@ import re
 import logging
 from logging.handlers import RotatingFileHandler
 
+from address_parser import parse_address, region_aliases
+
 # 로그 설정
 log_dir = "logs"
 os.makedirs(log_dir, exist_ok=True)
@@ -34,6 +36,553 @@ logger.propagate = False
 db_path = "../meokten.db"
 
 
+# 지하철역 정보에서 역 이름만 추출하는 함수 ('논현역 7호선(230m)' -> '논현역')
+def normalize_station(station_name):
+    match = re.match(r"\s*([^\s(]+역)", station_name or "")
+    return match.group(1) if match else None
+
+
+# 메뉴 종류 정규화 함수 (앞뒤 공백 제거, 소문자)
+def normalize_menu_type(menu_type):
+    menu_type = (menu_type or "").strip().lower()
+    return menu_type or None
+
+
+# 국내 좌표 범위 (위도, 경도) - 범위를 벗어나면 잘못 저장된 좌표로 판단
+KOREA_LAT_RANGE = (33.0, 39.5)
+KOREA_LNG_RANGE = (124.0, 132.0)
+
+
+# 좌표 문자열을 숫자로 변환하고 품질을 판정하는 함수
+def parse_coordinates(latitude, longitude):
+    """
+    TEXT 위도/경도를 (lat, lng, geo_quality)로 변환합니다.
+
+    geo_quality:
+        - "ok": 국내 범위 안의 정상 좌표
+        - "missing": '정보 없음', 빈 값 등 좌표가 없음
+        - "invalid": 숫자가 아니거나 0, 국내 범위를 벗어난 좌표
+    정상 좌표가 아니면 lat, lng는 None(NULL)입니다.
+    """
+    values = []
+    for value in (latitude, longitude):
+        if value is None or str(value).strip() in ("", "정보 없음"):
+            return None, None, "missing"
+        try:
+            values.append(float(value))
+        except (TypeError, ValueError):
+            return None, None, "invalid"
+    lat, lng = values
+    if not (
+        KOREA_LAT_RANGE[0] <= lat <= KOREA_LAT_RANGE[1]
+        and KOREA_LNG_RANGE[0] <= lng <= KOREA_LNG_RANGE[1]
+    ):
+        return None, None, "invalid"
+    return lat, lng, "ok"
+
+
+# 테이블에 컬럼이 없으면 추가하는 함수
+def add_column_if_missing(cursor, table, column, definition):
+    cursor.execute(f"PRAGMA table_info({table})")
+    if column not in [row[1] for row in cursor.fetchall()]:
+        logger.info(f"{table} 테이블에 {column} 컬럼 추가")
+        cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+
+
+# 검색용 컬럼과 인덱스를 추가하는 마이그레이션 함수
+def migrate_db(conn):
+    """
+    에이전트 쿼리가 전체 테이블 스캔을 하지 않도록 인덱스와 정규화 컬럼을 추가합니다.
+
+    - menus.restaurant_id 인덱스 (restaurants JOIN menus)
+    - restaurants.station_key: 역 이름만 담은 컬럼 (COLLATE NOCASE, 접두어 LIKE/= 검색 가능)
+    - menus.menu_type_key: 정규화한 메뉴 종류 (COLLATE NOCASE)
+    - menu_type_key, station_key 커버링 인덱스
+    - restaurants.lat, lng: 숫자형(REAL) 좌표 (알 수 없으면 NULL), geo_quality: 좌표 품질
+    여러 번 실행해도 안전하며, 비어 있는 정규화 컬럼만 채웁니다.
+    """
+    cursor = conn.cursor()
+    add_column_if_missing(cursor, "restaurants", "station_key", "TEXT COLLATE NOCASE")
+    add_column_if_missing(cursor, "menus", "menu_type_key", "TEXT COLLATE NOCASE")
+    add_column_if_missing(cursor, "restaurants", "lat", "REAL")
+    add_column_if_missing(cursor, "restaurants", "lng", "REAL")
+    add_column_if_missing(cursor, "restaurants", "geo_quality", "TEXT")
+
+    # 정규화 컬럼 채우기
+    cursor.execute("SELECT id, station_name FROM restaurants WHERE station_key IS NULL")
+    cursor.executemany(
+        "UPDATE restaurants SET station_key = ? WHERE id = ?",
+        [(normalize_station(station), id) for id, station in cursor.fetchall()],
+    )
+    cursor.execute("SELECT id, menu_type FROM menus WHERE menu_type_key IS NULL")
+    cursor.executemany(
+        "UPDATE menus SET menu_type_key = ? WHERE id = ?",
+        [(normalize_menu_type(menu_type), id) for id, menu_type in cursor.fetchall()],
+    )
+    cursor.execute(
+        "SELECT id, latitude, longitude FROM restaurants WHERE geo_quality IS NULL"
+    )
+    cursor.executemany(
+        "UPDATE restaurants SET lat = ?, lng = ?, geo_quality = ? WHERE id = ?",
+        [
+            (*parse_coordinates(latitude, longitude), id)
+            for id, latitude, longitude in cursor.fetchall()
+        ],
+    )
+
+    cursor.executescript(
+        """
+    CREATE INDEX IF NOT EXISTS idx_menus_restaurant_id ON menus (restaurant_id);
+    CREATE INDEX IF NOT EXISTS idx_menus_menu_type_key
+        ON menus (menu_type_key, restaurant_id);
+    CREATE INDEX IF NOT EXISTS idx_restaurants_station_key
+        ON restaurants (station_key, station_name);
+    ANALYZE;
+    """
+    )
+    conn.commit()
+    logger.info("데이터베이스 인덱스 마이그레이션 완료")
+
+
+# 메뉴/후기 전문 검색 테이블을 만드는 마이그레이션 함수
+def migrate_search_index(conn):
+    """
+    메뉴 이름, 후기, 식당 이름, 주소를 검색하는 FTS5 테이블(menu_search)을 만듭니다.
+
+    한국어는 띄어쓰기 단위 토큰화가 잘 맞지 않으므로 trigram 토크나이저를 사용하고,
+    rowid를 menus.id와 같게 두어 트리거로 menus/restaurants 변경 시 함께 갱신합니다.
+    trigram으로 찾을 수 없는 3글자 미만 검색어를 위해 bigram 검색 테이블(menu_search_bigram)도 만듭니다.
+    """
+    cursor = conn.cursor()
+    cursor.executescript(
+        """
+    CREATE VIRTUAL TABLE IF NOT EXISTS menu_search USING fts5 (
+        restaurant_id UNINDEXED,
+        menu_name,
+        menu_review,
+        name,
+        address,
+        tokenize = 'trigram'
+    );
+
+    CREATE TRIGGER IF NOT EXISTS menus_search_insert AFTER INSERT ON menus BEGIN
+        INSERT INTO menu_search (rowid, restaurant_id, menu_name, menu_review, name, address)
+        SELECT new.id, new.restaurant_id, new.menu_name, new.menu_review, r.name, r.address
+        FROM restaurants r WHERE r.id = new.restaurant_id;
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS menus_search_delete AFTER DELETE ON menus BEGIN
+        DELETE FROM menu_search WHERE rowid = old.id;
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS menus_search_update AFTER UPDATE ON menus BEGIN
+        DELETE FROM menu_search WHERE rowid = old.id;
+        INSERT INTO menu_search (rowid, restaurant_id, menu_name, menu_review, name, address)
+        SELECT new.id, new.restaurant_id, new.menu_name, new.menu_review, r.name, r.address
+        FROM restaurants r WHERE r.id = new.restaurant_id;
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS restaurants_search_update
+    AFTER UPDATE OF name, address ON restaurants BEGIN
+        UPDATE menu_search SET name = new.name, address = new.address
+        WHERE rowid IN (SELECT id FROM menus WHERE restaurant_id = new.id);
+    END;
+    """
+    )
+
+    # 트리거 생성 전에 저장된 데이터가 있으면 검색 테이블을 다시 채움
+    cursor.execute("SELECT count(*) FROM menus")
+    menu_count = cursor.fetchone()[0]
+    cursor.execute("SELECT count(*) FROM menu_search")
+    if cursor.fetchone()[0] != menu_count:
+        logger.info("menu_search 검색 테이블 재생성")
+        cursor.executescript(
+            """
+        DELETE FROM menu_search;
+        INSERT INTO menu_search (rowid, restaurant_id, menu_name, menu_review, name, address)
+        SELECT m.id, m.restaurant_id, m.menu_name, m.menu_review, r.name, r.address
+        FROM menus m JOIN restaurants r ON r.id = m.restaurant_id;
+        INSERT INTO menu_search (menu_search) VALUES ('optimize');
+        """
+        )
+
+    # 3글자 미만 검색어('국물', '회')용 bigram 검색 테이블
+    cursor.execute(
+        """
+    CREATE VIRTUAL TABLE IF NOT EXISTS menu_search_bigram USING fts5 (
+        restaurant_id UNINDEXED,
+        menu_name,
+        menu_review,
+        name,
+        address,
+        tokenize = 'unicode61 remove_diacritics 0'
+    )
+    """
+    )
+    refresh_search_bigrams(cursor)
+    cursor.execute(
+        "INSERT INTO menu_search_bigram (menu_search_bigram) VALUES ('optimize')"
+    )
+    conn.commit()
+
+
+# 검색용 단어 구분 (밑줄도 구분자로 취급)
+SEARCH_WORD = re.compile(r"[^\W_]+")
+
+
+def bigram_text(text):
+    """
+    텍스트를 단어별 2글자 조각(bigram)과 마지막 글자로 나눈 문자열로 바꿉니다.
+
+    '국물 진한' -> '국물 물 진한 한' (agent/search.py의 bigram_query와 같은 규칙)
+    모든 글자가 어떤 토큰의 첫 글자가 되므로 한 글자 검색어는 접두어 검색으로 찾습니다.
+    """
+    tokens = []
+    for word in SEARCH_WORD.findall(text or ""):
+        tokens.extend(word[i : i + 2] for i in range(len(word) - 1))
+        tokens.append(word[-1])
+    return " ".join(tokens)
+
+
+def refresh_search_bigrams(cursor, restaurant_id=None):
+    """
+    menu_search_bigram을 다시 채웁니다. (restaurant_id를 지정하면 해당 식당만)
+
+    bigram 변환은 SQL로 할 수 없으므로 트리거 대신 DB 초기화/식당 저장 시 갱신합니다.
+    """
+    select = (
+        "SELECT m.id, m.restaurant_id, m.menu_name, m.menu_review, r.name, r.address "
+        "FROM menus m JOIN restaurants r ON r.id = m.restaurant_id"
+    )
+    if restaurant_id is None:
+        cursor.execute("DELETE FROM menu_search_bigram")
+        rows = cursor.execute(select).fetchall()
+    else:
+        cursor.execute(
+            "DELETE FROM menu_search_bigram WHERE restaurant_id = ?", (restaurant_id,)
+        )
+        rows = cursor.execute(f"{select} WHERE r.id = ?", (restaurant_id,)).fetchall()
+    cursor.executemany(
+        "INSERT INTO menu_search_bigram "
+        "(rowid, restaurant_id, menu_name, menu_review, name, address) "
+        "VALUES (?, ?, ?, ?, ?, ?)",
+        [
+            (menu_id, rid, *(bigram_text(text) for text in texts))
+            for menu_id, rid, *texts in rows
+        ],
+    )
+
+
+# 좌표 공간 인덱스를 만드는 마이그레이션 함수
+def migrate_geo_index(conn):
+    """
+    식당 좌표(lat, lng)의 R*Tree 공간 인덱스(restaurant_geo)를 만듭니다.
+
+    좌표가 있는(NULL이 아닌) 식당만 인덱스에 넣고,
+    트리거로 restaurants 변경 시 함께 갱신합니다.
+    """
+    cursor = conn.cursor()
+    cursor.executescript(
+        """
+    CREATE VIRTUAL TABLE IF NOT EXISTS restaurant_geo USING rtree (
+        id, min_lat, max_lat, min_lng, max_lng
+    );
+
+    -- TEXT 좌표를 직접 변환하던 이전 트리거를 REAL 컬럼 기준으로 다시 생성
+    DROP TRIGGER IF EXISTS restaurants_geo_insert;
+    DROP TRIGGER IF EXISTS restaurants_geo_update;
+    DROP TRIGGER IF EXISTS restaurants_geo_delete;
+
+    CREATE TRIGGER restaurants_geo_insert AFTER INSERT ON restaurants
+    WHEN new.lat IS NOT NULL AND new.lng IS NOT NULL BEGIN
+        INSERT OR REPLACE INTO restaurant_geo (id, min_lat, max_lat, min_lng, max_lng)
+        VALUES (new.id, new.lat, new.lat, new.lng, new.lng);
+    END;
+
+    CREATE TRIGGER restaurants_geo_update AFTER UPDATE OF lat, lng ON restaurants BEGIN
+        DELETE FROM restaurant_geo WHERE id = old.id;
+        INSERT INTO restaurant_geo (id, min_lat, max_lat, min_lng, max_lng)
+        SELECT new.id, new.lat, new.lat, new.lng, new.lng
+        WHERE new.lat IS NOT NULL AND new.lng IS NOT NULL;
+    END;
+
+    CREATE TRIGGER restaurants_geo_delete AFTER DELETE ON restaurants BEGIN
+        DELETE FROM restaurant_geo WHERE id = old.id;
+    END;
+    """
+    )
+
+    # 트리거 생성 전에 저장된 데이터가 있으면 공간 인덱스를 다시 채움
+    cursor.execute(
+        "SELECT count(*) FROM restaurants WHERE lat IS NOT NULL AND lng IS NOT NULL"
+    )
+    valid_count = cursor.fetchone()[0]
+    cursor.execute("SELECT count(*) FROM restaurant_geo")
+    if cursor.fetchone()[0] != valid_count:
+        logger.info("restaurant_geo 공간 인덱스 재생성")
+        cursor.execute("DELETE FROM restaurant_geo")
+        cursor.execute(
+            """
+        INSERT INTO restaurant_geo (id, min_lat, max_lat, min_lng, max_lng)
+        SELECT id, lat, lat, lng, lng FROM restaurants
+        WHERE lat IS NOT NULL AND lng IS NOT NULL
+        """
+        )
+    conn.commit()
+
+
+# 지하철역 정보 파싱 함수 ('논현역 7호선(230m)' -> ('논현역', '7호선', 230))
+def parse_station(station_name):
+    match = re.match(
+        r"\s*([^\s(]+역)\s*([^(]*?)\s*(?:\((\d+)m\))?\s*$", station_name or ""
+    )
+    if not match:
+        return None
+    name, line, distance = match.groups()
+    return name, line, int(distance) if distance else None
+
+
+# 식당과 지하철역을 연결하는 함수
+def link_station(
+    cursor, restaurant_id, station_name, station_lat=None, station_lng=None
+):
+    """
+    지하철역을 stations에 추가(이미 있으면 좌표만 보완)하고 restaurant_stations에 거리와 함께 연결합니다.
+
+    Returns:
+        bool: 역 정보를 파싱하여 연결했는지 여부
+    """
+    station = parse_station(station_name)
+    if not station:
+        return False
+    name, line, distance = station
+    cursor.execute(
+        """
+    INSERT INTO stations (name, line, lat, lng) VALUES (?, ?, ?, ?)
+    ON CONFLICT (name, line) DO UPDATE SET
+        lat = coalesce(stations.lat, excluded.lat),
+        lng = coalesce(stations.lng, excluded.lng)
+    """,
+        (name, line, station_lat, station_lng),
+    )
+    cursor.execute("SELECT id FROM stations WHERE name = ? AND line = ?", (name, line))
+    station_id = cursor.fetchone()[0]
+    cursor.execute(
+        """
+    INSERT OR REPLACE INTO restaurant_stations (restaurant_id, station_id, distance_m)
+    VALUES (?, ?, ?)
+    """,
+        (restaurant_id, station_id, distance),
+    )
+    return True
+
+
+# 지하철역 테이블을 만드는 마이그레이션 함수
+def migrate_stations(conn):
+    """
+    지하철역(stations)과 식당-역 연결(restaurant_stations) 테이블을 만듭니다.
+
+    station_name 문자열('논현역 7호선(230m)')을 역 이름, 호선, 거리(m)로 나누어
+    아직 연결되지 않은 식당을 채웁니다. 역 좌표는 수집 시 함께 저장한 경우에만 채워집니다.
+    """
+    cursor = conn.cursor()
+    cursor.executescript(
+        """
+    CREATE TABLE IF NOT EXISTS stations (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT NOT NULL COLLATE NOCASE,
+        line TEXT NOT NULL DEFAULT '',
+        lat REAL,
+        lng REAL,
+        UNIQUE (name, line)
+    );
+
+    CREATE TABLE IF NOT EXISTS restaurant_stations (
+        restaurant_id INTEGER NOT NULL,
+        station_id INTEGER NOT NULL,
+        distance_m INTEGER,
+        PRIMARY KEY (restaurant_id, station_id),
+        FOREIGN KEY (restaurant_id) REFERENCES restaurants (id),
+        FOREIGN KEY (station_id) REFERENCES stations (id)
+    );
+
+    -- 역 기준 거리순 조회 (WHERE station_id = ? ORDER BY distance_m)
+    CREATE INDEX IF NOT EXISTS idx_restaurant_stations_station
+        ON restaurant_stations (station_id, distance_m, restaurant_id);
+    """
+    )
+
+    cursor.execute(
+        """
+    SELECT id, station_name FROM restaurants
+    WHERE id NOT IN (SELECT restaurant_id FROM restaurant_stations)
+    """
+    )
+    linked = sum(
+        link_station(cursor, restaurant_id, station_name)
+        for restaurant_id, station_name in cursor.fetchall()
+    )
+    if linked:
+        logger.info(f"restaurant_stations {linked}개 연결")
+        cursor.execute("ANALYZE")
+    conn.commit()
+
+
+# 지역 별칭 저장 함수
+def save_region_aliases(cursor, region):
+    cursor.executemany(
+        "INSERT OR IGNORE INTO region_aliases (alias, level, value) VALUES (?, ?, ?)",
+        region_aliases(region),
+    )
+
+
+# 주소를 지역 컬럼으로 나누는 마이그레이션 함수
+def migrate_regions(conn):
+    """
+    주소를 파싱하여 restaurants의 sido, sigungu, dong, road 컬럼과
+    지역 별칭 테이블(region_aliases)을 채웁니다.
+
+    sido는 약칭('서울'), sigungu는 '강남구' 또는 '성남시 분당구' 형식이며,
+    region_aliases는 '서울특별시', '서울시', '강남', '논현' 등을
+    (level, value)로 연결하여 address LIKE 대신 인덱스를 타는 = 조건으로 검색할 수 있게 합니다.
+    """
+    cursor = conn.cursor()
+    for column in ("sido", "sigungu", "dong", "road"):
+        add_column_if_missing(cursor, "restaurants", column, "TEXT")
+    cursor.executescript(
+        """
+    CREATE TABLE IF NOT EXISTS region_aliases (
+        alias TEXT NOT NULL COLLATE NOCASE,
+        level TEXT NOT NULL,
+        value TEXT NOT NULL,
+        PRIMARY KEY (alias, level, value)
+    );
+
+    CREATE INDEX IF NOT EXISTS idx_restaurants_sido_sigungu
+        ON restaurants (sido, sigungu);
+    CREATE INDEX IF NOT EXISTS idx_restaurants_sigungu ON restaurants (sigungu);
+    CREATE INDEX IF NOT EXISTS idx_restaurants_dong ON restaurants (dong);
+    CREATE INDEX IF NOT EXISTS idx_restaurants_road ON restaurants (road);
+    """
+    )
+
+    cursor.execute(
+        """
+    SELECT id, address FROM restaurants
+    WHERE sido IS NULL AND sigungu IS NULL AND dong IS NULL AND road IS NULL
+    """
+    )
+    regions = [(id, parse_address(address)) for id, address in cursor.fetchall()]
+    cursor.executemany(
+        "UPDATE restaurants SET sido = ?, sigungu = ?, dong = ?, road = ? WHERE id = ?",
+        [
+            (region["sido"], region["sigungu"], region["dong"], region["road"], id)
+            for id, region in regions
+        ],
+    )
+
+    # 별칭은 저장된 지역 값 전체로 다시 생성
+    cursor.execute("DELETE FROM region_aliases")
+    cursor.execute("SELECT DISTINCT sido, sigungu, dong, road FROM restaurants")
+    for sido, sigungu, dong, road in cursor.fetchall():
+        save_region_aliases(
+            cursor, {"sido": sido, "sigungu": sigungu, "dong": dong, "road": road}
+        )
+    if regions:
+        logger.info(f"restaurants {len(regions)}개 주소 파싱")
+        cursor.execute("ANALYZE")
+    conn.commit()
+
+
+# 식당 카드 한 행을 만드는 쿼리 (메뉴, 메뉴 종류, 후기를 메뉴 id 순서로 이어 붙임)
+RESTAURANT_CARD_SELECT = """
+SELECT
+    r.id, r.name, r.address, r.station_name, r.station_key,
+    r.sido, r.sigungu, r.dong, r.road, r.lat, r.lng, r.video_url,
+    (SELECT COUNT(*) FROM menus m WHERE m.restaurant_id = r.id),
+    (SELECT GROUP_CONCAT(menu_type, ', ') FROM (
+        SELECT menu_type FROM menus m
+        WHERE m.restaurant_id = r.id AND COALESCE(menu_type, '') != ''
+        GROUP BY menu_type ORDER BY MIN(m.id)
+    )),
+    (SELECT GROUP_CONCAT(menu_name, ', ') FROM (
+        SELECT menu_name FROM menus m WHERE m.restaurant_id = r.id ORDER BY m.id
+    )),
+    (SELECT GROUP_CONCAT(menu_name || ': ' || menu_review, ' / ') FROM (
+        SELECT menu_name, menu_review FROM menus m
+        WHERE m.restaurant_id = r.id AND COALESCE(menu_review, '') != ''
+        ORDER BY m.id
+    ))
+FROM restaurants r
+"""
+
+
+def refresh_restaurant_cards(cursor, restaurant_id=None):
+    """restaurant_cards를 다시 만듭니다. (restaurant_id를 지정하면 해당 식당만)"""
+    insert = (
+        "INSERT INTO restaurant_cards (restaurant_id, name, address, station_name, "
+        "station_key, sido, sigungu, dong, road, lat, lng, video_url, menu_count, "
+        f"menu_types, menus, reviews) {RESTAURANT_CARD_SELECT}"
+    )
+    if restaurant_id is None:
+        cursor.execute("DELETE FROM restaurant_cards")
+        cursor.execute(insert)
+    else:
+        cursor.execute(
+            "DELETE FROM restaurant_cards WHERE restaurant_id = ?", (restaurant_id,)
+        )
+        cursor.execute(f"{insert} WHERE r.id = ?", (restaurant_id,))
+
+
+# 식당 카드 테이블 마이그레이션 함수
+def migrate_restaurant_cards(conn):
+    """
+    식당 1곳당 1행인 restaurant_cards 테이블을 만들고 다시 채웁니다.
+
+    restaurants와 menus를 JOIN 하면 메뉴 수만큼 식당 정보가 반복되므로,
+    메뉴(menus), 메뉴 종류(menu_types), 후기(reviews)를 미리 이어 붙인 테이블을
+    에이전트의 기본 조회 대상으로 사용합니다. DB를 초기화할 때마다 전체를 다시 만들고,
+    save_to_db는 저장한 식당의 행만 갱신합니다.
+    """
+    cursor = conn.cursor()
+    cursor.executescript(
+        """
+    CREATE TABLE IF NOT EXISTS restaurant_cards (
+        restaurant_id INTEGER PRIMARY KEY,
+        name TEXT NOT NULL,
+        address TEXT NOT NULL,
+        station_name TEXT,
+        station_key TEXT COLLATE NOCASE,
+        sido TEXT,
+        sigungu TEXT,
+        dong TEXT,
+        road TEXT,
+        lat REAL,
+        lng REAL,
+        video_url TEXT,
+        menu_count INTEGER NOT NULL DEFAULT 0,
+        menu_types TEXT,
+        menus TEXT,
+        reviews TEXT
+    );
+
+    CREATE INDEX IF NOT EXISTS idx_restaurant_cards_station_key
+        ON restaurant_cards (station_key);
+    CREATE INDEX IF NOT EXISTS idx_restaurant_cards_sido_sigungu
+        ON restaurant_cards (sido, sigungu);
+    CREATE INDEX IF NOT EXISTS idx_restaurant_cards_sigungu
+        ON restaurant_cards (sigungu);
+    CREATE INDEX IF NOT EXISTS idx_restaurant_cards_dong ON restaurant_cards (dong);
+    CREATE INDEX IF NOT EXISTS idx_restaurant_cards_road ON restaurant_cards (road);
+    """
+    )
+    refresh_restaurant_cards(cursor)
+    cursor.execute("SELECT COUNT(*) FROM restaurant_cards")
+    logger.info(f"restaurant_cards {cursor.fetchone()[0]}개 생성")
+    cursor.execute("ANALYZE")
+    conn.commit()
+
+
 # 데이터베이스 초기화 함수
 def init_db():
     conn = sqlite3.connect(db_path)
@@ -85,6 +634,12 @@ def init_db():
         )
 
     conn.commit()
+    migrate_db(conn)
+    migrate_search_index(conn)
+    migrate_geo_index(conn)
+    migrate_stations(conn)
+    migrate_regions(conn)
+    migrate_restaurant_cards(conn)
     conn.close()
     logger.info("데이터베이스 초기화 완료")
 
@@ -135,18 +690,25 @@ def save_to_db(video_id, restaurant_data):
             logger.info(f"이미 존재하는 데이터 패스: video_id {video_id}")
             return True  # 이미 존재하는 데이터는 패스
 
-        # 식당 정보 저장
+        # 식당 정보 저장 (주소는 지역 컬럼으로 나누어 함께 저장)
+        region = parse_address(address)
         cursor.execute(
             """
-        INSERT INTO restaurants (name, address, latitude, longitude, station_name, video_id, video_url)
-        VALUES (?, ?, ?, ?, ?, ?, ?)
+        INSERT INTO restaurants (name, address, latitude, longitude, lat, lng, geo_quality, station_name, station_key, sido, sigungu, dong, road, video_id, video_url)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
         """,
             (
                 name,
                 address,
                 latitude,
                 longitude,
+                *parse_coordinates(latitude, longitude),
                 station_name,
+                normalize_station(station_name),
+                region["sido"],
+                region["sigungu"],
+                region["dong"],
+                region["road"],
                 video_id,
                 video_url,
             ),
@@ -155,6 +717,17 @@ def save_to_db(video_id, restaurant_data):
         # 방금 삽입한 식당의 ID 가져오기
         restaurant_id = cursor.lastrowid
 
+        save_region_aliases(cursor, region)
+
+        # 지하철역 연결 (역 좌표가 있으면 함께 저장)
+        link_station(
+            cursor,
+            restaurant_id,
+            station_name,
+            restaurant_data.get("station_latitude"),
+            restaurant_data.get("station_longitude"),
+        )
+
         # 기존 메뉴 삭제 (업데이트 시)
         cursor.execute("DELETE FROM menus WHERE restaurant_id = ?", (restaurant_id,))
 
@@ -167,17 +740,22 @@ def save_to_db(video_id, restaurant_data):
 
             cursor.execute(
                 """
-            INSERT INTO menus (restaurant_id, menu_type, menu_name, menu_review)
-            VALUES (?, ?, ?, ?)
+            INSERT INTO menus (restaurant_id, menu_type, menu_type_key, menu_name, menu_review)
+            VALUES (?, ?, ?, ?, ?)
             """,
                 (
                     restaurant_id,
                     menu_type,
+                    normalize_menu_type(menu_type),
                     menu_name,
                     menu_review,
                 ),
             )
 
+        # 식당 카드 갱신 (메뉴와 후기를 이어 붙인 한 행)
+        refresh_restaurant_cards(cursor, restaurant_id)
+        refresh_search_bigrams(cursor, restaurant_id)
+
         conn.commit()
         logger.info(
             f"식당 '{name}' 정보 저장 완료 (ID: {restaurant_id}, 메뉴 수: {len(menus)})"
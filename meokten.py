@@ -1,22 +1,49 @@
 # app.py
+import time
+
+# 시작 import 시간 측정 (python -m agent.import_budget 로 자세히 확인)
+_import_started = time.perf_counter()
+
 import streamlit as st
 from dotenv import load_dotenv
 from streamlit_folium import st_folium
 
+from agent.cache import AnswerCache
 from agent.config import get_logger
 
 # from agent.db import get_db_connection
 
 # 커스텀 모듈 임포트
 from agent.graph import AgentGraph
+from agent.import_budget import IMPORT_BUDGET_SECONDS
+from agent.metrics import METRICS_PATH, MetricsRegistry
 from utils.map_utils import create_restaurant_map
 
+_import_seconds = time.perf_counter() - _import_started
+
 st.set_page_config(page_title="먹텐 - 맛집 추천 AI", page_icon="🍽️", layout="wide")
 
 
+# 반복 질문 결과 캐시 파일 (Streamlit 재시작 후에도 유지)
+ANSWER_CACHE_PATH = ".cache/answer_cache.db"
+# 사이드바에 표시할 응답 지표 (MetricsRegistry.snapshot의 지표 이름)
+SIDEBAR_METRICS = ("request_seconds", "llm_seconds", "sql_seconds", "loops")
+
+
+@st.cache_resource
+def get_metrics():
+    # 모든 세션이 공유하는 요청 지표 (MEOKTEN_METRICS_PATH에 snapshot을 주기적으로 저장)
+    return MetricsRegistry(snapshot_path=METRICS_PATH or None)
+
+
 @st.cache_resource
 def create_agent_graph():
-    return AgentGraph()
+    # 질문마다 한 번만 실행하므로 대화 기록을 보관하지 않음 (checkpointer=None)
+    return AgentGraph(
+        answer_cache=AnswerCache(path=ANSWER_CACHE_PATH),
+        checkpointer=None,
+        metrics=get_metrics(),
+    )
 
 
 # @st.cache_resource
@@ -27,6 +54,13 @@ def create_agent_graph():
 # 로깅 설정 - app.log 파일에 로그 기록
 logger = get_logger()
 
+if _import_seconds > IMPORT_BUDGET_SECONDS:
+    logger.warning(
+        f"시작 import 시간 {_import_seconds:.2f}초 (예산 {IMPORT_BUDGET_SECONDS:.2f}초 초과)"
+    )
+else:
+    logger.info(f"시작 import 시간 {_import_seconds:.2f}초")
+
 # # db 연결
 # db, _ = get_db()
 # db._execute("SELECT count(*) FROM restaurants")[0]["count(*)"]
@@ -194,6 +228,29 @@ with st.sidebar:
     st.markdown("---")
     st.markdown("데이터 출처: 성시경의 유튜브 채널")
 
+    # 응답 지표 (최근 요청 기준 분위수)
+    with st.expander("📊 응답 지표", expanded=False):
+        snapshot = get_metrics().snapshot()
+        if not snapshot["requests"]:
+            st.caption("아직 처리한 질문이 없습니다.")
+        else:
+            st.caption(
+                "요청 수: "
+                + ", ".join(f"{k} {v}" for k, v in snapshot["requests"].items())
+            )
+            st.table(
+                [
+                    {
+                        "지표": name,
+                        "p50": round(values["p50"], 3),
+                        "p95": round(values["p95"], 3),
+                        "p99": round(values["p99"], 3),
+                    }
+                    for name, values in snapshot["metrics"].items()
+                    if name in SIDEBAR_METRICS
+                ]
+            )
+
 # 메인 컨텐츠
 # 채팅 기록 초기화
 if "messages" not in st.session_state:
@@ -202,6 +259,17 @@ if "messages" not in st.session_state:
     st.session_state.highlighted_restaurant = None  # 하이라이트할 식당 ID
 
 
+# 식당 정보 텍스트 생성 함수 (채팅 답변 및 스트리밍 카드에 사용)
+def format_restaurant_text(i, info):
+    text = f"\n\n{i}. {info.get('name', '이름 없음')}\n\n"
+    text += f"\t📍 주소: {info.get('address', '주소 없음')}\n\n"
+    text += f"\t🚇 지하철: {info.get('subway', '정보 없음')}\n\n"
+    text += f"\t🍽️ 메뉴: {info.get('menu', '정보 없음')}\n\n"
+    text += f"\t⭐ 리뷰: {info.get('review', '정보 없음')}\n\n"
+    text += f"\t🎬 유튜브 영상: {info.get('video_url', '정보 없음')}\n\n"
+    return text
+
+
 # 식당 JSON 파싱 함수
 def parse_restaurant_info(data):
     try:
@@ -212,45 +280,9 @@ def parse_restaurant_info(data):
             if isinstance(data, dict) and "infos" in data:
                 logger.info(f"응답에서 {len(data['infos'])}개의 식당 정보 발견")
 
-                # 서울 중심 좌표 (기본값)
-                base_lat, base_lng = 37.5665, 126.9780
-
                 for i, info in enumerate(data["infos"], 1):
-                    # 좌표 정보 처리
-                    try:
-                        lat = info.get("lat", "0")
-                        lng = info.get("lng", "0")
-
-                        # 문자열인 경우 변환 처리
-                        if isinstance(lat, str):
-                            lat = float(lat) if lat and lat != "정보 없음" else 0
-                        if isinstance(lng, str):
-                            lng = float(lng) if lng and lng != "정보 없음" else 0
-
-                        # 좌표가 없거나 0인 경우 기본 좌표에 오프셋 추가
-                        if not lat or not lng or lat == 0 or lng == 0:
-                            lat = base_lat + (i * 0.001)
-                            lng = base_lng + (i * 0.001)
-                            logger.info(
-                                f"식당 {i}에 기본 좌표 할당: lat={lat}, lng={lng}"
-                            )
-                    except (ValueError, TypeError) as e:
-                        logger.warning(f"좌표 변환 오류, 기본값 사용: {str(e)}")
-                        lat = base_lat + (i * 0.001)
-                        lng = base_lng + (i * 0.001)
-
-                    logger.info(
-                        f"식당 {i}: {info.get('name', '이름 없음')} - 좌표: lat={lat}, lng={lng}"
-                    )
-
-                    Answer += f"\n\n{i}. {info.get('name', '이름 없음')}\n\n"
-                    Answer += f"\t📍 주소: {info.get('address', '주소 없음')}\n\n"
-                    Answer += f"\t🚇 지하철: {info.get('subway', '정보 없음')}\n\n"
-                    Answer += f"\t🍽️ 메뉴: {info.get('menu', '정보 없음')}\n\n"
-                    Answer += f"\t⭐ 리뷰: {info.get('review', '정보 없음')}\n\n"
-                    Answer += (
-                        f"\t🎬 유튜브 영상: {info.get('video_url', '정보 없음')}\n\n"
-                    )
+                    # 좌표는 Answers 모델에서 float 또는 None으로 변환되어 전달됨
+                    Answer += format_restaurant_text(i, info)
                     restaurant = {
                         "id": i,
                         "name": info.get("name", "이름 없음"),
@@ -259,50 +291,16 @@ def parse_restaurant_info(data):
                         "menu": info.get("menu", "정보 없음"),
                         "review": info.get("review", "정보 없음"),
                         "video_url": info.get("video_url", "정보 없음"),
-                        "lat": lat,
-                        "lng": lng,
+                        "lat": info.get("lat"),
+                        "lng": info.get("lng"),
                     }
                     restaurants.append(restaurant)
             elif isinstance(data, list):
                 # 직접 식당 목록이 전달된 경우 (예: [{...}, {...}])
                 logger.info(f"응답에서 {len(data)}개의 식당 정보 발견")
 
-                # 서울 중심 좌표 (기본값)
-                base_lat, base_lng = 37.5665, 126.9780
-
                 for i, info in enumerate(data, 1):
-                    # 좌표 정보 처리
-                    try:
-                        lat = info.get("lat", "0")
-                        lng = info.get("lng", "0")
-
-                        # 문자열인 경우 변환 처리
-                        if isinstance(lat, str):
-                            lat = float(lat) if lat and lat != "정보 없음" else 0
-                        if isinstance(lng, str):
-                            lng = float(lng) if lng and lng != "정보 없음" else 0
-
-                        # 좌표가 없거나 0인 경우 기본 좌표에 오프셋 추가
-                        if not lat or not lng or lat == 0 or lng == 0:
-                            lat = base_lat + (i * 0.001)
-                            lng = base_lng + (i * 0.001)
-                            logger.info(
-                                f"식당 {i}에 기본 좌표 할당: lat={lat}, lng={lng}"
-                            )
-                    except (ValueError, TypeError) as e:
-                        logger.warning(f"좌표 변환 오류, 기본값 사용: {str(e)}")
-                        lat = base_lat + (i * 0.001)
-                        lng = base_lng + (i * 0.001)
-
-                    logger.info(
-                        f"식당 {i}: {info.get('name', '이름 없음')} - 좌표: lat={lat}, lng={lng}"
-                    )
-
-                    Answer += f"\n\n{i}. {info.get('name', '이름 없음')}\n\n"
-                    Answer += f"\t📍 주소: {info.get('address', '주소 없음')}\n\n"
-                    Answer += f"\t🚇 지하철: {info.get('subway', '정보 없음')}\n\n"
-                    Answer += f"\t🍽️ 메뉴: {info.get('menu', '정보 없음')}\n\n"
-                    Answer += f"\t⭐ 리뷰: {info.get('review', '정보 없음')}\n"
+                    Answer += format_restaurant_text(i, info)
                     restaurant = {
                         "id": i,
                         "name": info.get("name", "이름 없음"),
@@ -310,8 +308,8 @@ def parse_restaurant_info(data):
                         "subway": info.get("subway", "정보 없음"),
                         "menu": info.get("menu", "정보 없음"),
                         "review": info.get("review", "정보 없음"),
-                        "lat": lat,
-                        "lng": lng,
+                        "lat": info.get("lat"),
+                        "lng": info.get("lng"),
                     }
                     restaurants.append(restaurant)
 
@@ -354,73 +352,15 @@ with left_col:
     with map_container:
         # 지도 표시 (식당 정보가 있는 경우)
         if "restaurants" in st.session_state and st.session_state.restaurants:
-            # 유효한 좌표가 있는 식당 필터링
-            valid_restaurants = []
-            for restaurant in st.session_state.restaurants:
-                try:
-                    lat = restaurant.get("lat")
-                    lng = restaurant.get("lng")
-
-                    # 숫자형으로 변환 확인
-                    if isinstance(lat, (str, float, int)) and lat not in [
-                        "정보 없음",
-                        "0",
-                        "",
-                        0,
-                    ]:
-                        if isinstance(lat, str):
-                            lat = float(lat)
-                        if isinstance(lng, (str, float, int)) and lng not in [
-                            "정보 없음",
-                            "0",
-                            "",
-                            0,
-                        ]:
-                            if isinstance(lng, str):
-                                lng = float(lng)
-
-                        # 유효한 좌표인 경우만 추가 (엄격하게 검사)
-                        if lat and lng and lat != 0 and lng != 0:
-                            # 좌표 정보 업데이트
-                            restaurant_with_coords = restaurant.copy()
-                            restaurant_with_coords["lat"] = lat
-                            restaurant_with_coords["lng"] = lng
-                            valid_restaurants.append(restaurant_with_coords)
-                            logger.info(
-                                f"유효한 좌표: {restaurant.get('name')} - lat={lat}, lng={lng}"
-                            )
-                        else:
-                            logger.warning(
-                                f"유효하지 않은 좌표: {restaurant.get('name', '이름 없음')} - lat={lat}, lng={lng}"
-                            )
-                            # 기본 좌표 할당
-                            base_lat, base_lng = 37.5665, 126.9780
-                            idx = restaurant.get("id", 1)
-                            lat = base_lat + (idx * 0.001)
-                            lng = base_lng + (idx * 0.001)
-                            restaurant_with_coords = restaurant.copy()
-                            restaurant_with_coords["lat"] = lat
-                            restaurant_with_coords["lng"] = lng
-                            valid_restaurants.append(restaurant_with_coords)
-                            logger.info(
-                                f"기본 좌표 할당: {restaurant.get('name')} - lat={lat}, lng={lng}"
-                            )
-                except (ValueError, TypeError) as e:
-                    logger.warning(
-                        f"좌표 변환 오류: {str(e)}, 식당: {restaurant.get('name', '이름 없음')}"
-                    )
-                    # 오류 발생 시 기본 좌표 할당
-                    base_lat, base_lng = 37.5665, 126.9780
-                    idx = restaurant.get("id", 1)
-                    restaurant_with_coords = restaurant.copy()
-                    restaurant_with_coords["lat"] = base_lat + (idx * 0.001)
-                    restaurant_with_coords["lng"] = base_lng + (idx * 0.001)
-                    valid_restaurants.append(restaurant_with_coords)
-                    logger.info(
-                        f"오류 후 기본 좌표 할당: {restaurant.get('name')} - lat={base_lat + (idx * 0.001)}, lng={base_lng + (idx * 0.001)}"
-                    )
-
-            # 식당이 있는 경우 항상 지도 생성 (유효한 좌표가 없어도 기본 좌표로 표시)
+            # 좌표가 있는 식당만 지도에 표시 (좌표가 없으면 lat/lng가 None)
+            valid_restaurants = [
+                restaurant
+                for restaurant in st.session_state.restaurants
+                if isinstance(restaurant.get("lat"), float)
+                and isinstance(restaurant.get("lng"), float)
+            ]
+
+            # 식당이 있는 경우 항상 지도 생성 (좌표가 있는 식당이 없으면 서울 중심)
             if st.session_state.restaurants:
                 # 하이라이트된 식당 ID 가져오기
                 highlighted_id = st.session_state.get("highlighted_restaurant")
@@ -431,30 +371,16 @@ with left_col:
                 if highlighted_id:
                     for r in valid_restaurants:
                         if r.get("id") == highlighted_id:
-                            try:
-                                center = [
-                                    float(r.get("lat")),
-                                    float(r.get("lng")),
-                                ]
-                                logger.info(f"하이라이트된 식당 중심 좌표: {center}")
-                                break
-                            except (ValueError, TypeError):
-                                pass
+                            center = [r["lat"], r["lng"]]
+                            logger.info(f"하이라이트된 식당 중심 좌표: {center}")
+                            break
 
                 if not center and valid_restaurants:
-                    try:
-                        center_lat = float(valid_restaurants[0].get("lat", 37.5665))
-                        center_lng = float(valid_restaurants[0].get("lng", 126.9780))
-                        center = [center_lat, center_lng]
-                        logger.info(f"첫 번째 식당 중심 좌표: {center}")
-                    except (ValueError, TypeError):
-                        center = [37.5665, 126.9780]  # 기본값: 서울
-                        logger.info(f"기본 중심 좌표 사용: {center}")
-                else:
-                    # center가 설정되지 않았을 경우 기본값 설정
-                    if not center:
-                        center = [37.5665, 126.9780]  # 기본값: 서울
-                        logger.info(f"기본 중심 좌표 사용: {center}")
+                    center = [valid_restaurants[0]["lat"], valid_restaurants[0]["lng"]]
+                    logger.info(f"첫 번째 식당 중심 좌표: {center}")
+                elif not center:
+                    center = [37.5665, 126.9780]  # 기본값: 서울
+                    logger.info(f"기본 중심 좌표 사용: {center}")
 
                 # 지도 생성 및 표시
                 st.info(f"총 {len(valid_restaurants)}개의 식당을 지도에 표시합니다.")
@@ -547,11 +473,6 @@ with right_col:
             with st.chat_message(message["role"]):
                 st.markdown(message["content"], unsafe_allow_html=True)
 
-        # 처리 상태 확인
-        if "processing" in st.session_state and st.session_state.processing:
-            with st.chat_message("assistant"):
-                st.write("🤔먹을 텐데~\n 식당을 찾고있어요.")
-
     # 사용자 입력 (컨테이너 외부에 배치)
     prompt = st.chat_input(
         "맛집을 추천해드릴까요? (예: 서울에서 맛있는 한식 맛집 추천해줘)"
@@ -576,10 +497,28 @@ with right_col:
         try:
             logger.info(f"에이전트 호출: {st.session_state.messages[-1]['content']}")
 
-            # 에이전트 실행
-            result = st.session_state.agent_graph.run_agent(
-                st.session_state.messages[-1]["content"]
-            )
+            # 에이전트 실행 (진행 상황, 답변, 식당 카드를 도착하는 대로 표시)
+            result = None
+            with chat_container:
+                with st.chat_message("assistant"):
+                    status = st.status("🤔먹을 텐데~ 식당을 찾고있어요.")
+                    answer_placeholder = st.empty()
+                    for event in st.session_state.agent_graph.stream_agent(
+                        st.session_state.messages[-1]["content"]
+                    ):
+                        if event["type"] == "progress":
+                            status.update(label=f"🤔먹을 텐데~ {event['message']}")
+                        elif event["type"] == "answer":
+                            answer_placeholder.markdown(event["text"])
+                        elif event["type"] == "info":
+                            st.markdown(
+                                format_restaurant_text(
+                                    event["index"] + 1, event["info"]
+                                )
+                            )
+                        elif event["type"] == "result":
+                            result = event["data"]
+                    status.update(label="🍽️ 식당을 찾았어요!", state="complete")
             logger.info(f"에이전트 실행 결과: {result}")
             logger.info(f"에이전트 응답 타입: {type(result)}")
 
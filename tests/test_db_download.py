@@ -0,0 +1,221 @@
+"""agent.db_download 테스트 (로컬 HTTP 서버로 원격 DB를 대신함)"""
+
+import hashlib
+import http.server
+import os
+import sqlite3
+import threading
+
+import pytest
+import requests
+
+from agent import db_download
+
+
+class RemoteDB:
+    """ETag, 조건부 요청, Range/If-Range를 지원하는 원격 DB 서버 상태"""
+
+    def __init__(self, path):
+        self.path = path
+        self.requests = []  # 요청별 조건부/Range 헤더
+        self.interrupt = False  # True면 본문 절반만 보내고 연결을 끊음
+        self.fail = False  # True면 500 응답
+
+    def data(self) -> bytes:
+        with open(self.path, "rb") as f:
+            return f.read()
+
+    def etag(self) -> str:
+        return f'"{hashlib.md5(self.data()).hexdigest()}"'
+
+    def sha256(self) -> str:
+        return hashlib.sha256(self.data()).hexdigest()
+
+
+def make_db(path, rows=2000, marker="v1"):
+    connection = sqlite3.connect(path)
+    connection.execute("CREATE TABLE IF NOT EXISTS items (id INTEGER, text TEXT)")
+    connection.executemany(
+        "INSERT INTO items VALUES (?, ?)",
+        [(i, f"{marker}-{i}-" + "x" * 40) for i in range(rows)],
+    )
+    connection.commit()
+    connection.close()
+
+
+def make_handler(remote: RemoteDB):
+    class Handler(http.server.BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            remote.requests.append(
+                {
+                    name: self.headers[name]
+                    for name in ("If-None-Match", "Range", "If-Range")
+                    if self.headers[name]
+                }
+            )
+            if remote.fail:
+                self.send_response(500)
+                self.end_headers()
+                return
+            data, etag = remote.data(), remote.etag()
+            if self.headers["If-None-Match"] == etag:
+                self.send_response(304)
+                self.end_headers()
+                return
+
+            start = 0
+            if self.headers["Range"] and self.headers["If-Range"] == etag:
+                start = int(self.headers["Range"].split("=")[1].rstrip("-"))
+                if start >= len(data):
+                    self.send_response(416)
+                    self.send_header("Content-Range", f"bytes */{len(data)}")
+                    self.end_headers()
+                    return
+                self.send_response(206)
+                self.send_header(
+                    "Content-Range", f"bytes {start}-{len(data) - 1}/{len(data)}"
+                )
+            else:
+                self.send_response(200)
+            body = data[start:]
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            if remote.interrupt:
+                self.wfile.write(body[: len(body) // 2])
+                self.wfile.flush()
+                self.connection.shutdown(2)
+                return
+            self.wfile.write(body)
+
+    return Handler
+
+
+@pytest.fixture
+def remote(tmp_path, monkeypatch):
+    monkeypatch.setattr(db_download, "CHUNK_SIZE", 4096)
+    monkeypatch.setattr(db_download, "DB_SHA256", "")
+    monkeypatch.setattr(db_download, "DB_SHA256_URL", "")
+    (tmp_path / "remote").mkdir()
+    remote = RemoteDB(str(tmp_path / "remote" / "meokten.db"))
+    make_db(remote.path)
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), make_handler(remote))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    remote.url = f"http://127.0.0.1:{server.server_port}/meokten.db"
+    yield remote
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "meokten.db")
+
+
+def read(path) -> bytes:
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def test_download_then_not_modified(remote, db_path):
+    assert db_download.download_db(remote.url, db_path) is True
+    assert read(db_path) == remote.data()
+    inode = os.stat(db_path).st_ino
+
+    assert db_download.download_db(remote.url, db_path) is False
+    assert remote.requests[-1]["If-None-Match"] == remote.etag()
+    assert os.stat(db_path).st_ino == inode
+
+
+def test_resume_interrupted_download(remote, db_path):
+    remote.interrupt = True
+    with pytest.raises(requests.RequestException):
+        db_download.download_db(remote.url, db_path)
+    assert not os.path.exists(db_path)
+    offset = os.path.getsize(f"{db_path}.part")
+    assert 0 < offset < len(remote.data())
+
+    remote.interrupt = False
+    assert db_download.download_db(remote.url, db_path) is True
+    assert remote.requests[-1] == {
+        "Range": f"bytes={offset}-",
+        "If-Range": remote.etag(),
+    }
+    assert read(db_path) == remote.data()
+    assert not os.path.exists(f"{db_path}.part")
+    assert not os.path.exists(f"{db_path}.part.json")
+
+
+def test_resume_restarts_when_remote_changed(remote, db_path):
+    remote.interrupt = True
+    with pytest.raises(requests.RequestException):
+        db_download.download_db(remote.url, db_path)
+    stale_etag = remote.etag()
+
+    remote.interrupt = False
+    make_db(remote.path, rows=10, marker="v2")
+    assert db_download.download_db(remote.url, db_path) is True
+    # If-Range가 맞지 않아 서버가 전체(200)를 보내면 처음부터 다시 씀
+    assert remote.requests[-1]["If-Range"] == stale_etag
+    assert read(db_path) == remote.data()
+
+
+def test_unsatisfiable_range_discards_part(remote, db_path):
+    with open(f"{db_path}.part", "wb") as f:
+        f.write(remote.data() + b"extra")
+    db_download.write_json(
+        f"{db_path}.part.json", {"url": remote.url, "etag": remote.etag()}
+    )
+
+    with pytest.raises(ValueError):
+        db_download.download_db(remote.url, db_path)
+    assert not os.path.exists(f"{db_path}.part")
+    assert not os.path.exists(f"{db_path}.part.json")
+
+    assert db_download.download_db(remote.url, db_path) is True
+    assert "Range" not in remote.requests[-1]
+    assert read(db_path) == remote.data()
+
+
+def test_checksum_mismatch_keeps_existing_file(remote, db_path, monkeypatch):
+    db_download.download_db(remote.url, db_path)
+    old = read(db_path)
+
+    make_db(remote.path, rows=10, marker="v2")
+    monkeypatch.setattr(db_download, "DB_SHA256", "0" * 64)
+    with pytest.raises(ValueError):
+        db_download.download_db(remote.url, db_path)
+    assert read(db_path) == old
+    assert not os.path.exists(f"{db_path}.part")
+
+    assert db_download.refresh_db(remote.url, db_path) is False
+    assert read(db_path) == old
+
+    monkeypatch.setattr(db_download, "DB_SHA256", remote.sha256())
+    assert db_download.download_db(remote.url, db_path) is True
+    assert read(db_path) == remote.data()
+
+
+def test_local_file_is_checked_against_recorded_sha256(remote, db_path):
+    db_download.download_db(remote.url, db_path)
+    with open(db_path, "ab") as f:
+        f.write(b"corrupted")
+
+    # 기록된 SHA-256과 다르면 조건부 요청 없이 다시 받음
+    assert db_download.download_db(remote.url, db_path) is True
+    assert "If-None-Match" not in remote.requests[-1]
+    assert read(db_path) == remote.data()
+
+
+def test_refresh_failure_rejects_corrupted_local_file(remote, db_path):
+    db_download.download_db(remote.url, db_path)
+    remote.fail = True
+    assert db_download.refresh_db(remote.url, db_path) is False
+
+    with open(db_path, "ab") as f:
+        f.write(b"corrupted")
+    with pytest.raises(requests.RequestException):
+        db_download.refresh_db(remote.url, db_path)
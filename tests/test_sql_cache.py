@@ -0,0 +1,111 @@
+"""agent.sql_cache 테스트 (정규화된 SQL이 캐시 키로 안전한지 확인)"""
+
+import itertools
+import sqlite3
+
+import pytest
+from langchain_community.utilities import SQLDatabase
+
+from agent.sql_cache import QueryCache, canonicalize_sql
+
+# 서로 다른 결과를 낼 수 있는 쿼리 (어떤 두 쿼리도 같은 키를 가지면 안 됨)
+DIFFERENT_QUERIES = [
+    "SELECT id FROM restaurants UNION SELECT restaurant_id FROM menus",
+    "SELECT id FROM restaurants UNION ALL SELECT restaurant_id FROM menus",
+    "SELECT id FROM restaurants EXCEPT SELECT restaurant_id FROM menus",
+    "SELECT id FROM restaurants INTERSECT SELECT restaurant_id FROM menus",
+    "SELECT id FROM restaurants",
+    "SELECT id FROM restaurants WHERE name = 'a'",
+    "SELECT id FROM restaurants WHERE name = 'A'",
+    "SELECT id FROM restaurants WHERE name = 'a b'",
+    "SELECT id FROM restaurants WHERE NOT name = 'a'",
+    "SELECT id FROM restaurants ORDER BY id",
+    "SELECT id FROM restaurants ORDER BY id DESC",
+    "SELECT id FROM restaurants LIMIT 1",
+    "SELECT id FROM restaurants LIMIT 2",
+    "SELECT id FROM restaurants INDEXED BY idx_restaurants_name WHERE name = 'a'",
+    "SELECT id FROM restaurants NOT INDEXED WHERE name = 'a'",
+    "SELECT r.id FROM restaurants r JOIN menus m ON m.restaurant_id = r.id",
+    "SELECT r.id FROM restaurants r LEFT JOIN menus m ON m.restaurant_id = r.id",
+    "SELECT r.id FROM restaurants r NATURAL JOIN menus m",
+    "SELECT id, ROW_NUMBER() OVER w FROM restaurants WINDOW w AS (ORDER BY id)",
+    "SELECT id, ROW_NUMBER() OVER w FROM restaurants WINDOW w AS (ORDER BY id DESC)",
+    "SELECT name FROM restaurants",
+    "SELECT name FROM menus",
+]
+
+# 공백, 대소문자, 주석, 별칭만 다른 쿼리 (같은 키를 가져야 함)
+EQUIVALENT_QUERIES = [
+    (
+        "SELECT r.name FROM restaurants r WHERE r.id = 1",
+        "select restaurants.name from restaurants where restaurants.id=1;",
+    ),
+    (
+        "SELECT r.name, m.menu_name FROM restaurants AS r JOIN menus AS m ON m.restaurant_id = r.id",
+        "SELECT restaurants.name, menus.menu_name\nFROM restaurants\n"
+        "JOIN menus ON menus.restaurant_id = restaurants.id -- 메뉴",
+    ),
+    (
+        "SELECT id FROM restaurants /* 식당 */ WHERE name LIKE '%논현%'",
+        "SELECT  id  FROM  restaurants  WHERE  name  LIKE  '%논현%'",
+    ),
+]
+
+
+def test_different_queries_never_share_a_key():
+    keys = {query: canonicalize_sql(query) for query in DIFFERENT_QUERIES}
+    for a, b in itertools.combinations(DIFFERENT_QUERIES, 2):
+        assert keys[a] != keys[b], (a, b)
+
+
+@pytest.mark.parametrize("a, b", EQUIVALENT_QUERIES)
+def test_equivalent_queries_share_a_key(a, b):
+    assert canonicalize_sql(a) == canonicalize_sql(b)
+
+
+def test_string_literals_are_kept():
+    assert "'%논현역%'" in canonicalize_sql("SELECT * FROM t WHERE s LIKE '%논현역%'")
+    assert "'It''s'" in canonicalize_sql("SELECT * FROM t WHERE s = 'It''s'")
+
+
+def test_set_operations_are_cached_separately(tmp_path):
+    db_path = str(tmp_path / "meokten.db")
+    connection = sqlite3.connect(db_path)
+    connection.executescript(
+        """
+        CREATE TABLE restaurants (id INTEGER PRIMARY KEY, name TEXT);
+        CREATE TABLE menus (id INTEGER PRIMARY KEY, restaurant_id INTEGER);
+        INSERT INTO restaurants VALUES (1, 'a'), (2, 'b'), (3, 'c');
+        INSERT INTO menus VALUES (1, 2), (2, 3), (3, 4);
+        """
+    )
+    connection.commit()
+    connection.close()
+
+    cache = QueryCache(SQLDatabase.from_uri(f"sqlite:///{db_path}"), db_path=db_path)
+    query = "SELECT id FROM restaurants {} SELECT restaurant_id FROM menus ORDER BY 1"
+    assert cache.run(query.format("EXCEPT")).rows == [(1,)]
+    assert cache.run(query.format("INTERSECT")).rows == [(2,), (3,)]
+    assert cache.run(query.format("UNION")).rows == [(1,), (2,), (3,), (4,)]
+    assert cache.stats()["hits"] == 0
+
+
+def test_params_are_part_of_the_key(tmp_path):
+    db_path = str(tmp_path / "meokten.db")
+    connection = sqlite3.connect(db_path)
+    connection.executescript(
+        """
+        CREATE TABLE restaurants (id INTEGER PRIMARY KEY, name TEXT);
+        INSERT INTO restaurants VALUES (1, 'a'), (2, 'b');
+        """
+    )
+    connection.commit()
+    connection.close()
+
+    cache = QueryCache(SQLDatabase.from_uri(f"sqlite:///{db_path}"), db_path=db_path)
+    query = "SELECT id FROM restaurants WHERE name = ?"
+    assert cache.run(query, ["a"]).rows == [(1,)]
+    assert cache.run(query, ["b"]).rows == [(2,)]
+    assert cache.run(query, ["a' OR 1 = 1 --"]).rows == []
+    assert cache.get(query, ["a"]).rows == [(1,)]
+    assert cache.stats()["hits"] == 0
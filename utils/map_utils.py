@@ -93,118 +93,71 @@ def create_restaurant_map(
                 )
                 categories[category].add_to(m)
 
-    # 서울 중심 좌표 (기본값)
-    base_lat, base_lng = 37.5665, 126.9780
-
     # 식당 마커 추가
-    for i, restaurant in enumerate(restaurants, 1):
-        # 위도, 경도 확인
-        try:
-            # 좌표 데이터 처리 개선
-            lat = restaurant.get("lat", None)
-            lng = restaurant.get("lng", None)
-
-            # 문자열인 경우 float로 변환
-            if isinstance(lat, str) and lat not in ["정보 없음", "0", ""]:
-                lat = float(lat)
-            if isinstance(lng, str) and lng not in ["정보 없음", "0", ""]:
-                lng = float(lng)
-
-            # 유효한 좌표인지 확인
-            if not lat or not lng or lat == 0 or lng == 0:
-                print(
-                    f"유효하지 않은 좌표: {restaurant['name']} - lat: {lat}, lng: {lng}"
-                )
-                # 기본 좌표에 오프셋 추가
-                lat = base_lat + (i * 0.001)
-                lng = base_lng + (i * 0.001)
-                print(f"기본 좌표 할당: {restaurant['name']} - lat: {lat}, lng: {lng}")
-
-            # 아이콘 선택
-            icon_name = "cutlery"
-
-            # 간단한 팝업 내용 생성
-            popup_html = create_simple_popup(restaurant)
-
-            # 하이라이트 여부 확인
-            is_highlighted = str(restaurant.get("id", "")) == str(highlighted_id)
-
-            # 마커 색상 및 아이콘 설정
-            icon_color = (
-                "red"
-                if is_highlighted
-                else random.choice(
-                    [
-                        "blue",
-                        "green",
-                        "purple",
-                        "orange",
-                        "darkblue",
-                        "lightred",
-                        "beige",
-                        "darkgreen",
-                        "darkpurple",
-                        "cadetblue",
-                    ]
-                )
-            )
-
-            # 마커 생성
-            marker = folium.Marker(
-                location=[lat, lng],
-                popup=folium.Popup(popup_html, max_width=200),
-                tooltip=restaurant["name"],
-                icon=folium.Icon(color=icon_color, icon=icon_name, prefix="fa"),
+    for restaurant in restaurants:
+        # 좌표는 float로 전달되며, 좌표가 없는 식당(None)은 표시하지 않음
+        lat, lng = restaurant.get("lat"), restaurant.get("lng")
+        if lat is None or lng is None:
+            continue
+
+        # 아이콘 선택
+        icon_name = "cutlery"
+
+        # 간단한 팝업 내용 생성
+        popup_html = create_simple_popup(restaurant)
+
+        # 하이라이트 여부 확인
+        is_highlighted = str(restaurant.get("id", "")) == str(highlighted_id)
+
+        # 마커 색상 및 아이콘 설정
+        icon_color = (
+            "red"
+            if is_highlighted
+            else random.choice(
+                [
+                    "blue",
+                    "green",
+                    "purple",
+                    "orange",
+                    "darkblue",
+                    "lightred",
+                    "beige",
+                    "darkgreen",
+                    "darkpurple",
+                    "cadetblue",
+                ]
             )
-
-            # 마커 추가 (클러스터링 사용 여부에 따라)
-            if use_clustering and len(restaurants) > 1:
-                if category in categories:
-                    marker.add_to(categories[category])
-                else:
-                    marker.add_to(marker_cluster)
+        )
+
+        # 마커 생성
+        marker = folium.Marker(
+            location=[lat, lng],
+            popup=folium.Popup(popup_html, max_width=200),
+            tooltip=restaurant["name"],
+            icon=folium.Icon(color=icon_color, icon=icon_name, prefix="fa"),
+        )
+
+        # 마커 추가 (클러스터링 사용 여부에 따라)
+        if use_clustering and len(restaurants) > 1:
+            if category in categories:
+                marker.add_to(categories[category])
             else:
-                marker.add_to(m)
-
-            # 하이라이트된 마커에 추가 효과
-            if is_highlighted:
-                # 원형 마커 추가
-                folium.CircleMarker(
-                    location=[lat, lng],
-                    radius=30,
-                    color="#FF4B4B",
-                    fill=True,
-                    fill_color="#FF4B4B",
-                    fill_opacity=0.2,
-                    weight=3,
-                ).add_to(m)
-
-        except (ValueError, TypeError) as e:
-            print(f"좌표 변환 오류: {restaurant.get('name', '이름 없음')} - {e}")
-            # 오류 발생 시 기본 좌표에 오프셋 추가
-            lat = base_lat + (i * 0.001)
-            lng = base_lng + (i * 0.001)
-            print(
-                f"오류 발생으로 기본 좌표 할당: {restaurant.get('name', '이름 없음')} - lat: {lat}, lng: {lng}"
-            )
-
-            try:
-                # 마커 생성 및 추가 시도
-                marker = folium.Marker(
-                    location=[lat, lng],
-                    popup=folium.Popup(create_simple_popup(restaurant), max_width=200),
-                    tooltip=restaurant.get("name", "이름 없음"),
-                    icon=folium.Icon(color="gray", icon="question", prefix="fa"),
-                )
-
-                # 마커 추가
-                if use_clustering and len(restaurants) > 1:
-                    marker.add_to(marker_cluster)
-                else:
-                    marker.add_to(m)
-            except Exception as e2:
-                print(f"마커 생성 오류: {restaurant.get('name', '이름 없음')} - {e2}")
-                continue
+                marker.add_to(marker_cluster)
+        else:
+            marker.add_to(m)
+
+        # 하이라이트된 마커에 추가 효과
+        if is_highlighted:
+            # 원형 마커 추가
+            folium.CircleMarker(
+                location=[lat, lng],
+                radius=30,
+                color="#FF4B4B",
+                fill=True,
+                fill_color="#FF4B4B",
+                fill_opacity=0.2,
+                weight=3,
+            ).add_to(m)
 
     # 레이어 컨트롤 추가 (클러스터링 사용 시)
     if use_clustering and len(restaurants) > 1 and categories: